@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Steps/sec through the CLI versus the in-process library (clrun.api).
+
+A "step" is what an agent loop does between decisions: read a session's
+output (`tail`) and list sessions (`status`). The CLI path forks
+`python -m clrun` for each call and parses the YAML back, as agent
+frameworks do today; the library path calls clrun.api.Client directly.
+
+Runs offline against a fixture project (no live workers). Prints JSON.
+
+Usage: python benchmarks/bench_api.py [--steps N] [--sessions N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from typing import Callable, Dict
+
+import yaml
+
+from fixtures import PKG_DIR, bench_env, make_project, add_session
+
+sys.path.insert(0, PKG_DIR)
+
+from clrun.api import Client  # noqa: E402
+
+
+def _rate(step: Callable[[], None], steps: int) -> float:
+    start = time.perf_counter()
+    for _ in range(steps):
+        step()
+    return steps / (time.perf_counter() - start)
+
+
+def run(steps: int, sessions: int) -> Dict[str, object]:
+    root = make_project()
+    try:
+        ids = [add_session(root) for _ in range(sessions)]
+        terminal_id = ids[0]
+        env = bench_env()
+
+        def cli(*args: str) -> dict:
+            out = subprocess.run(
+                [sys.executable, "-m", "clrun", *args],
+                cwd=root, env=env, capture_output=True, text=True,
+            ).stdout
+            return yaml.safe_load(out)
+
+        def cli_step() -> None:
+            cli("tail", terminal_id, "--lines", "50")
+            cli("status")
+
+        client = Client(root)
+
+        def lib_step() -> None:
+            client.tail(terminal_id, 50)
+            client.status()
+
+        cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            cli_rate = _rate(cli_step, steps)
+            lib_rate = _rate(lib_step, steps * 20)
+        finally:
+            os.chdir(cwd)
+
+        return {
+            "benchmark": "api_vs_cli",
+            "step": "tail + status",
+            "sessions": sessions,
+            "cli_steps_per_s": round(cli_rate, 2),
+            "library_steps_per_s": round(lib_rate, 2),
+            "speedup": round(lib_rate / cli_rate, 1),
+            "cli_ms_per_step": round(1000 / cli_rate, 2),
+            "library_ms_per_step": round(1000 / lib_rate, 3),
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=10, help="CLI steps (the library runs 20x as many)")
+    parser.add_argument("--sessions", type=int, default=20)
+    opts = parser.parse_args()
+    print(json.dumps(run(opts.steps, opts.sessions), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Event queries on a large ledger: full scan versus the sparse segment index.
+
+Builds a fixture ledger of --events events (16MB segments, --terminals
+sessions, timestamps one millisecond apart), then measures:
+
+  * scan_ms        - the pre-index read_events: parse every line of every
+                     segment and filter (last 50 events of one terminal)
+  * index_build_ms - indexing every segment (done once, by the first query)
+  * last_terminal_ms - last 50 events of one terminal
+  * window_type_ms - input.sent events in a 1-second window in the middle
+  * last_all_ms    - last 50 events, unfiltered
+  * follow_idle_us - one follower poll when nothing was logged
+  * follow_new_us  - one follower poll that picks up 100 new events
+
+Prints JSON.
+
+Usage: python benchmarks/bench_events.py [--events N] [--terminals N] [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from fixtures import PKG_DIR, make_project, median_ms
+
+sys.path.insert(0, PKG_DIR)
+
+from clrun.ledger import writer  # noqa: E402
+from clrun.ledger.follow import LedgerFollower  # noqa: E402
+from clrun.ledger.query import last_events, query_events, segment_index  # noqa: E402
+from clrun.utils.paths import get_clrun_paths  # noqa: E402
+
+SEGMENT_BYTES = 16 << 20
+TYPES = ("input.queued", "input.sent", "session.created", "session.exited")
+
+
+def build_ledger(root: str, events: int, terminals: int) -> List[str]:
+    ledger_dir = get_clrun_paths(root).ledger_dir
+    tids = [f"{i:08x}-0000-4000-8000-000000000000" for i in range(terminals)]
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    segment, size, out = 1, 0, open(os.path.join(ledger_dir, "events.1.log"), "w", encoding="utf-8")
+    for i in range(events):
+        entry = {
+            "timestamp": (start + timedelta(milliseconds=i)).isoformat(),
+            "event": TYPES[i % len(TYPES)],
+            "terminal_id": tids[(i * 7919) % terminals],
+            "data": {"queue_id": str(i), "input": f"echo {i}"},
+        }
+        line = json.dumps(entry) + "\n"
+        out.write(line)
+        size += len(line)
+        if size >= SEGMENT_BYTES:
+            out.close()
+            segment, size = segment + 1, 0
+            out = open(os.path.join(ledger_dir, f"events.{segment}.log"), "w", encoding="utf-8")
+    out.close()
+    os.replace(os.path.join(ledger_dir, f"events.{segment}.log"), get_clrun_paths(root).events_log)
+    return tids
+
+
+def scan(root: str, terminal_id: str) -> List[dict]:
+    found = []
+    for path in writer.segments(root):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry.get("terminal_id") == terminal_id:
+                    found.append(entry)
+    return found[-50:]
+
+
+def follow_poll_us(root: str, new_events: int, repeat: int) -> float:
+    follower = LedgerFollower(root)
+    ledger = writer.LedgerWriter(root, 0, None)
+    samples = []
+    for r in range(repeat):
+        for i in range(new_events):
+            ledger.append({"timestamp": datetime.now(timezone.utc).isoformat(), "event": "input.sent",
+                           "terminal_id": "bench", "data": {"n": r * new_events + i}})
+        start = time.perf_counter()
+        found = follower.poll()
+        samples.append((time.perf_counter() - start) * 1e6)
+        assert len(found) == new_events
+    ledger.close()
+    return round(statistics.median(samples), 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--terminals", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    opts = parser.parse_args()
+
+    root = make_project()
+    try:
+        tids = build_ledger(root, opts.events, opts.terminals)
+        target = tids[len(tids) // 2]
+        ledger_bytes = sum(os.path.getsize(p) for p in writer.segments(root))
+        mid = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(milliseconds=opts.events // 2)
+        since, until = mid.isoformat(), (mid + timedelta(seconds=1)).isoformat()
+
+        start = time.perf_counter()
+        expected = scan(root, target)
+        scan_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        start = time.perf_counter()
+        for path in writer.segments(root):
+            segment_index(root, path)
+        build_ms = round((time.perf_counter() - start) * 1000, 2)
+        assert last_events(root, 50, terminal_id=target) == expected
+
+        print(json.dumps({
+            "benchmark": "event_query",
+            "events": opts.events,
+            "ledger_mb": round(ledger_bytes / (1 << 20), 1),
+            "segments": len(writer.segments(root)),
+            "scan_ms": scan_ms,
+            "index_build_ms": build_ms,
+            "last_terminal_ms": median_ms(lambda: last_events(root, 50, terminal_id=target), opts.repeat),
+            "window_type_ms": median_ms(
+                lambda: list(query_events(root, types=["input.sent"], since=since, until=until)), opts.repeat),
+            "last_all_ms": median_ms(lambda: last_events(root, 50), opts.repeat),
+            "follow_idle_us": follow_poll_us(root, 0, opts.repeat * 20),
+            "follow_new_us": follow_poll_us(root, 100, opts.repeat),
+        }, indent=2))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
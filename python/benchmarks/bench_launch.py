@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Worker launch-to-ready latency: Popen versus the fork server.
+
+For each launcher (`worker.launcher` = popen, forkserver), launches
+--repeat real workers running `sleep 60` through spawn_worker and
+measures, per launch:
+
+  * launch_ms - until spawn_worker returns (Popen, or the fork server's reply)
+  * ready_ms  - until the worker has its PTY up and has written its
+                session as running
+  * output_ms - until the session's first output reaches its buffer
+
+The fork server is started and warmed with one launch before timing.
+Every worker is killed after its launch is measured. Prints JSON with the
+median and p95 of each.
+
+Usage: python benchmarks/bench_launch.py [--repeat N] [--shell /bin/sh]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+from fixtures import PKG_DIR, bench_env, make_project, wait_for
+
+sys.path.insert(0, PKG_DIR)
+
+from clrun.buffer.buffer_manager import get_buffer_size  # noqa: E402
+from clrun.pty.pty_manager import generate_terminal_id, read_session  # noqa: E402
+from clrun.queue.queue_engine import init_queue  # noqa: E402
+from clrun.runtime import forkserver  # noqa: E402
+from clrun.runtime.spawn import spawn_worker  # noqa: E402
+
+TIMEOUT_S = 10.0
+
+
+def _stats(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "median": round(statistics.median(ordered), 2),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+    }
+
+
+def _launch_once(root: str) -> Dict[str, float]:
+    terminal_id = generate_terminal_id()
+    init_queue(terminal_id, root)
+    start = time.perf_counter()
+    pid = spawn_worker(terminal_id, "sleep 60", root, root)
+    launched = time.perf_counter()
+
+    def ready() -> bool:
+        session = read_session(terminal_id, root)
+        return bool(session and session.status == "running" and session.worker_pid == pid)
+
+    try:
+        if not wait_for(ready, TIMEOUT_S):
+            raise RuntimeError(f"worker {pid} did not become ready")
+        ready_at = time.perf_counter()
+        wait_for(lambda: get_buffer_size(terminal_id, root) > 0, TIMEOUT_S)
+        output_at = time.perf_counter()
+    finally:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass
+    return {
+        "launch_ms": (launched - start) * 1000,
+        "ready_ms": (ready_at - start) * 1000,
+        "output_ms": (output_at - start) * 1000,
+    }
+
+
+def measure(launcher: str, repeat: int) -> Dict[str, object]:
+    root = make_project()
+    os.environ["CLRUN_WORKER_LAUNCHER"] = launcher
+    try:
+        if launcher == "forkserver":
+            forkserver.start(root)
+            if not wait_for(lambda: os.path.exists(forkserver.socket_path(root)), TIMEOUT_S):
+                raise RuntimeError("fork server did not start")
+            _launch_once(root)  # warm-up
+        runs = [_launch_once(root) for _ in range(repeat)]
+        return {
+            "launcher": launcher,
+            "launches": repeat,
+            **{key: _stats([run[key] for run in runs]) for key in ("launch_ms", "ready_ms", "output_ms")},
+        }
+    finally:
+        if os.path.exists(forkserver.socket_path(root)):
+            _stop_forkserver(root)
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def _stop_forkserver(root: str) -> None:
+    """The fork server holds its lock file open; find it by the lock and stop it."""
+    lock = os.path.join(root, ".clrun", forkserver.LOCK_FILE)
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            for fd in os.listdir(f"/proc/{pid}/fd"):
+                if os.readlink(f"/proc/{pid}/fd/{fd}") == lock:
+                    os.kill(int(pid), signal.SIGTERM)
+                    return
+        except OSError:
+            continue
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--shell", default="/bin/sh", help="$SHELL for the workers (default: /bin/sh)")
+    opts = parser.parse_args()
+    os.environ.update(bench_env())
+    os.environ["SHELL"] = opts.shell
+    results = [measure(launcher, opts.repeat) for launcher in ("popen", "forkserver")]
+    popen, forked = (r["ready_ms"]["median"] for r in results)  # type: ignore[index]
+    print(json.dumps({
+        "benchmark": "worker_launch",
+        "results": results,
+        "ready_speedup": round(popen / forked, 2) if forked else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Ledger event throughput: per-event append versus the buffered writer.
+
+  * per_event   - what log_event did before the buffered writer: ensure the
+                  .clrun directories, then open, append and close events.log
+                  for every event (or one INSERT per event under sqlite)
+  * buffered    - clrun.ledger.ledger.log_event, including the final flush
+
+Rates are events/second. Prints JSON.
+
+Usage: python benchmarks/bench_ledger.py [--events N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict
+
+from fixtures import PKG_DIR, make_project
+
+sys.path.insert(0, PKG_DIR)
+
+from clrun import store  # noqa: E402
+from clrun.ledger import writer  # noqa: E402
+from clrun.ledger.ledger import log_event, read_events  # noqa: E402
+from clrun.store import sqlite_store  # noqa: E402
+from clrun.utils.paths import ensure_clrun_dirs, get_clrun_paths  # noqa: E402
+
+TERMINAL_ID = "00000000-0000-4000-8000-000000000000"
+
+
+def _entry(i: int) -> Dict[str, object]:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "event": "input.sent",
+        "terminal_id": TERMINAL_ID,
+        "data": {"queue_id": str(i), "input": f"echo {i}"},
+    }
+
+
+def per_event_files(root: str, i: int) -> None:
+    ensure_clrun_dirs(root)
+    paths = get_clrun_paths(root)
+    with open(paths.events_log, "a", encoding="utf-8") as f:
+        f.write(json.dumps(_entry(i)) + "\n")
+
+
+def per_event_sqlite(root: str, i: int) -> None:
+    ensure_clrun_dirs(root)
+    sqlite_store.log_event(_entry(i), root)
+
+
+def buffered(root: str, i: int) -> None:
+    log_event("input.sent", root, TERMINAL_ID, {"queue_id": str(i), "input": f"echo {i}"})
+
+
+def _rate(root: str, fn: Callable[[str, int], None], events: int) -> float:
+    start = time.perf_counter()
+    for i in range(events):
+        fn(root, i)
+    writer.flush(root)
+    rate = events / (time.perf_counter() - start)
+    assert len(read_events(root)) == events
+    return round(rate)
+
+
+def measure(backend: str, events: int) -> Dict[str, object]:
+    results: Dict[str, object] = {"backend": backend, "events": events}
+    for name, fn in (("per_event", per_event_sqlite if backend == "sqlite" else per_event_files),
+                     ("buffered", buffered)):
+        root = make_project()
+        try:
+            with store.forced_backend(root, backend):
+                results[f"{name}_per_s"] = _rate(root, fn, events)
+        finally:
+            sqlite_store.close(root)
+            shutil.rmtree(root, ignore_errors=True)
+    results["speedup"] = round(results["buffered_per_s"] / results["per_event_per_s"], 1)  # type: ignore[operator]
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20000)
+    opts = parser.parse_args()
+    print(json.dumps({
+        "benchmark": "ledger_throughput",
+        "results": [measure(backend, opts.events) for backend in store.BACKENDS],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+`clrun metrics` scrape cost versus project size.
+
+Builds a fixture project of --sessions exited sessions and a ledger of
+--events input.queued/input.sent pairs, then measures, in-process:
+
+  * naive_ms       - what a scrape costs without the index and the ledger
+                     cursor: parse every session file and the whole ledger
+  * first_ms       - the first render() (index built, ledger cursor set)
+  * scrape_ms      - a render() after --new-events more events were logged
+  * idle_scrape_ms - a render() with nothing new
+
+Prints JSON.
+
+Usage: python benchmarks/bench_metrics.py [--sessions N] [--events N] [--new-events N] [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from fixtures import PKG_DIR, add_session, make_project
+
+sys.path.insert(0, PKG_DIR)
+
+from clrun.ledger import writer  # noqa: E402
+from clrun.runtime.exporter import render  # noqa: E402
+from clrun.utils.paths import get_clrun_paths  # noqa: E402
+
+
+def _ms(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def log_inputs(root: str, pairs: int) -> None:
+    ledger = writer.LedgerWriter(root, 0.05, None)
+    now = datetime.now(timezone.utc)
+    for i in range(pairs):
+        qid = str(uuid.uuid4())
+        at = now + timedelta(milliseconds=i)
+        ledger.append({"timestamp": at.isoformat(), "event": "input.queued", "terminal_id": "bench",
+                       "data": {"queue_id": qid, "input": f"echo {i}", "priority": 0}})
+        ledger.append({"timestamp": (at + timedelta(milliseconds=40)).isoformat(), "event": "input.sent",
+                       "terminal_id": "bench", "data": {"queue_id": qid, "input": f"echo {i}"}})
+    ledger.flush()
+    ledger.close()
+
+
+def naive(root: str) -> None:
+    paths = get_clrun_paths(root)
+    counts: dict = {}
+    for name in os.listdir(paths.sessions_dir):
+        with open(os.path.join(paths.sessions_dir, name), "r", encoding="utf-8") as f:
+            status = json.load(f).get("status")
+        counts[status] = counts.get(status, 0) + 1
+    for path in writer.segments(root):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                name = json.loads(line)["event"]
+                counts[name] = counts.get(name, 0) + 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--new-events", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    opts = parser.parse_args()
+
+    root = make_project()
+    try:
+        for _ in range(opts.sessions):
+            add_session(root, buffer_lines=1)
+        log_inputs(root, opts.events // 2)
+
+        naive_ms = statistics.median(_ms(lambda: naive(root)) for _ in range(opts.repeat))
+        first_ms = _ms(lambda: render(root))
+        scrapes, idle = [], []
+        for _ in range(opts.repeat):
+            log_inputs(root, opts.new_events // 2)
+            scrapes.append(_ms(lambda: render(root)))
+            idle.append(_ms(lambda: render(root)))
+
+        print(json.dumps({
+            "benchmark": "metrics_scrape",
+            "sessions": opts.sessions,
+            "ledger_events": opts.events,
+            "naive_ms": round(naive_ms, 2),
+            "first_ms": round(first_ms, 2),
+            "scrape_ms": round(statistics.median(scrapes), 2),
+            "idle_scrape_ms": round(statistics.median(idle), 2),
+        }, indent=2))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
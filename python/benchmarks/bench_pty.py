@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+PTY backends compared: pexpect versus the stdlib (pty/os) backend.
+
+For each backend (`worker.pty_backend` = pexpect, stdlib), measures:
+
+  * import_ms     - median time for a fresh interpreter to import the
+                    worker module plus the backend's PTY library
+  * library_ms    - the same for the PTY library alone (pexpect / pty)
+  * rss_mb        - median resident size of --workers idle live workers
+  * first_output_ms - median spawn-to-first-output of those workers
+  * ingest_mb_s   - PTY output throughput through a live worker
+                    (`yes | head` of --ingest-mb megabytes into the buffer)
+
+Prints JSON.
+
+Usage: python benchmarks/bench_pty.py [--repeat N] [--workers N] [--ingest-mb N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from fixtures import PKG_DIR, bench_env, make_project, wait_for
+
+sys.path.insert(0, PKG_DIR)
+
+from clrun.buffer.buffer_manager import get_buffer_size  # noqa: E402
+from clrun.pty.backend import BACKENDS  # noqa: E402
+from clrun.pty.pty_manager import generate_terminal_id, read_session  # noqa: E402
+from clrun.queue.queue_engine import init_queue  # noqa: E402
+from clrun.runtime.spawn import spawn_worker  # noqa: E402
+
+MB = 1 << 20
+LIBRARY = {"pexpect": "pexpect", "stdlib": "pty"}
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); {imports}; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+
+def _import_ms(imports: str, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET.format(imports=imports)],
+            env=bench_env(), capture_output=True, text=True, check=True,
+        ).stdout
+        samples.append(float(out))
+    return round(statistics.median(samples), 2)
+
+
+def _resident_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _spawn(root: str, command: str) -> str:
+    terminal_id = generate_terminal_id()
+    init_queue(terminal_id, root)
+    spawn_worker(terminal_id, command, root, root)
+    return terminal_id
+
+
+def _kill_workers(root: str, terminal_ids: List[str]) -> None:
+    for terminal_id in terminal_ids:
+        session = read_session(terminal_id, root)
+        if session and session.status == "running" and session.worker_pid:
+            try:
+                os.kill(session.worker_pid, signal.SIGTERM)
+            except OSError:
+                pass
+
+
+def _live(backend: str, opts: argparse.Namespace) -> Dict[str, Any]:
+    root = make_project()
+    spawned: List[str] = []
+    try:
+        rss, first_output = [], []
+        for _ in range(opts.workers):
+            start = time.perf_counter()
+            terminal_id = _spawn(root, "true")
+            spawned.append(terminal_id)
+            if not wait_for(lambda: get_buffer_size(terminal_id, root) > 0, 10.0):
+                raise RuntimeError("no output within 10s")
+            first_output.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.5)  # let every worker settle into its idle loop
+        for terminal_id in spawned:
+            session = read_session(terminal_id, root)
+            if session.pty_backend != backend:
+                raise RuntimeError(f"worker ran {session.pty_backend}, not {backend}")
+            rss.append(_resident_mb(session.worker_pid))
+
+        line = "x" * 78
+        lines = opts.ingest_mb * MB // (len(line) + 1)
+        expected = lines * (len(line) + 2)  # the pty turns each \n into \r\n
+        terminal_id = _spawn(root, f"yes {line} | head -n {lines}")
+        spawned.append(terminal_id)
+        if not wait_for(lambda: get_buffer_size(terminal_id, root) > 0, 10.0):
+            raise RuntimeError("no output within 10s")
+        start = time.perf_counter()
+        if not wait_for(lambda: get_buffer_size(terminal_id, root) >= expected, 300.0, poll=0.005):
+            raise RuntimeError("ingest did not finish within 300s")
+        elapsed = time.perf_counter() - start
+        return {
+            "rss_mb": round(statistics.median(rss), 1),
+            "first_output_ms": round(statistics.median(first_output), 2),
+            "ingest_mb_s": round(expected / MB / elapsed, 2),
+        }
+    finally:
+        _kill_workers(root, spawned)
+        time.sleep(0.2)
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def measure(backend: str, opts: argparse.Namespace) -> Dict[str, Any]:
+    os.environ["CLRUN_WORKER_PTY_BACKEND"] = backend
+    library = LIBRARY[backend]
+    return {
+        "backend": backend,
+        "import_ms": _import_ms(f"import clrun.worker, {library}", opts.repeat),
+        "library_ms": _import_ms(f"import {library}", opts.repeat),
+        **_live(backend, opts),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="Fresh interpreters per import measurement")
+    parser.add_argument("--workers", type=int, default=5, help="Live workers sampled for RSS")
+    parser.add_argument("--ingest-mb", type=int, default=16)
+    parser.add_argument("--shell", default="/bin/sh", help="$SHELL for the workers (default: /bin/sh)")
+    opts = parser.parse_args()
+    os.environ.update(bench_env())
+    os.environ["SHELL"] = opts.shell
+    os.environ.pop("CLRUN_WORKER_LAUNCHER", None)  # one interpreter per worker, so RSS is its own
+    print(json.dumps({
+        "benchmark": "pty_backends",
+        "results": [measure(backend, opts) for backend in BACKENDS],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the hot CLI path (`clrun <terminal_id>`).
+
+Builds a throwaway project containing one finished session (no worker
+needed), then measures:
+
+  * import budget — cumulative `python -X importtime` cost of everything the
+    command imports beyond a bare interpreter, in milliseconds;
+  * wall clock    — median time of `python -m clrun <id>`, and its overhead
+    over `python -c pass`;
+  * forbidden     — modules the fast path must never import (e.g. click).
+
+Prints a JSON report. With --check, exits 1 when a budget is exceeded so it
+can gate CI.
+
+Usage: python benchmarks/bench_startup.py [--runs N] [--check]
+                                         [--max-import-ms MS] [--max-overhead-ms MS]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Set, Tuple
+
+from fixtures import bench_env, make_project, add_session
+
+FORBIDDEN_MODULES = {"click", "pexpect", "subprocess", "socket", "clrun.runtime.metrics"}
+
+
+def _importtime(args: List[str], cwd: str) -> Tuple[Dict[str, int], Set[str]]:
+    """Top-level module -> cumulative import time (us), plus every module imported."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime"] + args,
+        cwd=cwd, env=bench_env(), capture_output=True, text=True,
+    )
+    top: Dict[str, int] = {}
+    modules: Set[str] = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, raw_name = line[len("import time:"):].split("|")
+        name = raw_name.strip()
+        modules.add(name)
+        # Nested imports are indented and already counted in their parent.
+        if not raw_name.startswith("   "):
+            top[name] = int(cumulative)
+    return top, modules
+
+
+def _wall(args: List[str], cwd: str, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=cwd, env=bench_env(), stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def run(runs: int) -> Dict[str, object]:
+    root = make_project()
+    terminal_id = add_session(root)
+    try:
+        cmd = ["-m", "clrun", terminal_id]
+        baseline, _ = _importtime(["-c", "pass"], root)
+        imports, modules = _importtime(cmd, root)
+        extra = {k: v for k, v in imports.items() if k not in baseline}
+
+        bare_ms = _wall(["-c", "pass"], root, runs)
+        cli_ms = _wall(cmd, root, runs)
+        return {
+            "benchmark": "startup",
+            "command": "clrun <terminal_id>",
+            "import_ms": round(sum(extra.values()) / 1000, 2),
+            "top_imports_ms": {
+                k: round(v / 1000, 2)
+                for k, v in sorted(extra.items(), key=lambda kv: -kv[1])[:8]
+            },
+            "wall_ms": round(cli_ms, 2),
+            "interpreter_ms": round(bare_ms, 2),
+            "overhead_ms": round(cli_ms - bare_ms, 2),
+            "forbidden_imported": sorted(FORBIDDEN_MODULES & modules),
+            "runs": runs,
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--check", action="store_true", help="exit 1 if a budget is exceeded")
+    parser.add_argument("--max-import-ms", type=float, default=90.0)
+    parser.add_argument("--max-overhead-ms", type=float, default=130.0)
+    opts = parser.parse_args()
+
+    report = run(opts.runs)
+    failures = []
+    if report["import_ms"] > opts.max_import_ms:
+        failures.append(f"import budget exceeded: {report['import_ms']} ms > {opts.max_import_ms} ms")
+    if report["overhead_ms"] > opts.max_overhead_ms:
+        failures.append(f"startup overhead exceeded: {report['overhead_ms']} ms > {opts.max_overhead_ms} ms")
+    if report["forbidden_imported"]:
+        failures.append(f"fast path imported: {', '.join(report['forbidden_imported'])}")
+    report["failures"] = failures
+
+    print(json.dumps(report, indent=2))
+    if opts.check and failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
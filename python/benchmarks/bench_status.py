@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+`clrun status` cost versus the number of sessions in a project.
+
+For each size, builds a fixture project of exited sessions (each with a
+queue of sent entries) and measures:
+
+  * scan_ms   - the pre-index path in-process: parse every session file
+                and every queue file (list_sessions + pending_count)
+  * index_ms  - load_index in-process (one read of .clrun/sessions.idx)
+  * rebuild_ms - first load, which builds the index from the files
+  * cli_ms    - median wall clock of `python -m clrun status --format json`
+
+Prints JSON.
+
+Usage: python benchmarks/bench_status.py [--sizes 100,1000,10000] [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from fixtures import PKG_DIR, bench_env, make_project, add_session, median_ms
+
+sys.path.insert(0, PKG_DIR)
+
+from clrun.pty.pty_manager import list_sessions  # noqa: E402
+from clrun.pty.session_index import load_index  # noqa: E402
+from clrun.queue.queue_engine import pending_count  # noqa: E402
+
+
+def measure(size: int, repeat: int) -> Dict[str, object]:
+    root = make_project()
+    try:
+        for _ in range(size):
+            add_session(root, buffer_lines=1, queue_entries=3)
+
+        def scan() -> List[int]:
+            return [pending_count(s.terminal_id, root) for s in list_sessions(root)]
+
+        start = time.perf_counter()
+        indexed = load_index(root)
+        rebuild_ms = round((time.perf_counter() - start) * 1000, 2)
+        assert len(indexed) == size
+
+        env = bench_env()
+
+        def cli() -> None:
+            subprocess.run(
+                [sys.executable, "-m", "clrun", "--format", "json", "status"],
+                cwd=root, env=env, capture_output=True, check=True,
+            )
+
+        return {
+            "sessions": size,
+            "scan_ms": median_ms(scan, repeat),
+            "index_ms": median_ms(lambda: load_index(root), repeat),
+            "rebuild_ms": rebuild_ms,
+            "cli_ms": median_ms(cli, repeat),
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=5)
+    opts = parser.parse_args()
+    sizes = [int(s) for s in opts.sizes.split(",") if s]
+    print(json.dumps({
+        "benchmark": "status_vs_sessions",
+        "results": [measure(size, opts.repeat) for size in sizes],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
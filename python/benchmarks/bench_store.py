@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Files versus SQLite state backend on the three hot workloads.
+
+For each session count, builds one fixture project, measures it on the
+files backend, migrates it with `clrun.store.migrate` and measures again:
+
+  * status_ms   - load_index (what `clrun status` reads)
+  * enqueue_ms  - per-call cost of enqueue_input on a session whose queue
+                  already holds --history sent entries
+  * query_ms    - read_events for one terminal in a ledger of
+                  --events-per-session events per session
+  * migrate_ms  - files -> sqlite migration of the whole project
+
+Prints JSON.
+
+Usage: python benchmarks/bench_store.py [--sizes 100,1000] [--history 200]
+                                        [--events-per-session 10] [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import sys
+import time
+from typing import Dict, List
+
+from fixtures import PKG_DIR, make_project, add_session, median_ms
+
+sys.path.insert(0, PKG_DIR)
+
+from clrun.ledger.ledger import log_event, read_events  # noqa: E402
+from clrun.pty.session_index import load_index  # noqa: E402
+from clrun.queue.queue_engine import enqueue_input  # noqa: E402
+from clrun.store.migrate import migrate  # noqa: E402
+
+ENQUEUES = 50
+
+
+def _workloads(root: str, ids: List[str], repeat: int) -> Dict[str, float]:
+    target = ids[len(ids) // 2]
+
+    def enqueue() -> None:
+        for i in range(ENQUEUES):
+            enqueue_input(target, f"echo {i}", 0, root)
+
+    return {
+        "status_ms": median_ms(lambda: load_index(root), repeat, 3),
+        "enqueue_ms": round(median_ms(enqueue, repeat, 3) / ENQUEUES, 3),
+        "query_ms": median_ms(lambda: read_events(root, terminal_id=target), repeat, 3),
+    }
+
+
+def measure(size: int, history: int, events: int, repeat: int) -> Dict[str, object]:
+    root = make_project()
+    try:
+        ids = [add_session(root, buffer_lines=1, queue_entries=history) for _ in range(size)]
+        for _ in range(events):
+            for tid in ids:
+                log_event("input.sent", root, tid, {"input": "echo hi"})
+        load_index(root)  # build the index outside the timings
+
+        files = _workloads(root, ids, repeat)
+        start = time.perf_counter()
+        migrate(root, "sqlite")
+        migrate_ms = round((time.perf_counter() - start) * 1000, 2)
+        sqlite = _workloads(root, ids, repeat)
+        return {"sessions": size, "events": size * events, "files": files, "sqlite": sqlite,
+                "migrate_ms": migrate_ms}
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000")
+    parser.add_argument("--history", type=int, default=200)
+    parser.add_argument("--events-per-session", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    opts = parser.parse_args()
+    sizes = [int(s) for s in opts.sizes.split(",") if s]
+    print(json.dumps({
+        "benchmark": "state_backends",
+        "results": [measure(size, opts.history, opts.events_per_session, opts.repeat) for size in sizes],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Throwaway project fixtures for the benchmarks (no live workers needed)."""
+
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def bench_env() -> Dict[str, str]:
+    """Environment for subprocesses that must import this checkout of clrun."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = PKG_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def median_ms(fn: Callable[[], object], repeat: int, digits: int = 2) -> float:
+    """Median wall time of `repeat` calls of `fn`, in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), digits)
+
+
+def wait_for(predicate: Callable[[], bool], timeout: float, poll: float = 0.001) -> bool:
+    """Poll `predicate` until it is true; False after `timeout` seconds."""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if predicate():
+            return True
+        time.sleep(poll)
+    return False
+
+
+def make_project() -> str:
+    root = tempfile.mkdtemp(prefix="clrun-bench-")
+    open(os.path.join(root, "pyproject.toml"), "w").close()
+    for d in ("sessions", "queues", "buffers", "ledger", "skills"):
+        os.makedirs(os.path.join(root, ".clrun", d))
+    return root
+
+
+def add_session(
+    root: str,
+    status: str = "exited",
+    buffer_lines: int = 200,
+    queue_entries: int = 0,
+    terminal_id: Optional[str] = None,
+) -> str:
+    """Write one session (metadata, queue and buffer) into a fixture project."""
+    terminal_id = terminal_id or str(uuid.uuid4())
+    clrun = os.path.join(root, ".clrun")
+    session = {
+        "terminal_id": terminal_id,
+        "created_at": "2026-01-01T00:00:00+00:00",
+        "cwd": root,
+        "command": f"seq 1 {buffer_lines}",
+        "shell": "/bin/sh",
+        "status": status,
+        "pid": 0,
+        "worker_pid": 0,
+        "queue_length": 0,
+        "last_exit_code": 0 if status == "exited" else None,
+        "last_activity_at": "2026-01-01T00:00:01+00:00",
+    }
+    with open(os.path.join(clrun, "sessions", f"{terminal_id}.json"), "w") as f:
+        json.dump(session, f)
+    entries: List[Dict[str, object]] = [
+        {
+            "queue_id": str(uuid.uuid4()),
+            "input": f"echo {i}",
+            "priority": 0,
+            "mode": "normal",
+            "status": "sent",
+            "created_at": "2026-01-01T00:00:00+00:00",
+            "sent_at": "2026-01-01T00:00:00.1+00:00",
+        }
+        for i in range(queue_entries)
+    ]
+    with open(os.path.join(clrun, "queues", f"{terminal_id}.json"), "w") as f:
+        json.dump({"terminal_id": terminal_id, "entries": entries}, f)
+    with open(os.path.join(clrun, "buffers", f"{terminal_id}.log"), "w") as f:
+        f.write("".join(f"line {i}\r\n" for i in range(buffer_lines)))
+    return terminal_id
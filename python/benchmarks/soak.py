@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Multi-agent load generator and soak test against real clrun workers.
+
+Starts --sessions sessions, split across workloads by --workloads weights:
+
+  chatty - a shell loop that prints continuously (inputs queue up behind it)
+  repl   - an interactive python3 REPL
+  idle   - a shell at its prompt (it suspends after the idle timeout, and
+           inputs restore it)
+
+Then --agents threads each issue operations at --rate ops/s (exponential
+inter-arrival times; late operations are counted as lag, not skipped)
+with the --mix weights, through clrun.api.Client:
+
+  input  - Client.input(..., wait=0) with a unique marker
+  key    - Client.key(..., "enter", wait=0)
+  tail   - Client.tail(..., 50)
+  status - Client.status()
+
+A tracker follows the ledger for input.sent and scans the buffers of the
+repl and idle sessions for each input's marker, which gives:
+
+  * queue latency     - enqueue to the worker's input.sent
+  * delivery latency  - enqueue to the command's output in the buffer
+  * lost inputs       - not sent, or (repl/idle) not echoed, within
+                        --input-deadline
+
+Every --sample-interval it samples each worker's RSS and open fds from
+/proc, prints a progress line to stderr and, with --samples FILE, appends
+a JSON line with the interval's latencies. At the end it kills the
+sessions and prints a JSON summary, including RSS and fd growth per worker.
+
+Usage: python benchmarks/soak.py [--sessions N] [--agents M] [--rate OPS] [--duration 1h]
+                                 [--workloads chatty=1,repl=1,idle=1]
+                                 [--mix input=4,key=1,tail=4,status=1]
+                                 [--sample-interval 10s] [--samples FILE] [--project DIR]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fixtures import PKG_DIR, bench_env, make_project
+
+sys.path.insert(0, PKG_DIR)
+
+from clrun.api import Client, ClrunError  # noqa: E402
+from clrun.ledger.follow import LedgerFollower  # noqa: E402
+from clrun.pty.pty_manager import read_session  # noqa: E402
+from clrun.runtime.metrics import Histogram  # noqa: E402
+from clrun.utils.paths import buffer_path  # noqa: E402
+from clrun.utils.timespec import parse_duration  # noqa: E402
+
+# command, input template ({k} is the marker number), whether the input's output is expected
+WORKLOADS: Dict[str, Tuple[str, str, bool]] = {
+    "chatty": ("while :; do seq 1 100; sleep 0.2; done", "echo soak-{k}", False),
+    # The echoed input line never contains "soak-<k>"; only the output does.
+    "repl": ("python3 -q", 'print("soak" "-{k}")', True),
+    "idle": ("true", 'echo soak""-{k}', True),
+}
+OPS = ("input", "key", "tail", "status")
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def _weights(text: str, choices: Tuple[str, ...]) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in choices:
+            raise SystemExit(f"unknown name {name!r} (choose from {', '.join(choices)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def _resident_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _open_fds(pid: int) -> Optional[int]:
+    try:
+        return len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        return None
+
+
+class Pending:
+    __slots__ = ("terminal_id", "marker", "queued_at", "sent_at", "echoes")
+
+    def __init__(self, terminal_id: str, marker: str, echoes: bool) -> None:
+        self.terminal_id = terminal_id
+        self.marker = marker
+        self.queued_at = time.time()
+        self.sent_at: Optional[float] = None
+        self.echoes = echoes
+
+
+class Soak:
+    def __init__(self, opts: argparse.Namespace, root: str) -> None:
+        self.opts = opts
+        self.root = root
+        self.client = Client(root)
+        self.sessions: Dict[str, str] = {}  # terminal_id -> workload
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.latency = {op: Histogram() for op in OPS}
+        self.interval = {op: Histogram() for op in OPS}
+        self.queue_latency = Histogram()
+        self.delivery_latency = Histogram()
+        self.errors: Dict[str, int] = {op: 0 for op in OPS}
+        self.error_samples: List[str] = []
+        self.lag = 0
+        self.pending: Dict[str, Pending] = {}  # queue_id -> Pending
+        self.lost = {"unsent": 0, "undelivered": 0}
+        self.markers = 0
+        self.workers: Dict[int, Dict[str, Any]] = {}  # worker pid -> first/last/max samples
+
+    # ─── Setup ───────────────────────────────────────────────────────────
+
+    def start_sessions(self) -> None:
+        weights = _weights(self.opts.workloads, tuple(WORKLOADS))
+        total = sum(weights.values())
+        plan: List[str] = []
+        for name, weight in weights.items():
+            plan += [name] * round(self.opts.sessions * weight / total)
+        plan = (plan + list(weights) * self.opts.sessions)[: self.opts.sessions]
+
+        def start(workload: str) -> Tuple[str, str]:
+            return self.client.run(WORKLOADS[workload][0], wait=0).terminal_id, workload
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for terminal_id, workload in pool.map(start, plan):
+                self.sessions[terminal_id] = workload
+        time.sleep(1.0)  # let the shells reach their prompts
+
+    # ─── Agents ──────────────────────────────────────────────────────────
+
+    def agent(self, index: int) -> None:
+        rng = random.Random(self.opts.seed + index)
+        mix = _weights(self.opts.mix, OPS)
+        ops, weights = list(mix), list(mix.values())
+        terminals = list(self.sessions)
+        due = time.perf_counter()
+        while not self.stop.is_set():
+            due += rng.expovariate(self.opts.rate)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                if self.stop.wait(delay):
+                    return
+            else:
+                with self.lock:
+                    self.lag += 1
+            op = rng.choices(ops, weights)[0]
+            terminal_id = rng.choice(terminals)
+            start = time.perf_counter()
+            try:
+                self.call(op, terminal_id)
+            except Exception as e:  # a soak run records failures and keeps going
+                with self.lock:
+                    self.errors[op] += 1
+                    if len(self.error_samples) < 10:
+                        message = e.response.get("error") if isinstance(e, ClrunError) else repr(e)
+                        self.error_samples.append(f"{op}: {message}")
+                continue
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.latency[op].record(elapsed)
+                self.interval[op].record(elapsed)
+
+    def call(self, op: str, terminal_id: str) -> None:
+        if op == "input":
+            _, template, echoes = WORKLOADS[self.sessions[terminal_id]]
+            with self.lock:
+                self.markers += 1
+                k = self.markers
+            pending = Pending(terminal_id, f"soak-{k}", echoes)
+            result = self.client.input(terminal_id, template.format(k=k), wait=0)
+            if result.queue_id:
+                with self.lock:
+                    self.pending[result.queue_id] = pending
+        elif op == "key":
+            self.client.key(terminal_id, "enter", wait=0)
+        elif op == "tail":
+            self.client.tail(terminal_id, 50)
+        else:
+            self.client.status()
+
+    # ─── Tracking ────────────────────────────────────────────────────────
+
+    def track(self) -> None:
+        follower = LedgerFollower(self.root, types=["input.sent"])
+        scanned: Dict[str, int] = {}
+        carry: Dict[str, str] = {}
+        while not self.stop.wait(0.025):
+            now = time.time()
+            sent = follower.poll()
+            with self.lock:
+                for entry in sent:
+                    p = self.pending.get((entry.get("data") or {}).get("queue_id", ""))
+                    if p is None or p.sent_at is not None:
+                        continue
+                    try:
+                        p.sent_at = datetime.fromisoformat(entry["timestamp"]).timestamp()
+                    except (KeyError, ValueError):
+                        p.sent_at = now
+                    self.queue_latency.record(max(p.sent_at - p.queued_at, 0.0))
+                    if not p.echoes:
+                        del self.pending[(entry.get("data") or {})["queue_id"]]
+                watched = {p.terminal_id for p in self.pending.values() if p.echoes and p.sent_at}
+            for terminal_id in watched:
+                text = self._read_new(terminal_id, scanned, carry)
+                if not text:
+                    continue
+                seen = time.time()
+                with self.lock:
+                    for qid, p in list(self.pending.items()):
+                        # Markers are followed by \r\n, so soak-1 never matches soak-12.
+                        if p.terminal_id == terminal_id and p.sent_at and p.marker + "\r" in text:
+                            self.delivery_latency.record(max(seen - p.queued_at, 0.0))
+                            del self.pending[qid]
+            with self.lock:
+                for qid, p in list(self.pending.items()):
+                    if now - p.queued_at > self.opts.input_deadline:
+                        self.lost["undelivered" if p.sent_at else "unsent"] += 1
+                        del self.pending[qid]
+
+    def _read_new(self, terminal_id: str, scanned: Dict[str, int], carry: Dict[str, str]) -> str:
+        try:
+            with open(buffer_path(terminal_id, self.root), "rb") as f:
+                f.seek(scanned.get(terminal_id, 0))
+                data = f.read()
+        except OSError:
+            return ""
+        if not data:
+            return ""
+        scanned[terminal_id] = scanned.get(terminal_id, 0) + len(data)
+        text = carry.get(terminal_id, "") + data.decode("utf-8", "replace")
+        carry[terminal_id] = text[-64:]
+        return text
+
+    # ─── Sampling ────────────────────────────────────────────────────────
+
+    def sample(self, elapsed: float) -> Dict[str, Any]:
+        rss: List[float] = []
+        fds: List[int] = []
+        statuses: Dict[str, int] = {}
+        for terminal_id in self.sessions:
+            session = read_session(terminal_id, self.root)
+            status = session.status if session else "missing"
+            statuses[status] = statuses.get(status, 0) + 1
+            if not session or status != "running" or not session.worker_pid:
+                continue
+            pid = session.worker_pid
+            mb, n = _resident_mb(pid), _open_fds(pid)
+            if mb is None or n is None:
+                continue
+            rss.append(mb)
+            fds.append(n)
+            seen = self.workers.setdefault(pid, {"terminal_id": terminal_id, "first_rss_mb": mb,
+                                                 "first_fds": n, "max_rss_mb": mb, "max_fds": n})
+            seen.update(last_rss_mb=mb, last_fds=n, max_rss_mb=max(seen["max_rss_mb"], mb),
+                        max_fds=max(seen["max_fds"], n))
+        with self.lock:
+            interval = {op: h.summary() for op, h in self.interval.items() if h.count}
+            self.interval = {op: Histogram() for op in OPS}
+            record = {
+                "elapsed_s": round(elapsed, 1),
+                "latency": interval,
+                "queue_latency_p99_ms": self.queue_latency.summary()["p99_ms"],
+                "delivery_latency_p99_ms": self.delivery_latency.summary()["p99_ms"],
+                "lost": dict(self.lost),
+                "in_flight": len(self.pending),
+                "lag": self.lag,
+                "errors": dict(self.errors),
+            }
+        record["sessions"] = statuses
+        record["workers"] = {
+            "sampled": len(rss),
+            "rss_mb_total": round(sum(rss), 1),
+            "rss_mb_max": round(max(rss), 1) if rss else 0.0,
+            "fds_max": max(fds) if fds else 0,
+        }
+        record["harness_fds"] = _open_fds(os.getpid())
+        return record
+
+    # ─── Run ─────────────────────────────────────────────────────────────
+
+    def run(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        threads = [threading.Thread(target=self.track, daemon=True)]
+        threads += [threading.Thread(target=self.agent, args=(i,), daemon=True) for i in range(self.opts.agents)]
+        for t in threads:
+            t.start()
+        samples = open(self.opts.samples, "a", encoding="utf-8") if self.opts.samples else None
+        try:
+            deadline = started + self.opts.duration
+            while not self.stop.is_set():
+                remaining = deadline - time.perf_counter()
+                if self.stop.wait(min(self.opts.sample_interval, max(remaining, 0))) or remaining <= 0:
+                    break
+                record = self.sample(time.perf_counter() - started)
+                if samples:
+                    samples.write(json.dumps(record) + "\n")
+                    samples.flush()
+                lat = record["latency"]
+                sys.stderr.write(
+                    f"[{record['elapsed_s']:>7.0f}s] "
+                    + " ".join(f"{op} p99={lat[op]['p99_ms']}ms" for op in OPS if op in lat)
+                    + f" lost={sum(record['lost'].values())} rss={record['workers']['rss_mb_total']}MB"
+                    + f" fds<={record['workers']['fds_max']}\n"
+                )
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop.set()
+            if samples:
+                samples.close()
+        for t in threads:
+            t.join(timeout=5)
+        final = self.sample(time.perf_counter() - started)
+        return self.summary(time.perf_counter() - started, final)
+
+    def summary(self, elapsed: float, final: Dict[str, Any]) -> Dict[str, Any]:
+        rss_growth = [w["last_rss_mb"] - w["first_rss_mb"] for w in self.workers.values()]
+        fd_growth = [w["last_fds"] - w["first_fds"] for w in self.workers.values()]
+        ops = {op: h.count for op, h in self.latency.items()}
+        return {
+            "benchmark": "soak",
+            "duration_s": round(elapsed, 1),
+            "sessions": self.opts.sessions,
+            "workloads": self.opts.workloads,
+            "agents": self.opts.agents,
+            "target_ops_per_s": self.opts.rate * self.opts.agents,
+            "achieved_ops_per_s": round(sum(ops.values()) / elapsed, 2),
+            "ops": ops,
+            "errors": self.errors,
+            "error_samples": self.error_samples,
+            "lag": self.lag,
+            "latency": {op: h.summary() for op, h in self.latency.items() if h.count},
+            "queue_latency": self.queue_latency.summary(),
+            "delivery_latency": self.delivery_latency.summary(),
+            "inputs": self.markers,
+            "lost_inputs": self.lost,
+            "in_flight_at_end": len(self.pending),
+            "final_sessions": final["sessions"],
+            "workers": {
+                "sampled": len(self.workers),
+                "rss_growth_mb_max": round(max(rss_growth), 2) if rss_growth else 0.0,
+                "rss_growth_mb_median": round(statistics.median(rss_growth), 2) if rss_growth else 0.0,
+                "rss_mb_max": round(max((w["max_rss_mb"] for w in self.workers.values()), default=0.0), 1),
+                "fd_growth_max": max(fd_growth, default=0),
+                "fds_max": max((w["max_fds"] for w in self.workers.values()), default=0),
+            },
+        }
+
+    def teardown(self) -> None:
+        for terminal_id in self.sessions:
+            session = read_session(terminal_id, self.root)
+            if session and session.status == "running":
+                try:
+                    self.client.kill(terminal_id)
+                except ClrunError:
+                    pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--agents", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=2.0, help="operations per second per agent")
+    parser.add_argument("--duration", default="5m")
+    parser.add_argument("--workloads", default="chatty=1,repl=1,idle=1")
+    parser.add_argument("--mix", default="input=4,key=1,tail=4,status=1")
+    parser.add_argument("--input-deadline", type=float, default=10.0, help="seconds before an input counts as lost")
+    parser.add_argument("--sample-interval", default="10s")
+    parser.add_argument("--samples", help="append one JSON line per sample interval to this file")
+    parser.add_argument("--project", help="run in this project directory instead of a throwaway one")
+    parser.add_argument("--seed", type=int, default=1)
+    opts = parser.parse_args()
+    opts.duration = parse_duration(opts.duration) or 0.0
+    opts.sample_interval = parse_duration(opts.sample_interval) or 10.0
+
+    os.environ["PYTHONPATH"] = bench_env()["PYTHONPATH"]  # for the workers
+    os.environ["SHELL"] = "/bin/sh"
+    root = os.path.abspath(opts.project) if opts.project else make_project()
+    soak = Soak(opts, root)
+    try:
+        soak.start_sessions()
+        print(json.dumps(soak.run(), indent=2))
+    finally:
+        soak.teardown()
+        if not opts.project:
+            time.sleep(0.5)
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
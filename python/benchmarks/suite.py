@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+The clrun benchmark suite: one JSON report covering every hot path, and a
+comparison mode that flags regressions between two reports.
+
+Cases (run offline on Linux; live cases spawn real workers under /bin/sh):
+
+  spawn    - `clrun run` latency: spawn_worker to first output, in-process,
+             and the wall clock of `python -m clrun 'echo ready'`
+  input    - input round trip on a live session: enqueue + SIGUSR1 until
+             the command's output is in the buffer
+  ingest   - PTY output throughput through the worker's drain_output
+             (a live `yes | head` of --ingest-mb megabytes)
+  buffer   - tail / head / line count on buffers of --buffer-sizes bytes
+  ansi     - strip_ansi and clean_output throughput
+  queue    - enqueue / next / mark_sent / pending_count on a queue of
+             --queue-entries entries, per state backend
+  status   - `clrun status` at --sessions sessions (bench_status.measure)
+  ledger   - event append rate, per state backend (bench_ledger.measure)
+  scp      - SCP against a local stub server: connect (start_run +
+             get_cli) and an input round trip through the session-side
+             handler (clrun.scp.session.handle_scp_input: resolve the
+             option, transition, re-render into the session buffer)
+
+Metric names carry their unit: *_ms and *_us are lower-is-better,
+*_per_s and *_mb_s are higher-is-better; anything else is informational.
+
+Usage:
+  python benchmarks/suite.py [--only spawn,input,...] [--quick] [--output FILE]
+                             [--buffer-sizes 1M,64M,1G] [--ingest-mb N]
+                             [--queue-entries N] [--sessions N] [--repeat N]
+  python benchmarks/suite.py --compare BASE.json HEAD.json [--threshold 0.15]
+
+--compare exits 1 when any metric got worse by more than --threshold
+(relative), so it can gate CI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+from fixtures import PKG_DIR, add_session, bench_env, make_project, wait_for
+
+sys.path.insert(0, PKG_DIR)
+
+import bench_ledger  # noqa: E402
+import bench_status  # noqa: E402
+import clrun  # noqa: E402
+from clrun import store  # noqa: E402
+from clrun.buffer.buffer_manager import (  # noqa: E402
+    buffer_line_count, get_buffer_size, head_buffer, init_buffer, read_buffer_since, tail_buffer,
+)
+from clrun.pty.pty_manager import generate_terminal_id, read_session  # noqa: E402
+from clrun.queue.queue_engine import (  # noqa: E402
+    enqueue_input, get_next_queued, init_queue, mark_sent, pending_count, write_queue,
+)
+from clrun.runtime.spawn import spawn_worker  # noqa: E402
+from clrun.scp.client import SCPClient  # noqa: E402
+from clrun.scp.session import handle_scp_input  # noqa: E402
+from clrun.store import sqlite_store  # noqa: E402
+from clrun.types import QueueEntry, QueueFile  # noqa: E402
+from clrun.utils.output import clean_output, strip_ansi  # noqa: E402
+from clrun.utils.paths import buffer_path  # noqa: E402
+
+MB = 1024 * 1024
+LOWER_IS_BETTER = ("_ms", "_us")
+HIGHER_IS_BETTER = ("_per_s", "_mb_s")
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def _time(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _percentiles(name: str, samples: List[float]) -> Dict[str, float]:
+    """p50 and p95 of second-valued samples, as <name>_p50_ms / <name>_p95_ms."""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))]
+    return {f"{name}_p50_ms": _ms(statistics.median(ordered)), f"{name}_p95_ms": _ms(p95)}
+
+
+def _parse_size(text: str) -> int:
+    units = {"K": 1024, "M": MB, "G": 1024 * MB}
+    text = text.strip().upper()
+    if text[-1:] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+# ─── Live sessions ───────────────────────────────────────────────────────────
+
+
+class LiveProject:
+    """A fixture project whose sessions have real workers; kills them all on exit."""
+
+    def __init__(self) -> None:
+        self.root = make_project()
+
+    def spawn(self, command: str) -> str:
+        terminal_id = generate_terminal_id()
+        init_queue(terminal_id, self.root)
+        spawn_worker(terminal_id, command, self.root, self.root)
+        return terminal_id
+
+    def worker_pid(self, terminal_id: str) -> int:
+        if not wait_for(lambda: read_session(terminal_id, self.root) is not None, 10.0):
+            raise RuntimeError(f"worker for {terminal_id} never wrote its session")
+        return read_session(terminal_id, self.root).worker_pid
+
+    def size(self, terminal_id: str) -> int:
+        return get_buffer_size(terminal_id, self.root)
+
+    def __enter__(self) -> "LiveProject":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        sessions_dir = os.path.join(self.root, ".clrun", "sessions")
+        for name in os.listdir(sessions_dir):
+            if not name.endswith(".json"):
+                continue
+            session = read_session(name[:-5], self.root)
+            if session and session.status == "running" and session.worker_pid:
+                try:
+                    os.kill(session.worker_pid, signal.SIGTERM)
+                except OSError:
+                    pass
+        time.sleep(0.2)
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def case_spawn(opts: argparse.Namespace) -> Dict[str, Any]:
+    samples = []
+    with LiveProject() as live:
+        for _ in range(opts.repeat):
+            start = time.perf_counter()
+            terminal_id = live.spawn("echo ready")
+            if not wait_for(lambda: live.size(terminal_id) > 0, 10.0):
+                raise RuntimeError("no output within 10s")
+            samples.append(time.perf_counter() - start)
+        env = bench_env()
+        env["SHELL"] = "/bin/sh"
+        cli = [_time(lambda: subprocess.run(
+            [sys.executable, "-m", "clrun", "--format", "json", "echo ready"],
+            cwd=live.root, env=env, capture_output=True, check=True,
+        )) for _ in range(opts.repeat)]
+    return {**_percentiles("first_output", samples), "cli_run_ms": _ms(statistics.median(cli))}
+
+
+def case_input(opts: argparse.Namespace) -> Dict[str, Any]:
+    samples = []
+    with LiveProject() as live:
+        terminal_id = live.spawn("true")
+        worker_pid = live.worker_pid(terminal_id)
+        wait_for(lambda: live.size(terminal_id) > 0, 10.0)
+        time.sleep(0.3)
+        for i in range(opts.repeat * 4):
+            # The echoed command line does not contain the expected output.
+            expected = f"rtt-{7 * (i + 1000)}"
+            offset = live.size(terminal_id)
+            start = time.perf_counter()
+            enqueue_input(terminal_id, f"echo rtt-$((7 * {i + 1000}))", 0, live.root)
+            os.kill(worker_pid, signal.SIGUSR1)
+            if not wait_for(lambda: any(expected in line
+                                         for line in read_buffer_since(terminal_id, offset, live.root)), 10.0):
+                raise RuntimeError("input round trip timed out")
+            samples.append(time.perf_counter() - start)
+    return _percentiles("round_trip", samples)
+
+
+def case_ingest(opts: argparse.Namespace) -> Dict[str, Any]:
+    line = "x" * 78
+    lines = opts.ingest_mb * MB // (len(line) + 1)
+    expected = lines * (len(line) + 2)  # the pty turns each \n into \r\n
+    with LiveProject() as live:
+        terminal_id = live.spawn(f"yes {line} | head -n {lines}")
+        if not wait_for(lambda: live.size(terminal_id) > 0, 10.0):
+            raise RuntimeError("no output within 10s")
+        start = time.perf_counter()
+        if not wait_for(lambda: live.size(terminal_id) >= expected, 300.0, poll=0.005):
+            raise RuntimeError("ingest did not finish within 300s")
+        elapsed = time.perf_counter() - start
+    return {"bytes": expected, "ingest_ms": _ms(elapsed), "ingest_mb_s": round(expected / MB / elapsed, 2)}
+
+
+# ─── In-process cases ────────────────────────────────────────────────────────
+
+
+def _fill_buffer(path: str, size: int) -> None:
+    block = "".join(f"\x1b[32mINFO\x1b[0m line {i:07d} of the benchmark buffer\r\n" for i in range(4096))
+    data = block.encode("utf-8")
+    with open(path, "wb") as f:
+        written = 0
+        while written < size:
+            chunk = data[: size - written]
+            f.write(chunk)
+            written += len(chunk)
+
+
+def case_buffer(opts: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    root = make_project()
+    try:
+        terminal_id = add_session(root, buffer_lines=0)
+        for label in opts.buffer_sizes.split(","):
+            size = _parse_size(label)
+            _fill_buffer(buffer_path(terminal_id, root), size)
+            repeat = max(1, opts.repeat if size <= 64 * MB else 1)
+            for name, fn in (("tail", lambda: tail_buffer(terminal_id, 50, root)),
+                             ("head", lambda: head_buffer(terminal_id, 50, root)),
+                             ("line_count", lambda: buffer_line_count(terminal_id, root))):
+                results[f"{name}_{label.strip().lower()}_ms"] = _ms(statistics.median(
+                    _time(fn) for _ in range(repeat)))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def case_ansi(opts: argparse.Namespace) -> Dict[str, Any]:
+    lines = [f"\x1b[1;32m✔\x1b[0m \x1b[2mstep {i}\x1b[22m compiled \x1b[36msrc/module_{i}.ts\x1b[39m\r"
+             for i in range(opts.ansi_lines)]
+    text = "\n".join(lines)
+    size_mb = len(text.encode("utf-8")) / MB
+    strip_s = statistics.median(_time(lambda: strip_ansi(text)) for _ in range(opts.repeat))
+    clean_s = statistics.median(_time(lambda: clean_output(lines, None)) for _ in range(opts.repeat))
+    return {"input_mb": round(size_mb, 2),
+            "strip_ansi_mb_s": round(size_mb / strip_s, 2),
+            "clean_output_mb_s": round(size_mb / clean_s, 2)}
+
+
+def _queue(terminal_id: str, entries: int) -> QueueFile:
+    now = datetime.now(timezone.utc).isoformat()
+    return QueueFile(terminal_id=terminal_id, entries=[
+        QueueEntry(queue_id=str(uuid.uuid4()), input=f"echo {i}", priority=0, mode="normal",
+                   status="queued", created_at=now)
+        for i in range(entries)
+    ])
+
+
+def case_queue(opts: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, Any] = {"entries": opts.queue_entries}
+    for backend in store.BACKENDS:
+        root = make_project()
+        try:
+            with store.forced_backend(root, backend):
+                terminal_id = add_session(root, buffer_lines=0)
+                init_queue(terminal_id, root)
+                write_queue(terminal_id, _queue(terminal_id, opts.queue_entries), root)
+                samples: Dict[str, List[float]] = {"enqueue": [], "next": [], "mark_sent": [], "pending": []}
+                for i in range(opts.repeat):
+                    samples["enqueue"].append(_time(lambda: enqueue_input(terminal_id, f"echo {i}", 0, root)))
+                    holder: List[Any] = []
+                    samples["next"].append(_time(lambda: holder.append(get_next_queued(terminal_id, root))))
+                    samples["mark_sent"].append(_time(lambda: mark_sent(terminal_id, holder[0].queue_id, root)))
+                    samples["pending"].append(_time(lambda: pending_count(terminal_id, root)))
+                for name, values in samples.items():
+                    results[f"{backend}_{name}_ms"] = _ms(statistics.median(values))
+        finally:
+            sqlite_store.close(root)
+            shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def case_status(opts: argparse.Namespace) -> Dict[str, Any]:
+    return bench_status.measure(opts.sessions, opts.repeat)
+
+
+def case_ledger(opts: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, Any] = {"events": opts.events}
+    for backend in store.BACKENDS:
+        measured = bench_ledger.measure(backend, opts.events)
+        results[f"{backend}_per_event_per_s"] = measured["per_event_per_s"]
+        results[f"{backend}_buffered_per_s"] = measured["buffered_per_s"]
+    return results
+
+
+# ─── SCP ─────────────────────────────────────────────────────────────────────
+
+
+def _scp_stub() -> Any:
+    """A loopback SCP server with one endless `next` transition per run."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    runs: Dict[str, int] = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, body: Dict[str, Any]) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _frame(self, run_id: str) -> Dict[str, Any]:
+            return {"run_id": run_id, "state": f"step-{runs[run_id]}",
+                    "next_states": [{"action": "next", "href": f"/runs/{run_id}/next"}]}
+
+        def do_GET(self) -> None:  # noqa: N802
+            parts = self.path.strip("/").split("/")
+            run_id = parts[1]
+            if len(parts) == 3 and parts[2] == "cli":
+                self._send({"prompt": f"Step {runs[run_id]}", "hint": "Pick an option",
+                            "options": [{"action": "next", "label": "Next"}]})
+            else:
+                self._send(self._frame(run_id))
+
+        def do_POST(self) -> None:  # noqa: N802
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            parts = self.path.strip("/").split("/")
+            if parts == ["runs"]:
+                run_id = str(uuid.uuid4())
+                runs[run_id] = 0
+            else:
+                run_id = parts[1]
+                runs[run_id] += 1
+            self._send(self._frame(run_id))
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def case_scp(opts: argparse.Namespace) -> Dict[str, Any]:
+    server = _scp_stub()
+    root = make_project()
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        connect, step = [], []
+        for _ in range(opts.repeat * 4):
+            client = SCPClient(base)
+            connect.append(_time(lambda: (client.start_run(), client.get_cli())))
+            terminal_id = generate_terminal_id()
+            init_buffer(terminal_id, root)
+            run_id = client.get_run_id()
+            # What `clrun <id> next` does for an SCP session.
+            step.append(_time(lambda: handle_scp_input(terminal_id, "next", root, base, run_id)))
+    finally:
+        server.shutdown()
+        shutil.rmtree(root, ignore_errors=True)
+    return {**_percentiles("connect", connect), **_percentiles("input", step)}
+
+
+CASES: Dict[str, Callable[[argparse.Namespace], Dict[str, Any]]] = {
+    "spawn": case_spawn,
+    "input": case_input,
+    "ingest": case_ingest,
+    "buffer": case_buffer,
+    "ansi": case_ansi,
+    "queue": case_queue,
+    "status": case_status,
+    "ledger": case_ledger,
+    "scp": case_scp,
+}
+
+
+def run_suite(opts: argparse.Namespace) -> Dict[str, Any]:
+    os.environ["PYTHONPATH"] = bench_env()["PYTHONPATH"]  # for the workers spawn_worker starts
+    os.environ["SHELL"] = "/bin/sh"
+    names = [n.strip() for n in opts.only.split(",")] if opts.only else list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        raise SystemExit(f"unknown case(s): {', '.join(unknown)} (choose from {', '.join(CASES)})")
+    results: Dict[str, Any] = {}
+    for name in names:
+        start = time.perf_counter()
+        try:
+            results[name] = CASES[name](opts)
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+        sys.stderr.write(f"{name}: {time.perf_counter() - start:.1f}s\n")
+    return {
+        "suite": "clrun",
+        "version": clrun.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "options": {k: v for k, v in vars(opts).items() if k not in ("compare", "output", "threshold")},
+        "results": results,
+    }
+
+
+# ─── Comparison ──────────────────────────────────────────────────────────────
+
+
+def _direction(metric: str) -> int:
+    """+1 if bigger is better, -1 if smaller is better, 0 if informational."""
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    regressions, improvements, missing = [], [], []
+    unchanged = 0
+    for case, metrics in sorted(base.get("results", {}).items()):
+        head_metrics = head.get("results", {}).get(case)
+        if not isinstance(head_metrics, dict) or "error" in head_metrics:
+            missing.append(case)
+            continue
+        for metric, before in sorted(metrics.items()):
+            direction = _direction(metric)
+            after = head_metrics.get(metric)
+            if not direction or not isinstance(before, (int, float)) or not isinstance(after, (int, float)):
+                continue
+            if before <= 0:
+                continue
+            change = (after - before) / before
+            row = {"case": case, "metric": metric, "base": before, "head": after,
+                   "change_pct": round(change * 100, 1)}
+            if change * direction < -threshold:
+                regressions.append(row)
+            elif change * direction > threshold:
+                improvements.append(row)
+            else:
+                unchanged += 1
+    return {"threshold_pct": round(threshold * 100, 1), "regressions": regressions,
+            "improvements": improvements, "unchanged": unchanged, "missing": missing}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", default="", help="comma-separated cases to run")
+    parser.add_argument("--quick", action="store_true", help="small sizes, for a smoke run")
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--buffer-sizes", default="1M,64M")
+    parser.add_argument("--ingest-mb", type=int, default=16)
+    parser.add_argument("--ansi-lines", type=int, default=100_000)
+    parser.add_argument("--queue-entries", type=int, default=10_000)
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"))
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative change that counts (0.15 = 15%%)")
+    opts = parser.parse_args()
+
+    if opts.compare:
+        reports = []
+        for path in opts.compare:
+            with open(path, "r", encoding="utf-8") as f:
+                reports.append(json.load(f))
+        result = compare(reports[0], reports[1], opts.threshold)
+        print(json.dumps(result, indent=2))
+        sys.exit(1 if result["regressions"] else 0)
+
+    if opts.quick:
+        opts.repeat = min(opts.repeat, 3)
+        opts.buffer_sizes = "1M,8M"
+        opts.ingest_mb = 2
+        opts.ansi_lines = 10_000
+        opts.queue_entries = 1000
+        opts.sessions = 1000
+        opts.events = 5000
+
+    report = run_suite(opts)
+    text = json.dumps(report, indent=2)
+    if opts.output:
+        with open(opts.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
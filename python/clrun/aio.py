@@ -0,0 +1,322 @@
+"""Asyncio client for driving many clrun sessions from one event loop.
+
+    import asyncio
+    from clrun.aio import AsyncClient
+
+    async def main():
+        async with AsyncClient("/path/to/project") as client:
+            session = await client.run("python3 -i")
+            await session.input("print(6 * 7)")
+            await session.wait_for(r"^42$", timeout=5)
+            async for chunk in session.stream():
+                ...
+
+Every session of a client shares one watcher task that stats the watched
+buffer files and wakes the coroutines waiting on them, so hundreds of
+sessions cost one polling loop rather than a thread (or a poller) each.
+Polling starts at `poll_interval` and backs off to `max_poll_interval`
+while nothing changes. Input is delivered the same way as the CLI: queue
+the entry, then SIGUSR1 the worker. Client calls that touch the project
+state (run, input, key) run in the loop's default executor, so they do
+not block the loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import functools
+import os
+import re
+import time
+from typing import AsyncIterator, Dict, Optional, Pattern, Set, Union
+
+from clrun.api import Client, InputResult, KeyResult, RunResult
+from clrun.runtime.heartbeat import session_alive
+from clrun.types import SessionMetadata
+from clrun.utils.output import strip_ansi
+from clrun.utils.paths import buffer_path
+from clrun.buffer.buffer_manager import get_buffer_size
+
+__all__ = ["AsyncClient", "AsyncSession"]
+
+TERMINAL_STATUSES = {"exited", "killed", "detached", "suspended"}
+STATUS_CHECK_S = 1.0
+READ_CHUNK = 1 << 16
+# How far back from the end of a chunk an unfinished escape sequence is held.
+ANSI_OVERLAP = 256
+_ESCAPE_RE = re.compile(r"\x1b(?:\[[\x20-\x3f]*[\x40-\x7e]|\][^\x07\x1b]*(?:\x07|\x1b\\)|[^\[\]])")
+
+
+class _AnsiStripper:
+    """strip_ansi over a stream of chunks, touching each chunk once.
+
+    An escape sequence (or a CR) that may continue in the next chunk is
+    held back and stripped together with it; a backspace at the start of
+    a chunk erases the last character already returned.
+    """
+
+    def __init__(self) -> None:
+        self._held = ""
+
+    def feed(self, chunk: str, text: str) -> str:
+        """Stripped `text` (what came before `chunk`) followed by `chunk`, stripped."""
+        raw = self._held + chunk
+        cut = len(raw) - 1 if raw.endswith("\r") else len(raw)
+        pos = max(0, len(raw) - ANSI_OVERLAP)
+        while True:
+            esc = raw.find("\x1b", pos)
+            if esc < 0:
+                break
+            complete = _ESCAPE_RE.match(raw, esc)
+            if not complete:
+                cut = esc
+                break
+            pos = complete.end()
+        self._held = raw[cut:]
+        piece = raw[:cut]
+        while piece.startswith("\x08"):
+            piece, text = piece[1:], text[:-1]
+        return text + strip_ansi(piece)
+
+
+class _BufferWatcher:
+    """One polling task that wakes waiters when a watched buffer file grows."""
+
+    def __init__(self, poll_interval: float, max_poll_interval: float) -> None:
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self._sizes: Dict[str, int] = {}
+        self._waiters: Dict[str, Set[asyncio.Future]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._kick: Optional[asyncio.Event] = None
+
+    def start(self) -> asyncio.Event:
+        """Start the polling task (once) on the running loop; returns the event that wakes it."""
+        if self._task is None or self._kick is None:
+            # Created here, not in __init__: before Python 3.10 an Event binds
+            # to the current loop when it is constructed.
+            self._kick = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run(self._kick))
+        return self._kick
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for waiters in self._waiters.values():
+            for fut in waiters:
+                if not fut.done():
+                    fut.cancel()
+        self._waiters.clear()
+
+    async def changed(self, path: str, known_size: int, timeout: Optional[float]) -> bool:
+        """Wait until `path` is larger than `known_size`; False on timeout."""
+        try:
+            if os.path.getsize(path) > known_size:
+                return True
+        except OSError:
+            pass
+        kick = self.start()
+        fut = asyncio.get_running_loop().create_future()
+        self._sizes.setdefault(path, known_size)
+        self._waiters.setdefault(path, set()).add(fut)
+        kick.set()
+        try:
+            await asyncio.wait_for(fut, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            waiters = self._waiters.get(path)
+            if waiters is not None:
+                waiters.discard(fut)
+                if not waiters:
+                    del self._waiters[path]
+                    self._sizes.pop(path, None)
+
+    async def _run(self, kick: asyncio.Event) -> None:
+        interval = self.poll_interval
+        while True:
+            if not self._waiters:
+                kick.clear()
+                await kick.wait()
+                interval = self.poll_interval
+            try:
+                await asyncio.wait_for(kick.wait(), interval)
+                interval = self.poll_interval
+            except asyncio.TimeoutError:
+                pass
+            kick.clear()
+
+            activity = False
+            for path in list(self._waiters):
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                if size > self._sizes.get(path, 0):
+                    self._sizes[path] = size
+                    activity = True
+                    for fut in self._waiters.get(path, ()):
+                        if not fut.done():
+                            fut.set_result(size)
+            interval = self.poll_interval if activity else min(interval * 2, self.max_poll_interval)
+
+
+class AsyncSession:
+    """Handle on one session; all methods are safe to await concurrently across sessions."""
+
+    def __init__(self, client: "AsyncClient", terminal_id: str) -> None:
+        self.client = client
+        self.terminal_id = terminal_id
+        self._path = buffer_path(terminal_id, client.project_root)
+        self._mark: Optional[int] = None
+
+    def metadata(self) -> Optional[SessionMetadata]:
+        return self.client.sync.session(self.terminal_id)
+
+    def offset(self) -> int:
+        """Current end of the session's output buffer (bytes)."""
+        return get_buffer_size(self.terminal_id, self.client.project_root)
+
+    async def _call(self, method: str, *args: object, **kwargs: object) -> object:
+        """Run a sync Client operation with wait=0 in the default executor."""
+        self._mark = self.offset()
+        call = functools.partial(getattr(self.client.sync, method), self.terminal_id, *args, wait=0, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(None, call)
+
+    async def input(self, text: str, priority: int = 0, override: bool = False) -> InputResult:
+        """Queue `text` + Enter and notify the worker; does not wait for output.
+
+        A following wait_for() / stream() without an explicit offset starts
+        from the buffer position just before this input, so the response
+        cannot be missed. Suspended sessions are restored first.
+        """
+        return await self._call("input", text, priority=priority, override=override)
+
+    async def key(self, *keys: str) -> KeyResult:
+        """Send named keystrokes (see clrun.commands.key.KEY_MAP)."""
+        return await self._call("key", *keys)
+
+    async def stream(self, offset: Optional[int] = None, follow: bool = True) -> AsyncIterator[str]:
+        """Yield decoded output chunks from `offset`.
+
+        The default offset is where the last input()/key() (or run()) began,
+        or the current end of the buffer if there was none.
+
+        With follow=True, keeps waiting for new output until the session
+        stops running; otherwise stops at the current end of the buffer.
+        """
+        if offset is None:
+            offset = self.offset() if self._mark is None else self._mark
+        pos = offset
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        last_status_check = time.monotonic()
+        while True:
+            try:
+                with open(self._path, "rb") as f:
+                    f.seek(pos)
+                    while True:
+                        data = f.read(READ_CHUNK)
+                        if not data:
+                            break
+                        pos += len(data)
+                        text = decoder.decode(data)
+                        if text:
+                            yield text
+            except FileNotFoundError:
+                pass
+            if not follow:
+                return
+
+            grew = await self.client._watcher.changed(self._path, pos, STATUS_CHECK_S)
+            if not grew or time.monotonic() - last_status_check >= STATUS_CHECK_S:
+                last_status_check = time.monotonic()
+                session = self.metadata()
+                if session is None or session.status in TERMINAL_STATUSES or not session_alive(
+                    self.terminal_id, session.worker_pid, session.pid, self.client.project_root
+                ):
+                    if os.path.exists(self._path) and os.path.getsize(self._path) > pos:
+                        continue
+                    return
+
+    async def wait_for(
+        self,
+        pattern: Union[str, Pattern[str]],
+        timeout: Optional[float] = None,
+        offset: Optional[int] = None,
+        clean: bool = True,
+        window: int = 1 << 20,
+    ) -> re.Match:
+        """Wait until output after `offset` matches `pattern` (multiline regex).
+
+        ANSI sequences are stripped before matching unless clean=False; each
+        chunk is stripped once, as it arrives. Only the last `window`
+        characters are kept for matching. Raises asyncio.TimeoutError, or
+        EOFError if the session stops first.
+        """
+        regex = re.compile(pattern, re.MULTILINE) if isinstance(pattern, str) else pattern
+
+        async def _scan() -> re.Match:
+            seen = ""
+            stripper = _AnsiStripper() if clean else None
+            async for chunk in self.stream(offset=offset):
+                seen = (stripper.feed(chunk, seen) if stripper else seen + chunk)[-window:]
+                match = regex.search(seen)
+                if match:
+                    return match
+            raise EOFError(f"Session {self.terminal_id} stopped before output matched {regex.pattern!r}")
+
+        return await asyncio.wait_for(_scan(), timeout)
+
+    async def wait_exit(self, timeout: Optional[float] = None) -> Optional[int]:
+        """Wait until the session stops running; returns its exit code."""
+        async def _wait() -> Optional[int]:
+            async for _ in self.stream(offset=self.offset()):
+                pass
+            session = self.metadata()
+            return session.last_exit_code if session else None
+
+        return await asyncio.wait_for(_wait(), timeout)
+
+
+class AsyncClient:
+    """Asyncio entry point; use as `async with AsyncClient(root) as client`."""
+
+    def __init__(
+        self,
+        project_root: Optional[str] = None,
+        cwd: Optional[str] = None,
+        poll_interval: float = 0.01,
+        max_poll_interval: float = 0.2,
+    ) -> None:
+        self.sync = Client(project_root, cwd)
+        self.project_root = self.sync.project_root
+        self._watcher = _BufferWatcher(poll_interval, max_poll_interval)
+
+    async def __aenter__(self) -> "AsyncClient":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self._watcher.stop()
+
+    def session(self, terminal_id: str) -> AsyncSession:
+        """Handle on an existing session; raises ClrunError if it does not exist."""
+        self.sync._require(terminal_id)
+        return AsyncSession(self, terminal_id)
+
+    async def run(self, command: str, cwd: Optional[str] = None) -> AsyncSession:
+        """Start `command` in a new session; returns as soon as the worker is launched."""
+        call = functools.partial(self.sync.run, command, cwd, wait=0)
+        result: RunResult = await asyncio.get_running_loop().run_in_executor(None, call)
+        session = AsyncSession(self, result.terminal_id)
+        session._mark = 0
+        return session
@@ -0,0 +1,503 @@
+"""In-process Python client for clrun.
+
+Python agents can drive sessions without forking a `clrun` process per step
+and parsing YAML back. The client calls the same engines as the CLI
+(queue_engine, buffer_manager, pty_manager, the worker launcher) and
+returns typed dataclasses. Errors raise ClrunError carrying the same
+`error` / `hints` dict the CLI would print.
+
+    from clrun.api import Client
+
+    client = Client("/path/to/project")
+    run = client.run("python3 -i")
+    client.input(run.terminal_id, "print(6 * 7)", wait=1.0)
+    print(client.tail(run.terminal_id, 20).output)
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from clrun.types import SessionMetadata
+from clrun.utils.paths import resolve_project_root, ensure_clrun_dirs, get_clrun_paths
+from clrun.utils.output import clean_output
+from clrun.utils.validate import (
+    validate_command,
+    validate_input,
+    check_output_quality,
+    session_not_found_error,
+    session_not_running_error,
+)
+from clrun.pty.pty_manager import generate_terminal_id, read_session, update_session, is_pty_alive
+from clrun.pty.session_index import SESSION_STATES, SORT_KEYS, load_index, query_index
+from clrun.utils.timespec import parse_time
+from clrun.queue.queue_engine import init_queue, enqueue_input, enqueue_override, pending_count
+from clrun.buffer.buffer_manager import (
+    get_buffer_size,
+    read_buffer_since,
+    tail_buffer,
+    head_buffer,
+    buffer_line_count,
+)
+from clrun.ledger.ledger import log_event
+from clrun.ledger.follow import LedgerFollower
+from clrun.ledger.query import last_events
+from clrun.runtime.lock_manager import acquire_lock
+from clrun.runtime.crash_recovery import recover_sessions
+from clrun.runtime.heartbeat import overlay, read_heartbeats, session_alive
+from clrun.runtime.retention import maybe_schedule as maybe_schedule_gc
+from clrun.runtime.pool import POOLED_POLL_S, start_worker
+from clrun.runtime.spawn import wait_for_initial_output
+
+__all__ = [
+    "Client",
+    "ClrunError",
+    "RunResult",
+    "InputResult",
+    "KeyResult",
+    "OutputResult",
+    "SessionInfo",
+    "StatusResult",
+]
+
+OUTPUT_POLL_S = 0.02
+OUTPUT_SETTLE_S = 0.05
+
+
+class ClrunError(Exception):
+    """A clrun operation failed; `response` holds the CLI's error/hints dict."""
+
+    def __init__(self, response: Dict[str, Any]) -> None:
+        super().__init__(response.get("error", "clrun error"))
+        self.response = response
+
+    @property
+    def hints(self) -> Dict[str, str]:
+        return self.response.get("hints", {})
+
+
+@dataclass
+class RunResult:
+    terminal_id: str
+    command: str
+    cwd: str
+    status: str
+    exit_code: Optional[int] = None
+    output: Optional[str] = None
+    warnings: List[str] = field(default_factory=list)
+
+
+@dataclass
+class InputResult:
+    terminal_id: str
+    input: str
+    mode: str
+    output: Optional[str] = None
+    warnings: List[str] = field(default_factory=list)
+    restored: bool = False
+    queue_id: Optional[str] = None
+    queue_pending: Optional[int] = None
+    cancelled_count: int = 0
+
+
+@dataclass
+class KeyResult:
+    terminal_id: str
+    keys: List[str]
+    output: Optional[str] = None
+
+
+@dataclass
+class OutputResult:
+    terminal_id: str
+    command: str
+    status: str
+    total_lines: int
+    exit_code: Optional[int] = None
+    output: Optional[str] = None
+    warnings: List[str] = field(default_factory=list)
+
+
+@dataclass
+class SessionInfo:
+    terminal_id: str
+    command: str
+    status: str
+    pid: int
+    queue_length: int
+    created_at: str
+    last_activity_at: str
+    exit_code: Optional[int] = None
+    suspended_at: Optional[str] = None
+    saved_cwd: Optional[str] = None
+
+
+@dataclass
+class StatusResult:
+    project: str
+    counts: Dict[str, int]
+    sessions: List[SessionInfo]
+    matched: int = 0
+    next_cursor: Optional[str] = None
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _signal_worker(pid: int) -> None:
+    try:
+        os.kill(pid, signal.SIGUSR1)
+    except OSError:
+        pass
+
+
+class Client:
+    """Drive clrun sessions of one project from the current Python process."""
+
+    def __init__(self, project_root: Optional[str] = None, cwd: Optional[str] = None) -> None:
+        self.project_root = os.path.abspath(project_root) if project_root else resolve_project_root()
+        self.cwd = cwd or self.project_root
+
+    # ─── Helpers ─────────────────────────────────────────────────────────
+
+    def session(self, terminal_id: str) -> Optional[SessionMetadata]:
+        """Raw session metadata, or None if the session does not exist."""
+        return read_session(terminal_id, self.project_root)
+
+    def _require(self, terminal_id: str) -> SessionMetadata:
+        session = self.session(terminal_id)
+        if not session:
+            raise ClrunError(session_not_found_error(terminal_id, self.project_root))
+        return session
+
+    def _require_live(self, session: SessionMetadata) -> None:
+        if session.status != "running":
+            raise ClrunError(session_not_running_error(session.terminal_id, session.status))
+        if not session_alive(session.terminal_id, session.worker_pid, project_root=self.project_root):
+            raise ClrunError({
+                "error": f"Session worker is not alive (PID: {session.worker_pid})",
+                "hints": {"check_status": "clrun status", "start_new": "clrun <command>"},
+            })
+
+    def _collect(
+        self, terminal_id: str, offset: int, wait: float, echo: Optional[str], context: str,
+        baseline: Optional[int] = None,
+    ) -> Tuple[Optional[str], List[str]]:
+        """Wait up to `wait` seconds for output past `offset` to settle, then clean it.
+
+        Output up to `baseline` (e.g. a restore marker) is returned but does
+        not count as the response having started.
+        """
+        deadline = time.monotonic() + wait
+        start = offset if baseline is None else baseline
+        last_size = start
+        last_change = time.monotonic()
+        while time.monotonic() < deadline:
+            time.sleep(OUTPUT_POLL_S)
+            size = get_buffer_size(terminal_id, self.project_root)
+            now = time.monotonic()
+            if size != last_size:
+                last_size, last_change = size, now
+            elif size > start and now - last_change >= OUTPUT_SETTLE_S:
+                break
+        lines = read_buffer_since(terminal_id, offset, self.project_root)
+        return check_output_quality(clean_output(lines, echo), context)
+
+    # ─── Operations ──────────────────────────────────────────────────────
+
+    def run(self, command: str, cwd: Optional[str] = None, wait: float = 5.0) -> RunResult:
+        """Start `command` in a new PTY session and wait up to `wait` s for its first output."""
+        if not command.strip():
+            raise ClrunError({"error": "No command provided.", "hints": {"usage": "clrun <command>"}})
+        from clrun.skills.installer import install_skills
+
+        cwd = cwd or self.cwd
+        cmd_check = validate_command(command)
+        ensure_clrun_dirs(self.project_root)
+        acquire_lock(self.project_root)
+        recover_sessions(self.project_root)
+        install_skills(self.project_root)
+        maybe_schedule_gc(self.project_root)
+
+        terminal_id = generate_terminal_id()
+        init_queue(terminal_id, self.project_root)
+        worker_pid, pooled = start_worker(terminal_id, command, cwd, self.project_root)
+        log_event("session.created", self.project_root, terminal_id, {
+            "command": command,
+            "cwd": cwd,
+            "worker_pid": worker_pid,
+            "pooled": pooled,
+        })
+
+        buffer_start = get_buffer_size(terminal_id, self.project_root)
+        status, exit_code = wait_for_initial_output(terminal_id, buffer_start, self.project_root, max_wait=wait,
+                                                    poll=POOLED_POLL_S if pooled else 0.15)
+        lines = read_buffer_since(terminal_id, buffer_start, self.project_root)
+        output, warnings = check_output_quality(clean_output(lines, command), "run response")
+        return RunResult(
+            terminal_id=terminal_id,
+            command=command,
+            cwd=cwd,
+            status=status,
+            exit_code=exit_code,
+            output=output,
+            warnings=cmd_check.warnings + warnings,
+        )
+
+    def input(
+        self,
+        terminal_id: str,
+        text: str,
+        priority: int = 0,
+        override: bool = False,
+        wait: float = 0.4,
+    ) -> InputResult:
+        """Queue `text` + Enter; suspended sessions are restored transparently."""
+        input_check = validate_input(text)
+        session = self._require(terminal_id)
+
+        if session.scp_run_id and session.scp_base_url:
+            from clrun.scp.session import handle_scp_input
+            result = handle_scp_input(
+                terminal_id, text, self.project_root, session.scp_base_url, session.scp_run_id,
+            )
+            return InputResult(terminal_id=terminal_id, input=text, mode="scp", output=result.get("output"))
+
+        restored = False
+        baseline: Optional[int] = None
+        if session.status == "suspended":
+            from clrun.runtime.restore import restore_session, wait_until_sent
+            buffer_before = get_buffer_size(terminal_id, self.project_root)
+            if override:
+                entry, cancelled = enqueue_override(terminal_id, text, self.project_root)
+            else:
+                entry, cancelled = enqueue_input(terminal_id, text, priority, self.project_root), 0
+            restore_session(terminal_id, self.project_root)
+            wait_until_sent(terminal_id, entry.queue_id, self.project_root)
+            baseline = get_buffer_size(terminal_id, self.project_root)
+            restored = True
+        else:
+            self._require_live(session)
+            buffer_before = get_buffer_size(terminal_id, self.project_root)
+            if override:
+                entry, cancelled = enqueue_override(terminal_id, text, self.project_root)
+                log_event("input.override", self.project_root, terminal_id, {
+                    "queue_id": entry.queue_id,
+                    "input": text,
+                    "cancelled_count": cancelled,
+                })
+            else:
+                entry, cancelled = enqueue_input(terminal_id, text, priority, self.project_root), 0
+                log_event("input.queued", self.project_root, terminal_id, {
+                    "queue_id": entry.queue_id,
+                    "input": text,
+                    "priority": priority,
+                })
+            _signal_worker(session.worker_pid)
+
+        output, warnings = self._collect(terminal_id, buffer_before, wait, text, "input response", baseline)
+        return InputResult(
+            terminal_id=terminal_id,
+            input=text,
+            mode="override" if override else "normal",
+            output=output,
+            warnings=input_check.warnings + warnings,
+            restored=restored,
+            queue_id=entry.queue_id,
+            queue_pending=None if override or restored else pending_count(terminal_id, self.project_root),
+            cancelled_count=cancelled,
+        )
+
+    def key(self, terminal_id: str, *keys: str, wait: float = 0.4) -> KeyResult:
+        """Send named keystrokes (see clrun.commands.key.KEY_MAP)."""
+        from clrun.commands.key import KEY_MAP, RAW_PREFIX
+
+        unknown = [k for k in keys if k.lower() not in KEY_MAP]
+        if unknown or not keys:
+            raise ClrunError({
+                "error": f"Unknown key name(s): {', '.join(unknown)}" if unknown else "No keys given.",
+                "hints": {"available_keys": ", ".join(KEY_MAP.keys())},
+            })
+
+        session = self._require(terminal_id)
+        if session.scp_run_id and session.scp_base_url:
+            raise ClrunError({"error": "SCP sessions use text input, not key sequences."})
+        if session.status == "suspended":
+            from clrun.runtime.restore import restore_session
+            restore_session(terminal_id, self.project_root)
+            session = self._require(terminal_id)
+        self._require_live(session)
+
+        sequence = "".join(KEY_MAP[k.lower()] for k in keys)
+        buffer_before = get_buffer_size(terminal_id, self.project_root)
+        enqueue_input(terminal_id, RAW_PREFIX + sequence, 999, self.project_root)
+        _signal_worker(session.worker_pid)
+        log_event("key.sent", self.project_root, terminal_id, {
+            "keys": list(keys),
+            "sequence_length": len(sequence),
+        })
+
+        output, _ = self._collect(terminal_id, buffer_before, wait, None, "key response")
+        return KeyResult(terminal_id=terminal_id, keys=list(keys), output=output)
+
+    def _read(self, terminal_id: str, lines: int, from_end: bool) -> OutputResult:
+        session = self._require(terminal_id)
+        reader = tail_buffer if from_end else head_buffer
+        raw = reader(terminal_id, lines, self.project_root)
+        output, warnings = check_output_quality(clean_output(raw), "tail output" if from_end else "head output")
+        return OutputResult(
+            terminal_id=terminal_id,
+            command=session.command,
+            status=session.status,
+            total_lines=buffer_line_count(terminal_id, self.project_root),
+            exit_code=session.last_exit_code,
+            output=output,
+            warnings=warnings,
+        )
+
+    def tail(self, terminal_id: str, lines: int = 50) -> OutputResult:
+        """Last `lines` lines of cleaned output."""
+        return self._read(terminal_id, lines, from_end=True)
+
+    def head(self, terminal_id: str, lines: int = 50) -> OutputResult:
+        """First `lines` lines of cleaned output."""
+        return self._read(terminal_id, lines, from_end=False)
+
+    def status(
+        self,
+        states: Optional[Sequence[str]] = None,
+        command: Optional[str] = None,
+        since: Optional[str] = None,
+        active_since: Optional[str] = None,
+        id_prefix: Optional[str] = None,
+        sort: str = "created",
+        desc: bool = False,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> StatusResult:
+        """Sessions of the project after crash recovery, filtered like `clrun status`.
+
+        `since` / `active_since` take ISO 8601 times or ages such as "2h".
+        `counts` always covers every session; pass `next_cursor` back as
+        `cursor` for the next page.
+        """
+        counts = {state: 0 for state in SESSION_STATES}
+        if not os.path.exists(get_clrun_paths(self.project_root).root):
+            return StatusResult(project=self.project_root, counts=counts, sessions=[])
+
+        unknown = [st for st in states or () if st not in SESSION_STATES]
+        if unknown or sort not in SORT_KEYS:
+            raise ClrunError({
+                "error": f"Unknown state(s): {', '.join(unknown)}" if unknown else f"Unknown sort key: {sort}",
+                "hints": {"valid_states": ", ".join(SESSION_STATES), "sort_keys": ", ".join(SORT_KEYS)},
+            })
+        recover_sessions(self.project_root)
+        index = overlay(load_index(self.project_root), read_heartbeats(self.project_root))
+        try:
+            page, matched, next_cursor = query_index(
+                index,
+                states=states,
+                command=command,
+                since=parse_time(since) if since else None,
+                active_since=parse_time(active_since) if active_since else None,
+                id_prefix=id_prefix,
+                sort=sort,
+                desc=desc,
+                limit=limit,
+                cursor=cursor,
+            )
+        except ValueError as e:
+            raise ClrunError({"error": str(e)}) from e
+
+        for s in index.values():
+            if s.get("status") in counts:
+                counts[s["status"]] += 1
+        sessions: List[SessionInfo] = []
+        for terminal_id, s in page:
+            suspended = s["status"] == "suspended"
+            sessions.append(SessionInfo(
+                terminal_id=terminal_id,
+                command=s.get("command", ""),
+                status=s["status"],
+                pid=s.get("pid", 0),
+                queue_length=s.get("queue_length", 0),
+                created_at=s.get("created_at", ""),
+                last_activity_at=s.get("last_activity_at", ""),
+                exit_code=s.get("last_exit_code"),
+                suspended_at=s.get("suspended_at") if suspended else None,
+                saved_cwd=s.get("saved_cwd") if suspended else None,
+            ))
+        return StatusResult(
+            project=self.project_root, counts=counts, sessions=sessions,
+            matched=matched, next_cursor=next_cursor,
+        )
+
+    def events(
+        self,
+        terminal_id: Optional[str] = None,
+        types: Optional[Sequence[str]] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """The most recent `limit` matching ledger events, oldest first (like `clrun events`)."""
+        try:
+            return last_events(self.project_root, limit, terminal_id, types,
+                               parse_time(since) if since else None, parse_time(until) if until else None)
+        except ValueError as e:
+            raise ClrunError({"error": str(e)}) from e
+
+    def follow_events(
+        self,
+        terminal_id: Optional[str] = None,
+        types: Optional[Sequence[str]] = None,
+        since: Optional[str] = None,
+        cursor: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield matching ledger events as they are logged.
+
+        Starts at the current end of the ledger, at `since`, or at a cursor
+        from LedgerFollower.cursor. Stops after `timeout` seconds without a
+        new event (None: never). Each check for new events is one stat()
+        of the ledger, so following costs O(new events), not O(ledger size).
+
+            for event in client.follow_events(types=["session.exited"]):
+                ...
+        """
+        try:
+            follower = LedgerFollower(self.project_root, terminal_id, types,
+                                      parse_time(since) if since else None, cursor)
+        except ValueError as e:
+            raise ClrunError({"error": str(e)}) from e
+        return follower.follow(timeout)
+
+    def kill(self, terminal_id: str) -> None:
+        """Terminate a session's worker and shell."""
+        session = self._require(terminal_id)
+        if session.status in ("exited", "killed"):
+            raise ClrunError({"error": f"Session already terminated (status: {session.status})"})
+
+        worker_killed = pty_killed = False
+        for pid, which in ((session.worker_pid, "worker"), (session.pid, "pty")):
+            if is_pty_alive(pid):
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                    if which == "worker":
+                        worker_killed = True
+                    else:
+                        pty_killed = True
+                except OSError:
+                    pass
+
+        update_session(terminal_id, {"status": "killed", "last_activity_at": _now_iso()}, self.project_root)
+        log_event("session.killed", self.project_root, terminal_id, {
+            "worker_killed": worker_killed,
+            "pty_killed": pty_killed,
+        })
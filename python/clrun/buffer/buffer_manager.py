@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import os
 
+from clrun.utils import cache
 from clrun.utils.paths import buffer_path
 
 
@@ -45,6 +46,9 @@ def buffer_line_count(terminal_id: str, project_root: str) -> int:
     fp = buffer_path(terminal_id, project_root)
     if not os.path.exists(fp):
         return 0
+    indexed = cache.line_count(fp)
+    if indexed is not None:
+        return indexed
     with open(fp, "r", encoding="utf-8") as f:
         content = f.read()
     if content == "":
@@ -1,123 +1,266 @@
-"""CLI entry point with Click commands and smart routing."""
+"""CLI entry point with smart routing and a Click-free fast path for hot commands."""
 
 from __future__ import annotations
 
+import os
 import re
 import sys
+import time
+from typing import Dict, List, Optional, Tuple
 
-import click
+UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE)
+KNOWN_COMMANDS = {"run", "input", "key", "tail", "head", "status", "kill", "policy", "events", "stats", "metrics", "gc", "migrate", "scp", "server", "help", "--help", "--version", "-h"}
+
+# Commands that are never forwarded to a runtime server.
+LOCAL_COMMANDS = {"server", "help"}
+# Options that make `events` stream (follow mode); the server replies once at the end, so these run locally.
+_STREAMING_EVENTS_OPTS = {"-f", "--follow", "--cursor"}
+
+
+# Option specs for the Click-free fast path: flag -> (dest, type); type None = boolean
+# flag, type list = repeatable string option.
+_LINES_OPTS: Dict[str, Tuple[str, Optional[type]]] = {"-n": ("lines", int), "--lines": ("lines", int)}
+_INPUT_OPTS: Dict[str, Tuple[str, Optional[type]]] = {
+    "-p": ("priority", int),
+    "--priority": ("priority", int),
+    "--override": ("override", None),
+}
+_STATUS_OPTS: Dict[str, Tuple[str, Optional[type]]] = {
+    "-s": ("states", list),
+    "--state": ("states", list),
+    "-c": ("command", str),
+    "--command": ("command", str),
+    "--since": ("since", str),
+    "--active-since": ("active_since", str),
+    "--id": ("id_prefix", str),
+    "--sort": ("sort", str),
+    "--desc": ("desc", None),
+    "--limit": ("limit", int),
+    "--cursor": ("cursor", str),
+}
+_STATUS_SORTS = {"created", "activity", "status", "command"}
+
+
+def _parse(
+    args: List[str], opts: Dict[str, Tuple[str, Optional[type]]]
+) -> Optional[Tuple[List[str], Dict[str, object]]]:
+    """Split args into positionals and options; None if anything is unusual.
+
+    Only the simple forms are accepted — anything else (help, `--`, unknown
+    or malformed options) returns None so Click can handle it and produce
+    its usual messages.
+    """
+    positional: List[str] = []
+    values: Dict[str, object] = {}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg.startswith("-") and arg != "-":
+            name, eq, inline = arg.partition("=")
+            if name not in opts:
+                return None
+            dest, typ = opts[name]
+            if typ is None:
+                if eq:
+                    return None
+                values[dest] = True
+            else:
+                if eq:
+                    raw = inline
+                elif i + 1 < len(args):
+                    i += 1
+                    raw = args[i]
+                else:
+                    return None
+                if typ is list:
+                    values.setdefault(dest, []).append(raw)  # type: ignore[union-attr]
+                    i += 1
+                    continue
+                try:
+                    values[dest] = typ(raw)
+                except ValueError:
+                    return None
+        else:
+            positional.append(arg)
+        i += 1
+    return positional, values
+
+
+def _fast_route(args: List[str]) -> bool:
+    """Run hot subcommands without importing Click. Returns False to defer to Click."""
+    cmd, rest = args[0], args[1:]
+
+    if cmd in ("tail", "head"):
+        parsed = _parse(rest, _LINES_OPTS)
+        if not parsed or len(parsed[0]) != 1:
+            return False
+        lines = int(parsed[1].get("lines", 50))  # type: ignore[arg-type]
+        if cmd == "tail":
+            from clrun.commands.tail import tail_command
+            tail_command(parsed[0][0], lines=lines)
+        else:
+            from clrun.commands.head import head_command
+            head_command(parsed[0][0], lines=lines)
+        return True
+
+    if cmd == "input":
+        parsed = _parse(rest, _INPUT_OPTS)
+        if not parsed or len(parsed[0]) != 2:
+            return False
+        from clrun.commands.input import input_command
+        input_command(
+            parsed[0][0], parsed[0][1],
+            priority=int(parsed[1].get("priority", 0)),  # type: ignore[arg-type]
+            override=bool(parsed[1].get("override", False)),
+        )
+        return True
+
+    if cmd == "key":
+        parsed = _parse(rest, {})
+        if not parsed or len(parsed[0]) < 2:
+            return False
+        from clrun.commands.key import key_command
+        key_command(parsed[0][0], parsed[0][1:])
+        return True
+
+    if cmd == "kill":
+        parsed = _parse(rest, {})
+        if not parsed or len(parsed[0]) != 1:
+            return False
+        from clrun.commands.kill import kill_command
+        kill_command(parsed[0][0])
+        return True
+
+    if cmd == "status":
+        parsed = _parse(rest, _STATUS_OPTS)
+        if not parsed or parsed[0] or parsed[1].get("sort", "created") not in _STATUS_SORTS:
+            return False
+        from clrun.commands.status import status_command
+        status_command(**parsed[1])  # type: ignore[arg-type]
+        return True
+
+    return False
+
+
+def _split_global_options(args: List[str]) -> Tuple[List[str], Optional[str]]:
+    """Take `--format X` / `--format=X` off argv.
+
+    It may come first, or anywhere after a subcommand name (up to `--`).
+    Bare commands and `<terminal_id> <text>` are shell text, so there only
+    a leading --format is an option.
+    """
+    fmt: Optional[str] = None
+    if args and args[0].startswith("--format="):
+        args, fmt = args[1:], args[0].partition("=")[2]
+    elif len(args) >= 2 and args[0] == "--format":
+        args, fmt = args[2:], args[1]
+    if not args or args[0] not in KNOWN_COMMANDS:
+        return args, fmt
+    rest = args[:1]
+    i = 1
+    while i < len(args):
+        arg = args[i]
+        if arg == "--":
+            rest.extend(args[i:])
+            break
+        if arg.startswith("--format="):
+            fmt = arg.partition("=")[2]
+        elif arg == "--format" and i + 1 < len(args):
+            i += 1
+            fmt = args[i]
+        else:
+            rest.append(arg)
+        i += 1
+    return rest, fmt
 
-from clrun.utils.output import fail
 
-UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE)
-KNOWN_COMMANDS = {"run", "input", "key", "tail", "head", "status", "kill", "scp", "help", "--help", "--version", "-h"}
-
-
-def _error_handler(fn):
-    """Wrap a Click command handler with error handling."""
-    def wrapper(*args, **kwargs):
-        try:
-            fn(*args, **kwargs)
-        except SystemExit:
-            raise
-        except Exception as e:
-            fail(str(e))
-    wrapper.__name__ = fn.__name__
-    wrapper.__doc__ = fn.__doc__
-    return wrapper
-
-
-@click.group(invoke_without_command=True)
-@click.version_option(version="1.2.0", prog_name="clrun")
-@click.pass_context
-def cli(ctx: click.Context) -> None:
-    """clrun — The Interactive CLI for AI Agents"""
-    if ctx.invoked_subcommand is None:
-        click.echo(ctx.get_help())
-
-
-@cli.command()
-@click.argument("command")
-def run(command: str) -> None:
-    """Run a command in a new interactive PTY session."""
-    from clrun.commands.run import run_command
-    run_command(command)
-
-
-@cli.command("input")
-@click.argument("terminal_id")
-@click.argument("text")
-@click.option("-p", "--priority", default=0, type=int, help="Priority (higher = first)")
-@click.option("--override", is_flag=True, help="Cancel all pending inputs and send immediately")
-def input_cmd(terminal_id: str, text: str, priority: int, override: bool) -> None:
-    """Queue input to a running terminal session."""
-    from clrun.commands.input import input_command
-    input_command(terminal_id, text, priority=priority, override=override)
-
-
-@cli.command()
-@click.argument("terminal_id")
-@click.argument("keys", nargs=-1, required=True)
-def key(terminal_id: str, keys: tuple) -> None:
-    """Send named keystrokes (arrow keys, tab, enter, etc.)."""
-    from clrun.commands.key import key_command
-    key_command(terminal_id, list(keys))
-
-
-@cli.command()
-@click.argument("terminal_id")
-@click.option("-n", "--lines", default=50, type=int, help="Number of lines")
-def tail(terminal_id: str, lines: int) -> None:
-    """Show the last N lines of terminal output."""
-    from clrun.commands.tail import tail_command
-    tail_command(terminal_id, lines=lines)
-
-
-@cli.command()
-@click.argument("terminal_id")
-@click.option("-n", "--lines", default=50, type=int, help="Number of lines")
-def head(terminal_id: str, lines: int) -> None:
-    """Show the first N lines of terminal output."""
-    from clrun.commands.head import head_command
-    head_command(terminal_id, lines=lines)
-
-
-@cli.command()
-def status() -> None:
-    """Show runtime status and all terminal sessions."""
-    from clrun.commands.status import status_command
-    status_command()
-
-
-@cli.command()
-@click.argument("terminal_id")
-def kill(terminal_id: str) -> None:
-    """Kill a running terminal session."""
-    from clrun.commands.kill import kill_command
-    kill_command(terminal_id)
-
-
-@cli.command()
-@click.argument("base_url")
-def scp(base_url: str) -> None:
-    """Connect to an SCP server and start a dynamic remote CLI session."""
-    from clrun.commands.scp import scp_connect_command
-    scp_connect_command(base_url)
+def _click_main(args: List[str], standalone: bool) -> None:
+    from clrun.cli_app import cli
+    cli.main(args=args, prog_name="clrun", standalone_mode=standalone)
 
 
-def main() -> None:
-    """Entry point with smart routing for bare commands and terminal_id shorthand."""
-    args = sys.argv[1:]
+def _command_name(args: List[str]) -> Optional[str]:
+    """The command an argv list runs, for metrics; None for help/flags/local commands."""
+    if not args or args[0].startswith("-") or args[0] in LOCAL_COMMANDS:
+        return None
+    if args[0] in KNOWN_COMMANDS:
+        return args[0]
+    if UUID_RE.match(args[0]):
+        return "input" if len(args) > 1 else "tail"
+    return "run"
+
+
+def _record_command(args: List[str], seconds: float) -> None:
+    name = _command_name(_split_global_options(args)[0])
+    if name is None:
+        return
+    from clrun.utils.context import get_env
+    from clrun.utils.paths import resolve_project_root, get_clrun_paths
+    try:
+        project_root = resolve_project_root()
+        clrun_dir = get_clrun_paths(project_root).root
+        if not os.path.isdir(clrun_dir):
+            return
+        # Recording is opt-in (metrics.commands). Unless the env override or
+        # a config.json could turn it on, skip loading the config at all.
+        env = get_env() or os.environ
+        if "CLRUN_METRICS_COMMANDS" not in env and not os.path.exists(os.path.join(clrun_dir, "config.json")):
+            return
+        from clrun.utils.config import load_config, parse_bool
+        settings = load_config(project_root).get("metrics", {})
+        if not parse_bool(settings.get("commands", False)) or not parse_bool(settings.get("enabled", True)):
+            return
+        from clrun.runtime import metrics
+        metrics.record_command(project_root, name, seconds)
+    except Exception:
+        pass  # never let bookkeeping replace the command's own exit
+
+
+def dispatch(args: List[str], standalone: bool = True) -> None:
+    """Route an argv list to its command handler (handlers exit via SystemExit).
+
+    With standalone=False, Click errors propagate as exceptions instead of
+    being printed to the process stderr (used by the runtime server).
+    The run time is recorded in the project's command metrics.
+    """
+    from clrun.utils import trace
+    started = time.perf_counter()
+    try:
+        with trace.span(f"clrun {_command_name(_split_global_options(args)[0]) or 'cli'}", argv=args):
+            _dispatch(args, standalone)
+    finally:
+        _record_command(args, time.perf_counter() - started)
+
+
+def _dispatch(args: List[str], standalone: bool) -> None:
+    args, fmt = _split_global_options(args)
+    if fmt is not None:
+        from clrun.utils.context import set_format
+        from clrun.utils.output import SERIALIZERS, fail
+        if fmt.lower() not in SERIALIZERS:
+            fail({
+                "error": f"Unknown output format: {fmt}",
+                "hints": {
+                    "formats": ", ".join(SERIALIZERS),
+                    "example": "clrun --format json status",
+                },
+            })
+        set_format(fmt.lower())
 
     if not args:
-        cli()
+        _click_main(args, standalone)
         return
 
     first_arg = args[0]
 
-    # If it starts with - or is a known command, let Click handle it
-    if first_arg.startswith("-") or first_arg in KNOWN_COMMANDS:
-        cli()
+    # Hot subcommands skip Click; everything else (help, flags, errors) uses it
+    if first_arg in KNOWN_COMMANDS:
+        if not _fast_route(args):
+            _click_main(args, standalone)
+        return
+
+    if first_arg.startswith("-"):
+        _click_main(args, standalone)
         return
 
     # Smart routing
@@ -143,8 +286,55 @@ def main() -> None:
     except SystemExit:
         raise
     except Exception as e:
+        from clrun.utils.output import fail
         fail(str(e))
 
 
+def streams_output(args: List[str]) -> bool:
+    """Whether a command prints output as it goes (`events --follow`).
+
+    A runtime server replies once, after the command has finished, so these
+    always run locally.
+    """
+    args = _split_global_options(args)[0]
+    return bool(args) and args[0] == "events" and any(
+        arg.partition("=")[0] in _STREAMING_EVENTS_OPTS for arg in args[1:]
+    )
+
+
+def _forwardable(args: List[str]) -> bool:
+    """Whether a runtime server may run this command."""
+    if not args or args[0].startswith("-") or args[0] in LOCAL_COMMANDS or "--help" in args:
+        return False
+    return not streams_output(args)
+
+
+def _server_running() -> bool:
+    """Cheap check (one stat) for a runtime server socket in this project."""
+    from clrun.utils.paths import resolve_project_root, get_clrun_paths
+    return os.path.exists(get_clrun_paths(resolve_project_root()).runtime_sock)
+
+
+def main() -> None:
+    """Entry point with smart routing for bare commands and terminal_id shorthand."""
+    args = sys.argv[1:]
+    rest = _split_global_options(args)[0]
+    if "CLRUN_TRACE" in os.environ:
+        from clrun.utils import trace
+        trace.process("clrun")
+
+    # Thin-client mode: if a runtime server is serving this project, forward.
+    if _forwardable(rest):
+        if _server_running():
+            from clrun.runtime.client import forward
+            from clrun.utils import trace
+            with trace.span("forward to runtime server", argv=args):
+                exit_code = forward(args)
+            if exit_code is not None:
+                sys.exit(exit_code)
+
+    dispatch(args)
+
+
 if __name__ == "__main__":
     main()
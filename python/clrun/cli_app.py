@@ -0,0 +1,228 @@
+"""Click command definitions for the full CLI (help, options, errors).
+
+Imported lazily by clrun.cli: hot commands are routed without Click.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import click
+
+from clrun.utils.output import fail
+
+
+def _error_handler(fn):
+    """Wrap a Click command handler with error handling."""
+    def wrapper(*args, **kwargs):
+        try:
+            fn(*args, **kwargs)
+        except SystemExit:
+            raise
+        except Exception as e:
+            fail(str(e))
+    wrapper.__name__ = fn.__name__
+    wrapper.__doc__ = fn.__doc__
+    return wrapper
+
+
+def _set_format(ctx: click.Context, param: click.Parameter, value: str) -> str:
+    if value:
+        from clrun.utils.context import set_format
+        set_format(value)
+    return value
+
+
+@click.group(invoke_without_command=True)
+@click.version_option(version="1.2.0", prog_name="clrun")
+@click.option(
+    "--format", "output_format", default=None, expose_value=False, callback=_set_format,
+    type=click.Choice(["yaml", "json", "ndjson"], case_sensitive=False),
+    help="Response format (default: yaml, or $CLRUN_FORMAT)",
+)
+@click.pass_context
+def cli(ctx: click.Context) -> None:
+    """clrun — The Interactive CLI for AI Agents"""
+    if ctx.invoked_subcommand is None:
+        click.echo(ctx.get_help())
+
+
+@cli.command()
+@click.argument("command")
+def run(command: str) -> None:
+    """Run a command in a new interactive PTY session."""
+    from clrun.commands.run import run_command
+    run_command(command)
+
+
+@cli.command("input")
+@click.argument("terminal_id")
+@click.argument("text")
+@click.option("-p", "--priority", default=0, type=int, help="Priority (higher = first)")
+@click.option("--override", is_flag=True, help="Cancel all pending inputs and send immediately")
+def input_cmd(terminal_id: str, text: str, priority: int, override: bool) -> None:
+    """Queue input to a running terminal session."""
+    from clrun.commands.input import input_command
+    input_command(terminal_id, text, priority=priority, override=override)
+
+
+@cli.command()
+@click.argument("terminal_id")
+@click.argument("keys", nargs=-1, required=True)
+def key(terminal_id: str, keys: tuple) -> None:
+    """Send named keystrokes (arrow keys, tab, enter, etc.)."""
+    from clrun.commands.key import key_command
+    key_command(terminal_id, list(keys))
+
+
+@cli.command()
+@click.argument("terminal_id")
+@click.option("-n", "--lines", default=50, type=int, help="Number of lines")
+def tail(terminal_id: str, lines: int) -> None:
+    """Show the last N lines of terminal output."""
+    from clrun.commands.tail import tail_command
+    tail_command(terminal_id, lines=lines)
+
+
+@cli.command()
+@click.argument("terminal_id")
+@click.option("-n", "--lines", default=50, type=int, help="Number of lines")
+def head(terminal_id: str, lines: int) -> None:
+    """Show the first N lines of terminal output."""
+    from clrun.commands.head import head_command
+    head_command(terminal_id, lines=lines)
+
+
+@cli.command()
+@click.option("-s", "--state", "states", multiple=True,
+              help="Only sessions in this state (repeatable or comma-separated)")
+@click.option("-c", "--command", help="Only sessions whose command contains this text")
+@click.option("--since", help="Created at/after this time (ISO 8601 or age: 30m, 2h, 1d)")
+@click.option("--active-since", help="Active at/after this time (ISO 8601 or age)")
+@click.option("--id", "id_prefix", help="Only terminal IDs starting with this prefix")
+@click.option("--sort", type=click.Choice(["created", "activity", "status", "command"]),
+              default="created", help="Sort key")
+@click.option("--desc", is_flag=True, help="Sort descending")
+@click.option("--limit", type=int, help="Maximum sessions to return")
+@click.option("--cursor", help="Continue from a previous response's next_cursor")
+def status(
+    states: tuple, command: Optional[str], since: Optional[str], active_since: Optional[str],
+    id_prefix: Optional[str], sort: str, desc: bool, limit: Optional[int], cursor: Optional[str],
+) -> None:
+    """Show runtime status and terminal sessions (filterable, paginated)."""
+    from clrun.commands.status import status_command
+    status_command(
+        states=list(states), command=command, since=since, active_since=active_since,
+        id_prefix=id_prefix, sort=sort, desc=desc, limit=limit, cursor=cursor,
+    )
+
+
+@cli.command()
+@click.argument("terminal_id")
+def kill(terminal_id: str) -> None:
+    """Kill a running terminal session."""
+    from clrun.commands.kill import kill_command
+    kill_command(terminal_id)
+
+
+@cli.command()
+@click.option("-t", "--terminal", "terminal_id", help="Only events of this session")
+@click.option("--type", "types", multiple=True, help="Only these event types (repeatable or comma-separated)")
+@click.option("--since", help="At/after this time (ISO 8601 or age: 30m, 2h, 1d)")
+@click.option("--until", help="At/before this time (ISO 8601 or age)")
+@click.option("-n", "--limit", type=int, help="Maximum events (default: the most recent 50; no limit with --follow)")
+@click.option("--first", is_flag=True, help="Take the earliest matching events instead of the latest")
+@click.option("--reverse", is_flag=True, help="Newest first")
+@click.option("-f", "--follow", is_flag=True, help="Keep printing events as they are logged")
+@click.option("--cursor", help="Resume following from a cursor printed by an earlier --follow")
+@click.option("--timeout", help="With --follow, stop after this long without a new event (e.g. 30s)")
+def events(terminal_id: Optional[str], types: tuple, since: Optional[str], until: Optional[str],
+           limit: Optional[int], first: bool, reverse: bool, follow: bool, cursor: Optional[str],
+           timeout: Optional[str]) -> None:
+    """Query (or follow) the event ledger."""
+    from clrun.commands.events import events_command
+    events_command(terminal_id, list(types), since=since, until=until, limit=limit, first=first, reverse=reverse,
+                   follow=follow, cursor=cursor, timeout=timeout)
+
+
+@cli.command()
+@click.argument("terminal_id")
+@click.option("--pin/--unpin", default=None, help="Never suspend this session (or allow it again)")
+@click.option("--idle-timeout", help="Suspend after this long idle (e.g. 30m; off = never; default = project setting)")
+def policy(terminal_id: str, pin: Optional[bool], idle_timeout: Optional[str]) -> None:
+    """Show or change a session's suspension policy."""
+    from clrun.commands.policy import policy_command
+    policy_command(terminal_id, pin=pin, idle_timeout=idle_timeout)
+
+
+@cli.command()
+@click.argument("terminal_id", required=False)
+def stats(terminal_id: Optional[str]) -> None:
+    """Latency percentiles and throughput (for one session, or the project)."""
+    from clrun.commands.stats import stats_command
+    stats_command(terminal_id)
+
+
+@cli.command("metrics")
+def metrics_cmd() -> None:
+    """Print OpenMetrics text (session gauges, event counters, input latency)."""
+    from clrun.commands.metrics import metrics_command
+    metrics_command()
+
+
+@cli.command()
+@click.option("--max-age", help="Remove stopped sessions inactive longer than this (e.g. 7d)")
+@click.option("--max-sessions", help="Keep at most this many sessions")
+@click.option("--max-bytes", help="Keep session files under this size (e.g. 500MB)")
+@click.option("--dry-run", is_flag=True, help="Report what would be removed without removing it")
+def gc(max_age: Optional[str], max_sessions: Optional[str], max_bytes: Optional[str], dry_run: bool) -> None:
+    """Remove old sessions, trim queue history and rotate the ledger."""
+    from clrun.commands.gc import gc_command
+    gc_command(max_age=max_age, max_sessions=max_sessions, max_bytes=max_bytes, dry_run=dry_run)
+
+
+@cli.command()
+@click.option("--to", "target", required=True, type=click.Choice(["files", "sqlite"]),
+              help="State backend to move to")
+@click.option("--force", is_flag=True, help="Migrate even while sessions are running")
+def migrate(target: str, force: bool) -> None:
+    """Move session, queue and ledger state to another backend."""
+    from clrun.commands.migrate import migrate_command
+    migrate_command(target, force=force)
+
+
+@cli.command()
+@click.argument("base_url")
+def scp(base_url: str) -> None:
+    """Connect to an SCP server and start a dynamic remote CLI session."""
+    from clrun.commands.scp import scp_connect_command
+    scp_connect_command(base_url)
+
+
+@cli.group()
+def server() -> None:
+    """Manage the opt-in long-lived runtime server for this project."""
+
+
+@server.command("start")
+@click.option("--port", default=None, type=int, help="Also listen on 127.0.0.1:PORT (token-authenticated)")
+@click.option("--metrics-port", default=None, type=int, help="Serve GET /metrics (OpenMetrics) on 127.0.0.1:PORT")
+@click.option("--foreground", is_flag=True, help="Run in the foreground instead of detaching")
+def server_start(port: int, metrics_port: int, foreground: bool) -> None:
+    """Start the runtime server (Unix socket, optional loopback TCP)."""
+    from clrun.commands.server import server_start_command
+    server_start_command(port=port, metrics_port=metrics_port, foreground=foreground)
+
+
+@server.command("stop")
+def server_stop() -> None:
+    """Stop the runtime server."""
+    from clrun.commands.server import server_stop_command
+    server_stop_command()
+
+
+@server.command("status")
+def server_status() -> None:
+    """Show whether a runtime server is serving this project."""
+    from clrun.commands.server import server_status_command
+    server_status_command()
@@ -0,0 +1,152 @@
+"""The `clrun events` command — query the event ledger."""
+
+from __future__ import annotations
+
+import os
+import shlex
+from typing import Dict, List, Optional, Sequence
+
+from clrun.utils.paths import resolve_project_root, get_clrun_paths
+from clrun.utils.output import success, fail, respond
+from clrun.utils.context import get_stdout
+from clrun.utils.timespec import parse_duration, parse_time
+from clrun.ledger.follow import LedgerFollower
+from clrun.ledger.query import last_events, query_events
+
+
+def _parse_types(types: Optional[Sequence[str]]) -> List[str]:
+    parsed: List[str] = []
+    for value in types or ():
+        parsed.extend(v.strip() for v in value.split(",") if v.strip())
+    return parsed
+
+
+def events_command(
+    terminal_id: Optional[str] = None,
+    types: Optional[Sequence[str]] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: Optional[int] = None,
+    first: bool = False,
+    reverse: bool = False,
+    follow: bool = False,
+    cursor: Optional[str] = None,
+    timeout: Optional[str] = None,
+) -> None:
+    project_root = resolve_project_root()
+    if not os.path.exists(get_clrun_paths(project_root).root):
+        fail("No .clrun directory found. Run `clrun <command>` to initialize.")
+        return
+    if limit is not None and limit < 1:
+        fail({"error": "--limit must be at least 1", "hints": {"example": "clrun events --limit 100"}})
+        return
+
+    times: Dict[str, Optional[str]] = {}
+    for flag, value in (("since", since), ("until", until)):
+        try:
+            times[flag] = parse_time(value) if value else None
+        except ValueError:
+            fail({
+                "error": f"Invalid time for --{flag}: {value}",
+                "hints": {"formats": "age like 90s, 15m, 2h, 1d, 1w — or ISO 8601 like 2026-01-31T09:00:00Z"},
+            })
+            return
+    wanted = _parse_types(types)
+
+    if follow or cursor:
+        _follow(project_root, terminal_id, wanted, times["since"], times["until"], limit, first, reverse,
+                cursor, timeout)
+        return
+
+    limit = limit or 50
+    if first:
+        events = []
+        for entry in query_events(project_root, terminal_id, wanted, times["since"], times["until"]):
+            events.append(entry)
+            if len(events) >= limit:
+                break
+    else:
+        events = last_events(project_root, limit, terminal_id, wanted, times["since"], times["until"])
+    if reverse:
+        events.reverse()
+
+    response: dict = {"project": project_root, "count": len(events), "events": events}
+    hints: Dict[str, str] = {
+        "filter": "clrun events --terminal <id> --type input.sent --since 1h",
+        "check_sessions": "clrun status",
+    }
+    if len(events) == limit and events:
+        args = []
+        if terminal_id:
+            args.append(f"--terminal {shlex.quote(terminal_id)}")
+        if wanted:
+            args.append(f"--type {','.join(wanted)}")
+        oldest = min(e.get("timestamp", "") for e in events)
+        newest = max(e.get("timestamp", "") for e in events)
+        if first:
+            args += [f"--since {shlex.quote(newest)}", "--first"]
+            if times["until"]:
+                args.append(f"--until {shlex.quote(times['until'])}")
+            hints["more"] = "clrun events " + " ".join(args + [f"--limit {limit}"])
+        else:
+            if times["since"]:
+                args.append(f"--since {shlex.quote(times['since'])}")
+            args.append(f"--until {shlex.quote(oldest)}")
+            hints["older"] = "clrun events " + " ".join(args + [f"--limit {limit}"])
+        hints["note"] = "--since/--until are inclusive; the boundary event may repeat."
+    response["hints"] = hints
+    success(response)
+
+
+def _follow(
+    project_root: str,
+    terminal_id: Optional[str],
+    wanted: List[str],
+    since: Optional[str],
+    until: Optional[str],
+    limit: Optional[int],
+    first: bool,
+    reverse: bool,
+    cursor: Optional[str],
+    timeout: Optional[str],
+) -> None:
+    if until or first or reverse:
+        fail({
+            "error": "--follow cannot be combined with --until, --first or --reverse",
+            "hints": {"example": "clrun events --follow --type session.exited --since 10m"},
+        })
+        return
+    try:
+        idle_s = parse_duration(timeout) if timeout else None
+    except ValueError:
+        fail({"error": f"Invalid duration for --timeout: {timeout}", "hints": {"formats": "500ms, 30s, 5m, 1h"}})
+        return
+    try:
+        follower = LedgerFollower(project_root, terminal_id, wanted, since, cursor)
+    except ValueError as e:
+        fail({"error": str(e), "hints": {"start_over": "clrun events --follow"}})
+        return
+
+    # One document per event, written as it arrives; a summary with the
+    # resume cursor closes the stream.
+    stream = get_stdout()
+    count = 0
+    try:
+        for entry in follower.follow(idle_s):
+            respond(entry)
+            stream.flush()
+            count += 1
+            if limit and count >= limit:
+                break
+    except KeyboardInterrupt:
+        pass
+
+    args = []
+    if terminal_id:
+        args.append(f"--terminal {shlex.quote(terminal_id)}")
+    if wanted:
+        args.append(f"--type {','.join(wanted)}")
+    # The cursor is just past the last event printed, even when --limit
+    # stopped partway through what the follower had read.
+    hints = {"resume": "clrun events --follow " + " ".join(args + [f"--cursor {follower.cursor}"])}
+    success({"project": project_root, "count": count, "cursor": follower.cursor, "hints": hints})
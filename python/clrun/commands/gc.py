@@ -0,0 +1,50 @@
+"""The `clrun gc` command — apply retention policies to .clrun/."""
+
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+from clrun.utils.paths import resolve_project_root, get_clrun_paths
+from clrun.utils.output import success, fail
+from clrun.utils.config import config_path
+from clrun.runtime.retention import RetentionPolicy, collect
+
+
+def gc_command(
+    max_age: Optional[str] = None,
+    max_sessions: Optional[str] = None,
+    max_bytes: Optional[str] = None,
+    dry_run: bool = False,
+) -> None:
+    project_root = resolve_project_root()
+    if not os.path.exists(get_clrun_paths(project_root).root):
+        fail("No .clrun directory found. Nothing to collect.")
+        return
+
+    try:
+        policy = RetentionPolicy.from_config(
+            project_root, max_age=max_age, max_sessions=max_sessions, max_bytes=max_bytes,
+        )
+    except ValueError as e:
+        fail({
+            "error": str(e),
+            "hints": {
+                "durations": "90s, 15m, 2h, 7d, 1w",
+                "sizes": "512KB, 64MB, 1GB",
+                "config": config_path(project_root),
+            },
+        })
+        return
+
+    report = collect(project_root, policy, dry_run=dry_run)
+    response: dict = {"project": project_root, "dry_run": dry_run}
+    response.update(report)
+    if not dry_run:
+        del response["removed_terminal_ids"]
+    response["hints"] = {
+        "preview": "clrun gc --dry-run",
+        "configure": f'{config_path(project_root)}  # {{"gc": {{"max_age": "7d", "max_sessions": 1000, "auto": true}}}}',
+        "check_sessions": "clrun status",
+    }
+    success(response)
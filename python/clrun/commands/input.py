@@ -6,12 +6,14 @@ import os
 import signal
 import time
 
+from clrun.utils import trace
 from clrun.utils.paths import resolve_project_root
 from clrun.utils.output import success, fail, clean_output
-from clrun.pty.pty_manager import read_session, is_pty_alive
+from clrun.pty.pty_manager import read_session
 from clrun.queue.queue_engine import enqueue_input, enqueue_override, pending_count
 from clrun.buffer.buffer_manager import get_buffer_size, read_buffer_since
-from clrun.runtime.restore import restore_session
+from clrun.runtime.heartbeat import session_alive
+from clrun.runtime.restore import restore_session, wait_until_sent
 from clrun.ledger.ledger import log_event
 from clrun.utils.validate import validate_input, check_output_quality, session_not_found_error, session_not_running_error
 
@@ -50,13 +52,15 @@ def input_command(terminal_id: str, text: str, priority: int = 0, override: bool
         buffer_before = get_buffer_size(terminal_id, project_root)
 
         if override:
-            enqueue_override(terminal_id, text, project_root)
+            entry, _ = enqueue_override(terminal_id, text, project_root)
         else:
-            enqueue_input(terminal_id, text, priority, project_root)
+            entry = enqueue_input(terminal_id, text, priority, project_root)
 
         restore_session(terminal_id, project_root)
         session = read_session(terminal_id, project_root)
-        time.sleep(0.6)
+        # The worker restores the environment before sending; then give the output a moment.
+        wait_until_sent(terminal_id, entry.queue_id, project_root)
+        time.sleep(0.2)
 
         new_lines = read_buffer_since(terminal_id, buffer_before, project_root)
         raw_output = clean_output(new_lines, text)
@@ -83,7 +87,7 @@ def input_command(terminal_id: str, text: str, priority: int = 0, override: bool
         fail(session_not_running_error(terminal_id, session.status))
         return
 
-    if not is_pty_alive(session.worker_pid):
+    if not session_alive(terminal_id, session.worker_pid, project_root=project_root):
         fail({
             "error": f"Session worker is not alive (PID: {session.worker_pid})",
             "hints": {
@@ -108,7 +112,8 @@ def input_command(terminal_id: str, text: str, priority: int = 0, override: bool
         except OSError:
             pass
 
-        time.sleep(0.4)
+        with trace.span("wait for output", terminal_id=terminal_id, queue_id=entry.queue_id):
+            time.sleep(0.4)
         new_lines = read_buffer_since(terminal_id, buffer_before, project_root)
         raw_output = clean_output(new_lines, text)
         output, output_warnings = check_output_quality(raw_output, "input response")
@@ -139,7 +144,8 @@ def input_command(terminal_id: str, text: str, priority: int = 0, override: bool
         except OSError:
             pass
 
-        time.sleep(0.4)
+        with trace.span("wait for output", terminal_id=terminal_id, queue_id=entry.queue_id):
+            time.sleep(0.4)
         new_lines = read_buffer_since(terminal_id, buffer_before, project_root)
         raw_output = clean_output(new_lines, text)
         output, output_warnings = check_output_quality(raw_output, "input response")
@@ -9,9 +9,10 @@ from typing import List
 
 from clrun.utils.paths import resolve_project_root
 from clrun.utils.output import success, fail, clean_output
-from clrun.pty.pty_manager import read_session, is_pty_alive
+from clrun.pty.pty_manager import read_session
 from clrun.queue.queue_engine import enqueue_input
 from clrun.buffer.buffer_manager import get_buffer_size, read_buffer_since
+from clrun.runtime.heartbeat import session_alive
 from clrun.runtime.restore import restore_session
 from clrun.ledger.ledger import log_event
 from clrun.utils.validate import session_not_found_error, session_not_running_error
@@ -99,7 +100,7 @@ def key_command(terminal_id: str, keys: List[str]) -> None:
         fail(session_not_running_error(terminal_id, session.status))
         return
 
-    if not is_pty_alive(session.worker_pid):
+    if not session_alive(terminal_id, session.worker_pid, project_root=project_root):
         fail({
             "error": f"Session worker is not alive (PID: {session.worker_pid})",
             "hints": {
@@ -0,0 +1,19 @@
+"""The `clrun metrics` command — print OpenMetrics text for scraping."""
+
+from __future__ import annotations
+
+import os
+
+from clrun.utils.context import get_stdout
+from clrun.utils.paths import resolve_project_root, get_clrun_paths
+from clrun.utils.output import fail
+from clrun.runtime.exporter import render
+
+
+def metrics_command() -> None:
+    project_root = resolve_project_root()
+    if not os.path.exists(get_clrun_paths(project_root).root):
+        fail("No .clrun directory found. Run `clrun <command>` to initialize.")
+        return
+    # The exposition format is the output; --format does not apply.
+    get_stdout().write(render(project_root))
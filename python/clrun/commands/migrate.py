@@ -0,0 +1,41 @@
+"""The `clrun migrate` command — switch the state backend (files <-> sqlite)."""
+
+from __future__ import annotations
+
+import os
+
+from clrun import store
+from clrun.utils.context import get_env
+from clrun.utils.paths import resolve_project_root, get_clrun_paths
+from clrun.utils.output import success, fail
+from clrun.runtime.crash_recovery import recover_sessions
+from clrun.store.migrate import migrate
+
+
+def migrate_command(target: str, force: bool = False) -> None:
+    project_root = resolve_project_root()
+    if not os.path.exists(get_clrun_paths(project_root).root):
+        fail("No .clrun directory found. Nothing to migrate.")
+        return
+
+    recover_sessions(project_root)
+    try:
+        report = migrate(project_root, target, force=force)
+    except ValueError as e:
+        fail({
+            "error": str(e),
+            "hints": {
+                "check_sessions": "clrun status --state running",
+                "stop_session": "clrun kill <terminal_id>",
+                "force": f"clrun migrate --to {target} --force",
+            },
+        })
+        return
+
+    response: dict = {"project": project_root}
+    response.update(report)
+    response["hints"] = {"check_sessions": "clrun status"}
+    env = (get_env() or os.environ).get(store.ENV_VAR)
+    if env and env != target:
+        response["warning"] = f"{store.ENV_VAR}={env} overrides the project setting; unset it to use {target}"
+    success(response)
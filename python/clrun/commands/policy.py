@@ -0,0 +1,61 @@
+"""The `clrun policy` command — pin a session or override its idle timeout."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from clrun.utils.paths import resolve_project_root
+from clrun.utils.output import success, fail
+from clrun.utils.validate import session_not_found_error
+from clrun.utils.timespec import parse_duration
+from clrun.pty.pty_manager import read_session, update_session
+from clrun.ledger.ledger import log_event
+from clrun.runtime.suspension import SuspendPolicy
+
+
+def policy_command(terminal_id: str, pin: Optional[bool] = None, idle_timeout: Optional[str] = None) -> None:
+    project_root = resolve_project_root()
+
+    session = read_session(terminal_id, project_root)
+    if not session:
+        fail(session_not_found_error(terminal_id))
+        return
+
+    updates: Dict[str, Any] = {}
+    if pin is not None:
+        updates["pinned"] = pin
+    if idle_timeout is not None:
+        if idle_timeout.strip().lower() == "default":
+            updates["idle_timeout"] = None
+        else:
+            try:
+                updates["idle_timeout"] = parse_duration(idle_timeout) or 0
+            except ValueError:
+                fail({
+                    "error": f"Invalid idle timeout: {idle_timeout}",
+                    "hints": {
+                        "examples": "30m, 2h, off (never), default (the project setting)",
+                        "usage": f"clrun policy {terminal_id} --idle-timeout 1h",
+                    },
+                })
+                return
+
+    if updates:
+        # Running workers pick the change up within suspend.check_interval.
+        session = update_session(terminal_id, updates, project_root) or session
+        log_event("session.policy", project_root, terminal_id, updates)
+
+    policy = SuspendPolicy.from_config(project_root)
+    success({
+        "terminal_id": terminal_id,
+        "status": session.status,
+        "pinned": session.pinned,
+        "idle_timeout_s": policy.idle_timeout_for(session),
+        "idle_timeout_source": "session" if session.idle_timeout is not None else "project",
+        "hints": {
+            "pin": f"clrun policy {terminal_id} --pin",
+            "unpin": f"clrun policy {terminal_id} --unpin",
+            "idle_timeout": f"clrun policy {terminal_id} --idle-timeout 1h",
+            "check_status": "clrun status",
+        },
+    })
@@ -2,16 +2,16 @@
 
 from __future__ import annotations
 
-import os
-import subprocess
-import sys
-import time
-
+from clrun.utils import trace
+from clrun.utils.context import get_cwd
 from clrun.utils.paths import resolve_project_root, ensure_clrun_dirs
 from clrun.utils.output import success, fail, session_hints, clean_output
 from clrun.runtime.lock_manager import acquire_lock
 from clrun.runtime.crash_recovery import recover_sessions
-from clrun.pty.pty_manager import generate_terminal_id, read_session
+from clrun.runtime.retention import maybe_schedule as maybe_schedule_gc
+from clrun.runtime.pool import POOLED_POLL_S, start_worker
+from clrun.runtime.spawn import wait_for_initial_output
+from clrun.pty.pty_manager import generate_terminal_id
 from clrun.queue.queue_engine import init_queue
 from clrun.buffer.buffer_manager import get_buffer_size, read_buffer_since
 from clrun.skills.installer import install_skills
@@ -21,7 +21,7 @@ from clrun.utils.validate import validate_command, check_output_quality
 
 def run_command(command: str) -> None:
     project_root = resolve_project_root()
-    cwd = os.getcwd()
+    cwd = get_cwd()
 
     cmd_check = validate_command(command)
 
@@ -35,69 +35,39 @@ def run_command(command: str) -> None:
             },
         })
 
-    ensure_clrun_dirs(project_root)
-    acquire_lock(project_root)
-    recover_sessions(project_root)
-    install_skills(project_root)
+    with trace.span("prepare project"):
+        ensure_clrun_dirs(project_root)
+        with trace.span("acquire lock"):
+            acquire_lock(project_root)
+        with trace.span("recover sessions"):
+            recover_sessions(project_root)
+        with trace.span("install skills"):
+            install_skills(project_root)
+        maybe_schedule_gc(project_root)
 
     terminal_id = generate_terminal_id()
     init_queue(terminal_id, project_root)
 
-    worker_module = "clrun.worker"
-
     try:
-        child = subprocess.Popen(
-            [
-                sys.executable, "-m", worker_module,
-                terminal_id, command, cwd, project_root,
-            ],
-            start_new_session=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            stdin=subprocess.DEVNULL,
-        )
+        worker_pid, pooled = start_worker(terminal_id, command, cwd, project_root)
 
         log_event("session.created", project_root, terminal_id, {
             "command": command,
             "cwd": cwd,
-            "worker_pid": child.pid,
+            "worker_pid": worker_pid,
+            "pooled": pooled,
         })
 
         # Wait for initial output (up to 5s)
         buffer_start = get_buffer_size(terminal_id, project_root)
-        max_wait = 5.0
-        poll = 0.15
-        elapsed = 0.0
-        session_status = "running"
-        exit_code = None
-
-        while elapsed < max_wait:
-            time.sleep(poll)
-            elapsed += poll
-
-            current_size = get_buffer_size(terminal_id, project_root)
-            has_new_output = current_size > buffer_start
-
-            sess = read_session(terminal_id, project_root)
-            if sess:
-                session_status = sess.status
-                exit_code = sess.last_exit_code
-
-            if sess and sess.status == "exited":
-                break
-
-            if has_new_output:
-                time.sleep(0.3)
-                updated = read_session(terminal_id, project_root)
-                if updated:
-                    session_status = updated.status
-                    exit_code = updated.last_exit_code
-                break
+        session_status, exit_code = wait_for_initial_output(
+            terminal_id, buffer_start, project_root, poll=POOLED_POLL_S if pooled else 0.15)
 
         # Build response
-        new_lines = read_buffer_since(terminal_id, buffer_start, project_root)
-        raw_output = clean_output(new_lines, command)
-        output, output_warnings = check_output_quality(raw_output, "run response")
+        with trace.span("read output", terminal_id=terminal_id):
+            new_lines = read_buffer_since(terminal_id, buffer_start, project_root)
+            raw_output = clean_output(new_lines, command)
+            output, output_warnings = check_output_quality(raw_output, "run response")
 
         all_warnings = cmd_check.warnings + output_warnings
 
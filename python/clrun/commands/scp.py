@@ -2,8 +2,7 @@
 
 from __future__ import annotations
 
-import os
-
+from clrun.utils.context import get_cwd
 from clrun.utils.paths import resolve_project_root, ensure_clrun_dirs
 from clrun.utils.output import success, fail
 from clrun.runtime.lock_manager import acquire_lock
@@ -47,7 +46,7 @@ def scp_connect_command(base_url: str) -> None:
     display = format_cli_for_buffer(cli) + f"View CLI in browser: {scp_cli_url(base_normalized, run_id)}\n"
     append_to_buffer(terminal_id, display, project_root)
 
-    cwd = os.getcwd()
+    cwd = get_cwd()
     session = create_session_metadata(
         terminal_id,
         f"clrun scp {base_url}",
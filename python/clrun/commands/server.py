@@ -0,0 +1,154 @@
+"""The `clrun server` commands — manage the opt-in long-lived runtime server."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, Optional
+
+from clrun.utils.context import get_env
+from clrun.utils.paths import resolve_project_root, ensure_clrun_dirs, get_clrun_paths
+from clrun.utils.output import success, fail
+from clrun.runtime.client import request
+from clrun.runtime.lock_manager import read_runtime_state
+
+START_TIMEOUT_S = 5.0
+
+
+def _ping(project_root: str) -> Optional[Dict[str, Any]]:
+    sock_path = get_clrun_paths(project_root).runtime_sock
+    if not os.path.exists(sock_path):
+        return None
+    try:
+        return request(sock_path, {"op": "ping"}, timeout=2.0)
+    except (OSError, ValueError):
+        return None
+
+
+def _describe(project_root: str, info: Dict[str, Any]) -> Dict[str, Any]:
+    paths = get_clrun_paths(project_root)
+    response: Dict[str, Any] = {
+        "running": True,
+        "pid": info.get("pid"),
+        "socket": paths.runtime_sock,
+        "started_at": info.get("started_at"),
+        "uptime_s": info.get("uptime_s"),
+        "requests": info.get("requests"),
+    }
+    if info.get("port") is not None:
+        response["port"] = info["port"]
+        response["tcp"] = f"127.0.0.1:{info['port']} (token in {paths.runtime_json})"
+    if info.get("metrics_port") is not None:
+        response["metrics_url"] = f"http://127.0.0.1:{info['metrics_port']}/metrics"
+    return response
+
+
+def server_start_command(
+    port: Optional[int] = None, metrics_port: Optional[int] = None, foreground: bool = False
+) -> None:
+    project_root = resolve_project_root()
+    ensure_clrun_dirs(project_root)
+
+    info = _ping(project_root)
+    if info:
+        success({
+            **_describe(project_root, info),
+            "already_running": True,
+            "hints": {
+                "stop": "clrun server stop",
+                "note": "CLI commands in this project are served by the runtime server.",
+            },
+        })
+        return
+
+    if foreground:
+        from clrun.runtime.server import serve
+        serve(project_root, port, metrics_port)
+        return
+
+    args = [sys.executable, "-m", "clrun.runtime.server", project_root]
+    if port is not None:
+        args += ["--port", str(port)]
+    if metrics_port is not None:
+        args += ["--metrics-port", str(metrics_port)]
+    subprocess.Popen(
+        args,
+        cwd=project_root,
+        start_new_session=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        stdin=subprocess.DEVNULL,
+        env=get_env(),
+    )
+
+    deadline = time.monotonic() + START_TIMEOUT_S
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        info = _ping(project_root)
+        if info:
+            success({
+                **_describe(project_root, info),
+                "hints": {
+                    "status": "clrun server status",
+                    "stop": "clrun server stop",
+                    "note": "CLI commands in this project are now served by the runtime server.",
+                },
+            })
+            return
+
+    fail({
+        "error": "Runtime server did not start in time.",
+        "hints": {
+            "foreground": "clrun server start --foreground  # to see errors",
+        },
+    })
+
+
+def server_stop_command() -> None:
+    project_root = resolve_project_root()
+    paths = get_clrun_paths(project_root)
+
+    info = _ping(project_root)
+    if not info:
+        fail({
+            "error": "No runtime server is running for this project.",
+            "hints": {"start": "clrun server start"},
+        })
+        return
+
+    try:
+        request(paths.runtime_sock, {"op": "shutdown"}, timeout=2.0)
+    except (OSError, ValueError):
+        pass
+
+    deadline = time.monotonic() + START_TIMEOUT_S
+    while os.path.exists(paths.runtime_sock) and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    success({
+        "running": False,
+        "pid": info.get("pid"),
+        "requests": info.get("requests"),
+        "hints": {"start": "clrun server start"},
+    })
+
+
+def server_status_command() -> None:
+    project_root = resolve_project_root()
+
+    info = _ping(project_root)
+    if not info:
+        state = read_runtime_state(project_root)
+        success({
+            "running": False,
+            **({"last_runtime_pid": state.pid} if state else {}),
+            "hints": {"start": "clrun server start"},
+        })
+        return
+
+    success({
+        **_describe(project_root, info),
+        "hints": {"stop": "clrun server stop"},
+    })
@@ -0,0 +1,92 @@
+"""The `clrun stats` command — latency percentiles and throughput from clrun.runtime.metrics."""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from clrun.utils.paths import resolve_project_root, get_clrun_paths
+from clrun.utils.output import success, fail
+from clrun.utils.validate import session_not_found_error
+from clrun.pty.pty_manager import read_session
+from clrun.pty.session_index import load_index
+from clrun.queue.queue_engine import read_queue
+from clrun.runtime import metrics
+
+
+def _queue_latency(terminal_id: str, project_root: str) -> metrics.Histogram:
+    """Enqueue-to-sent latency from the queue's sent history."""
+    h = metrics.Histogram()
+    for entry in read_queue(terminal_id, project_root).entries:
+        if entry.status != "sent" or not entry.sent_at:
+            continue
+        try:
+            h.record(max((datetime.fromisoformat(entry.sent_at) - datetime.fromisoformat(entry.created_at))
+                         .total_seconds(), 0.0))
+        except ValueError:
+            continue
+    return h
+
+
+def _report(m: metrics.Metrics) -> Dict[str, Any]:
+    elapsed = max(m.updated - m.started, 1e-9)
+    return {
+        "counters": dict(sorted(m.counters.items())),
+        "throughput": {
+            "window_s": round(elapsed, 3),
+            "output_bytes_per_s": round(m.counters.get("output.bytes", 0) / elapsed, 1),
+            "inputs_per_s": round(m.counters.get("input.sent", 0) / elapsed, 3),
+        },
+        "latency": {name: h.summary() for name, h in sorted(m.histograms.items()) if h.count},
+    }
+
+
+def stats_command(terminal_id: Optional[str] = None) -> None:
+    project_root = resolve_project_root()
+    if not os.path.exists(get_clrun_paths(project_root).root):
+        fail("No .clrun directory found. Run `clrun <command>` to initialize.")
+        return
+    enabled = metrics.enabled(project_root)
+
+    if terminal_id:
+        session = read_session(terminal_id, project_root)
+        if not session:
+            fail(session_not_found_error(terminal_id))
+            return
+        m = metrics.load(project_root, terminal_id) or metrics.Metrics()
+        if "queue.latency" not in m.histograms:
+            m.histograms["queue.latency"] = _queue_latency(terminal_id, project_root)
+        response: Dict[str, Any] = {
+            "terminal_id": terminal_id,
+            "command": session.command,
+            "status": session.status,
+            **_report(m),
+        }
+        hints = {"project": "clrun stats", "events": f"clrun events --terminal {terminal_id}"}
+    else:
+        total = metrics.Metrics()
+        sessions = 0
+        for tid in load_index(project_root):
+            m = metrics.load(project_root, tid)
+            if m is None:
+                continue
+            total.merge(m)
+            sessions += 1
+        commands = metrics.load(project_root, metrics.COMMANDS_SCOPE) or metrics.Metrics()
+        response = {
+            "project": project_root,
+            "sessions": sessions,
+            **_report(total),
+            "commands": {
+                name.split(".", 1)[1]: h.summary() for name, h in sorted(commands.histograms.items()) if h.count
+            },
+        }
+        hints = {"session": "clrun stats <terminal_id>", "check_sessions": "clrun status"}
+        if enabled and not metrics.commands_enabled(project_root):
+            hints["commands"] = "Command latencies are opt-in: set metrics.commands to true in .clrun/config.json"
+
+    if not enabled:
+        hints["note"] = "Metrics are off (metrics.enabled); only queue history is reported."
+    response["hints"] = hints
+    success(response)
@@ -1,17 +1,56 @@
-"""The `clrun status` command — show all sessions and their state."""
+"""The `clrun status` command — list sessions, with filtering and pagination."""
 
 from __future__ import annotations
 
 import os
+import shlex
+from typing import List, Optional, Sequence
 
 from clrun.utils.paths import resolve_project_root, get_clrun_paths
 from clrun.utils.output import success, fail
-from clrun.pty.pty_manager import list_sessions
+from clrun.utils.timespec import parse_time
+from clrun.pty.session_index import SESSION_STATES, load_index, query_index
 from clrun.runtime.crash_recovery import recover_sessions
-from clrun.queue.queue_engine import pending_count
+from clrun.runtime.heartbeat import overlay, read_heartbeats
 
 
-def status_command() -> None:
+def session_entry(terminal_id: str, session: dict) -> dict:
+    """Status listing entry for one session index record."""
+    entry: dict = {
+        "terminal_id": terminal_id,
+        "command": session.get("command", ""),
+        "status": session["status"],
+        "pid": session.get("pid"),
+        "queue_length": session.get("queue_length", 0),
+        "created_at": session.get("created_at", ""),
+        "last_activity_at": session.get("last_activity_at", ""),
+    }
+    if session.get("last_exit_code") is not None:
+        entry["exit_code"] = session["last_exit_code"]
+    if session["status"] == "suspended" and session.get("suspended_at"):
+        entry["suspended_at"] = session["suspended_at"]
+        entry["saved_cwd"] = session.get("saved_cwd")
+    return entry
+
+
+def _parse_states(states: Optional[Sequence[str]]) -> List[str]:
+    parsed: List[str] = []
+    for value in states or ():
+        parsed.extend(v.strip().lower() for v in value.split(",") if v.strip())
+    return parsed
+
+
+def status_command(
+    states: Optional[Sequence[str]] = None,
+    command: Optional[str] = None,
+    since: Optional[str] = None,
+    active_since: Optional[str] = None,
+    id_prefix: Optional[str] = None,
+    sort: str = "created",
+    desc: bool = False,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> None:
     project_root = resolve_project_root()
     paths = get_clrun_paths(project_root)
 
@@ -19,46 +58,79 @@ def status_command() -> None:
         fail("No .clrun directory found. Run `clrun <command>` to initialize.")
         return
 
+    wanted = _parse_states(states)
+    unknown = [s for s in wanted if s not in SESSION_STATES]
+    if unknown:
+        fail({
+            "error": f"Unknown state(s): {', '.join(unknown)}",
+            "hints": {"valid_states": ", ".join(SESSION_STATES)},
+        })
+        return
+    if limit is not None and limit < 1:
+        fail({"error": "--limit must be at least 1", "hints": {"example": "clrun status --limit 20"}})
+        return
+    times = {}
+    for flag, value in (("since", since), ("active_since", active_since)):
+        try:
+            times[flag] = parse_time(value) if value else None
+        except ValueError:
+            fail({
+                "error": f"Invalid time for --{flag.replace('_', '-')}: {value}",
+                "hints": {"formats": "age like 90s, 15m, 2h, 1d, 1w — or ISO 8601 like 2026-01-31T09:00:00Z"},
+            })
+            return
+    since_ts, active_ts = times["since"], times["active_since"]
+
     recover_sessions(project_root)
-    sessions = list_sessions(project_root)
-
-    enriched = []
-    for session in sessions:
-        entry: dict = {
-            "terminal_id": session.terminal_id,
-            "command": session.command,
-            "status": session.status,
-            "pid": session.pid,
-            "queue_length": pending_count(session.terminal_id, project_root),
-            "created_at": session.created_at,
-            "last_activity_at": session.last_activity_at,
-        }
-        if session.last_exit_code is not None:
-            entry["exit_code"] = session.last_exit_code
-        if session.status == "suspended" and session.saved_state:
-            entry["suspended_at"] = session.saved_state.captured_at
-            entry["saved_cwd"] = session.saved_state.cwd
-        enriched.append(entry)
-
-    running = [s for s in enriched if s["status"] == "running"]
-    suspended = [s for s in enriched if s["status"] == "suspended"]
-    exited = [s for s in enriched if s["status"] == "exited"]
-    detached = [s for s in enriched if s["status"] == "detached"]
-    killed = [s for s in enriched if s["status"] == "killed"]
-
-    success({
-        "project": project_root,
-        "running": len(running),
-        "suspended": len(suspended),
-        "exited": len(exited),
-        "detached": len(detached),
-        "killed": len(killed),
-        "sessions": enriched,
-        "hints": {
-            "view_session": "clrun <terminal_id>",
-            "send_input": 'clrun <terminal_id> "<command>"',
-            "resume_suspended": 'clrun <terminal_id> "<command>"  # auto-restores',
-            "kill_session": "clrun kill <terminal_id>",
-            "new_session": "clrun <command>",
-        },
-    })
+    index = overlay(load_index(project_root), read_heartbeats(project_root))
+
+    try:
+        page, matched, next_cursor = query_index(
+            index, states=wanted, command=command, since=since_ts, active_since=active_ts,
+            id_prefix=id_prefix, sort=sort, desc=desc, limit=limit, cursor=cursor,
+        )
+    except ValueError as e:
+        fail({"error": str(e), "hints": {"note": "Pass the next_cursor value from a previous status response."}})
+        return
+
+    counts = {state: 0 for state in SESSION_STATES}
+    for session in index.values():
+        if session.get("status") in counts:
+            counts[session["status"]] += 1
+
+    filtered = bool(wanted or command or since or active_since or id_prefix or limit or cursor)
+    response: dict = {"project": project_root}
+    response.update(counts)
+    if filtered:
+        response["matched"] = matched
+    response["sessions"] = [session_entry(tid, s) for tid, s in page]
+    if next_cursor:
+        response["next_cursor"] = next_cursor
+
+    hints = {
+        "view_session": "clrun <terminal_id>",
+        "send_input": 'clrun <terminal_id> "<command>"',
+        "resume_suspended": 'clrun <terminal_id> "<command>"  # auto-restores',
+        "kill_session": "clrun kill <terminal_id>",
+        "new_session": "clrun <command>",
+    }
+    if next_cursor:
+        args = [f"--state {','.join(wanted)}"] if wanted else []
+        if command:
+            args.append(f"--command {shlex.quote(command)}")
+        if since:
+            args.append(f"--since {shlex.quote(since_ts or since)}")
+        if active_since:
+            args.append(f"--active-since {shlex.quote(active_ts or active_since)}")
+        if id_prefix:
+            args.append(f"--id {shlex.quote(id_prefix)}")
+        if sort != "created":
+            args.append(f"--sort {sort}")
+        if desc:
+            args.append("--desc")
+        args += [f"--limit {limit}", f"--cursor {next_cursor}"]
+        hints["next_page"] = "clrun status " + " ".join(args)
+    elif not filtered and len(page) > 50:
+        hints["filter"] = "clrun status --state running  # also --command, --since 1h, --id, --limit"
+    response["hints"] = hints
+    success(response)
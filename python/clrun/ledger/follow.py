@@ -0,0 +1,240 @@
+"""Follow the event ledger: yield new events as they are appended.
+
+    for entry in follow_events(root, types=["session.exited"], timeout=60):
+        ...
+
+A follower holds a position in the ledger: the followed segment's inode
+and a byte offset, or the last row id under the SQLite backend. Each poll
+reads only what was appended after that position. When nothing has
+changed, the check costs one stat() of events.log (or one primary-key
+range query). `follow()` polls every `poll_interval` and backs off to
+`max_poll_interval` while the ledger is quiet.
+
+When events.log is rotated, the follower finds the renamed segment by
+inode, finishes it, and then moves on to the new events.log. With `since`,
+the follower starts at the first index block (see clrun.ledger.query) that
+holds events at or after that time, and catches up from there.
+
+`cursor` is an opaque string naming the position after the last poll,
+or, inside `follow()`, after the last event it yielded. Pass it back to
+resume without missing or repeating events.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from clrun import store
+from clrun.ledger import writer
+from clrun.ledger.query import parse_lines_at, segment_index
+from clrun.utils.paths import get_clrun_paths
+
+POLL_INTERVAL_S = 0.05
+MAX_POLL_INTERVAL_S = 1.0
+SQLITE_BATCH = 1000
+
+# A matching event and the follower position just past it: (inode, offset, row).
+_Positioned = Tuple[Dict[str, Any], Tuple[int, int, int]]
+
+
+def _inode(path: str) -> int:
+    return _stat(path)[0]
+
+
+def _stat(path: str) -> Tuple[int, int]:
+    """(inode, size) of a file; (0, 0) if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return 0, 0
+    return st.st_ino, st.st_size
+
+
+class LedgerFollower:
+    """A position in the ledger; poll() returns the matching events appended since."""
+
+    def __init__(
+        self,
+        project_root: str,
+        terminal_id: Optional[str] = None,
+        types: Optional[Iterable[str]] = None,
+        since: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> None:
+        self.project_root = project_root
+        self.terminal_id = terminal_id
+        self.types = set(types) if types else None
+        self.since = since
+        self._needle = terminal_id.encode() if terminal_id else None
+        self._active = get_clrun_paths(project_root).events_log
+        self._db = store.sqlite(project_root)
+        self._ino = self._offset = self._row = 0
+        writer.flush(project_root)
+        if cursor:
+            self._restore(cursor)
+        elif self._db:
+            self._row = self._db.last_event_id(project_root, before=since)
+        elif since:
+            self._seek_time(since)
+        else:
+            self._seek_end()
+
+    @property
+    def cursor(self) -> str:
+        return f"sqlite:{self._row}" if self._db else f"{self._ino}:{self._offset}"
+
+    def _restore(self, cursor: str) -> None:
+        kind, _, value = cursor.partition(":")
+        try:
+            if kind == "sqlite":
+                if not self._db:
+                    raise ValueError
+                self._row = int(value)
+            else:
+                if self._db:
+                    raise ValueError
+                self._ino, self._offset = int(kind), int(value)
+        except ValueError:
+            raise ValueError(f"Invalid cursor for this state backend: {cursor}") from None
+
+    def _seek_end(self) -> None:
+        try:
+            with open(self._active, "rb") as f:
+                ino = os.fstat(f.fileno()).st_ino
+                size = f.seek(0, os.SEEK_END)
+                # Start after the last complete line.
+                tail = min(size, 1 << 16)
+                f.seek(size - tail)
+                self._ino, self._offset = ino, size - tail + f.read(tail).rfind(b"\n") + 1
+        except OSError:
+            self._ino = self._offset = 0
+
+    def _seek_time(self, since: str) -> None:
+        for path in writer.segments(self.project_root):
+            index = segment_index(self.project_root, path)
+            if not index:
+                continue
+            for offset, _, _, hi, count in index["blocks"]:
+                if count and hi >= since:
+                    self._ino, self._offset = index["ino"], offset
+                    return
+        self._seek_end()
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """Matching events appended since the last poll (or since the follower was created)."""
+        return [entry for entry, _ in self._read()]
+
+    def _read(self) -> List[_Positioned]:
+        writer.flush(self.project_root)
+        if self._db:
+            return self._poll_sqlite()
+        return self._poll_files()
+
+    def _poll_sqlite(self) -> List[_Positioned]:
+        events: List[_Positioned] = []
+        while True:
+            batch, row = self._db.events_after(
+                self.project_root, self._row, self.terminal_id, self.types, self.since, SQLITE_BATCH)
+            events.extend((entry, (0, 0, row_id)) for row_id, entry in batch)
+            if row == self._row:
+                return events
+            self._row = row
+
+    def _poll_files(self) -> List[_Positioned]:
+        events: List[_Positioned] = []
+        while True:
+            ino, size = _stat(self._active)
+            if ino == self._ino:
+                if ino and size > self._offset:
+                    self._drain(self._active, events)
+                return events
+            if not self._ino:
+                # There was no events.log when the follower started.
+                self._ino, self._offset = ino, 0
+                continue
+
+            # The followed segment was rotated away, or the follower is
+            # catching up from `since`: finish it, then take the next one.
+            files = [(i, p) for p in writer.segments(self.project_root) for i in [_inode(p)] if i]
+            inodes = [i for i, _ in files]
+            if self._ino in inodes:
+                at = inodes.index(self._ino)
+                self._drain(files[at][1], events)
+                if at + 1 >= len(files):
+                    return events  # events.log is being recreated
+                self._ino, self._offset = files[at + 1][0], 0
+            elif files:
+                # Deleted by gc before the follower got to it: go on from the
+                # oldest remaining segment, skipping events already returned.
+                if events:
+                    self.since = max(self.since or "", events[-1][0].get("timestamp", ""))
+                self._ino, self._offset = files[0][0], 0
+            else:
+                return events
+
+    def _drain(self, path: str, events: List[_Positioned]) -> None:
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return
+        with f:
+            if os.fstat(f.fileno()).st_ino != self._ino:
+                return  # renamed between stat and open; the caller looks again
+            f.seek(self._offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1  # a partially written line waits for the next poll
+        ino, start = self._ino, self._offset
+        self._offset += end
+        for entry, at in parse_lines_at(data[:end], self._needle, self.terminal_id, self.types, self.since):
+            events.append((entry, (ino, start + at, 0)))
+
+    def follow(
+        self,
+        timeout: Optional[float] = None,
+        poll_interval: float = POLL_INTERVAL_S,
+        max_poll_interval: float = MAX_POLL_INTERVAL_S,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield events as they arrive; stop after `timeout` seconds without one (None: never).
+
+        While the caller holds an event, `cursor` is just past that event,
+        so stopping early (e.g. after N events) resumes at the next one.
+        """
+        interval = poll_interval
+        idle_since = time.monotonic()
+        while True:
+            events = self._read()
+            if events:
+                end = (self._ino, self._offset, self._row)
+                for entry, position in events:
+                    self._ino, self._offset, self._row = position
+                    yield entry
+                self._ino, self._offset, self._row = end
+                interval = poll_interval
+                idle_since = time.monotonic()
+                continue
+            wait = interval
+            if timeout is not None:
+                remaining = timeout - (time.monotonic() - idle_since)
+                if remaining <= 0:
+                    return
+                wait = min(wait, remaining)
+            time.sleep(wait)
+            interval = min(interval * 2, max_poll_interval)
+
+
+def follow_events(
+    project_root: str,
+    terminal_id: Optional[str] = None,
+    types: Optional[Iterable[str]] = None,
+    since: Optional[str] = None,
+    cursor: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Iterate over matching events as they are logged (see LedgerFollower).
+
+    The position is taken when this is called, so events logged before the
+    first next() are not missed.
+    """
+    return LedgerFollower(project_root, terminal_id, types, since, cursor).follow(timeout)
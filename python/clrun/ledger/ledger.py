@@ -2,12 +2,10 @@
 
 from __future__ import annotations
 
-import json
-import os
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-from clrun.utils.paths import get_clrun_paths, ensure_clrun_dirs
+from clrun.ledger import writer
 
 
 def log_event(
@@ -16,8 +14,7 @@ def log_event(
     terminal_id: Optional[str] = None,
     data: Optional[Dict[str, Any]] = None,
 ) -> None:
-    ensure_clrun_dirs(project_root)
-    paths = get_clrun_paths(project_root)
+    """Record an event; it is buffered and written within `ledger.flush_interval`."""
     entry: Dict[str, Any] = {
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "event": event,
@@ -26,23 +23,24 @@ def log_event(
         entry["terminal_id"] = terminal_id
     if data:
         entry["data"] = data
-    with open(paths.events_log, "a", encoding="utf-8") as f:
-        f.write(json.dumps(entry) + "\n")
-
-
-def read_events(project_root: str) -> List[Dict[str, Any]]:
-    paths = get_clrun_paths(project_root)
-    if not os.path.exists(paths.events_log):
-        return []
-    with open(paths.events_log, "r", encoding="utf-8") as f:
-        content = f.read().strip()
-    if not content:
-        return []
-    events: List[Dict[str, Any]] = []
-    for line in content.split("\n"):
-        if line.strip():
-            try:
-                events.append(json.loads(line))
-            except Exception:
-                pass
-    return events
+    writer.writer_for(project_root).append(entry)
+
+
+def read_events(
+    project_root: str,
+    terminal_id: Optional[str] = None,
+    event: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Ledger events, oldest first, optionally filtered.
+
+    `since` is a UTC ISO timestamp; with `limit`, the most recent `limit`
+    matching events are returned. See clrun.ledger.query for streaming.
+    """
+    from clrun.ledger.query import last_events, query_events
+
+    types = [event] if event else None
+    if limit is not None:
+        return last_events(project_root, limit, terminal_id, types, since)
+    return list(query_events(project_root, terminal_id, types, since))
@@ -0,0 +1,376 @@
+"""Streaming queries over the event ledger, backed by sparse segment indexes.
+
+Each ledger segment (see clrun.ledger.writer) gets an index in
+`.clrun/ledger/index/<inode>.idx`. The index splits the segment into blocks
+of about BLOCK_BYTES and records, per block, its byte range, its time range
+and its event count. It also keeps posting lists of blocks per terminal ID
+and per event type. Keying by inode means a segment keeps its index when
+events.log is rotated into events.<n>.log.
+
+Indexes are built on first query. For the active events.log they are
+extended incrementally from the last indexed offset. A query reads only the
+blocks that can match, so asking for one terminal's last events costs a few
+block reads regardless of the ledger's size.
+
+    for entry in query_events(root, terminal_id=tid, since=ts, reverse=True):
+        ...
+
+Under the SQLite backend the same generator is served by the events table's
+indexes.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from clrun import store
+from clrun.ledger import writer
+from clrun.utils import cache
+from clrun.utils.paths import get_clrun_paths
+
+INDEX_DIR = "index"
+INDEX_VERSION = 1
+BLOCK_BYTES = 256 << 10
+HEAD_BYTES = 64
+
+# log_event writes keys in this order; anything else falls back to json.loads.
+_PREFIX_RE = re.compile(
+    rb'^\{"timestamp": "([^"]*)", "event": "([^"]*)"(?:, "terminal_id": "([^"]*)")?'
+)
+
+# Indexes already read by this process. Guarded by _lock (the runtime
+# server queries from several threads); an index is copied before it is
+# extended, so a caller still reading an older one is never changed under it.
+_loaded: Dict[str, Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+
+def index_dir(project_root: str) -> str:
+    return os.path.join(get_clrun_paths(project_root).ledger_dir, INDEX_DIR)
+
+
+def _index_path(project_root: str, ino: int) -> str:
+    return os.path.join(index_dir(project_root), f"{ino}.idx")
+
+
+def _fields(line: bytes) -> Optional[Tuple[str, str, Optional[str]]]:
+    """(timestamp, event, terminal_id) of one ledger line, or None if unparseable."""
+    m = _PREFIX_RE.match(line)
+    if m:
+        tid = m.group(3)
+        return m.group(1).decode(), m.group(2).decode(), tid.decode() if tid else None
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return None
+    return entry.get("timestamp", ""), entry.get("event", ""), entry.get("terminal_id")
+
+
+def _empty_index(ino: int, head: str) -> Dict[str, Any]:
+    return {"version": INDEX_VERSION, "ino": ino, "head": head, "size": 0,
+            "blocks": [], "terminals": {}, "types": {}}
+
+
+def _drop_last_block(index: Dict[str, Any]) -> None:
+    last = len(index["blocks"]) - 1
+    offset = index["blocks"].pop()[0]
+    for postings in (index["terminals"], index["types"]):
+        for key in list(postings):
+            if postings[key] and postings[key][-1] == last:
+                postings[key].pop()
+                if not postings[key]:
+                    del postings[key]
+    index["size"] = offset
+
+
+def _copy(index: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **index,
+        "blocks": [list(block) for block in index["blocks"]],
+        "terminals": {k: list(v) for k, v in index["terminals"].items()},
+        "types": {k: list(v) for k, v in index["types"].items()},
+    }
+
+
+def _extend(index: Dict[str, Any], path: str, file_size: int) -> None:
+    """Index complete lines from index["size"] to the end of the file."""
+    # Re-open a small trailing block instead of adding another small one.
+    if index["blocks"] and index["blocks"][-1][1] < BLOCK_BYTES // 2:
+        _drop_last_block(index)
+
+    with open(path, "rb") as f:
+        f.seek(index["size"])
+        data = f.read(file_size - index["size"])
+    end = data.rfind(b"\n") + 1  # a partially written last line waits for the next query
+    pos = 0
+    while pos < end:
+        stop = data.find(b"\n", min(pos + BLOCK_BYTES, end) - 1) + 1 or end
+        block_no = len(index["blocks"])
+        lo = hi = None
+        count = 0
+        terminals: Set[str] = set()
+        types: Set[str] = set()
+        for line in data[pos:stop].splitlines():
+            fields = _fields(line)
+            if not fields:
+                continue
+            ts, name, tid = fields
+            lo = ts if lo is None or ts < lo else lo
+            hi = ts if hi is None or ts > hi else hi
+            count += 1
+            types.add(name)
+            if tid:
+                terminals.add(tid)
+        index["blocks"].append([index["size"] + pos, stop - pos, lo or "", hi or "", count])
+        for tid in terminals:
+            index["terminals"].setdefault(tid, []).append(block_no)
+        for name in types:
+            index["types"].setdefault(name, []).append(block_no)
+        pos = stop
+    index["size"] += end
+
+
+def segment_index(project_root: str, path: str) -> Optional[Dict[str, Any]]:
+    """The (up-to-date) index of one segment; None if the segment is gone."""
+    try:
+        st = os.stat(path)
+        with open(path, "rb") as f:
+            head = f.read(HEAD_BYTES).decode("utf-8", "replace")
+    except OSError:
+        return None
+    ipath = _index_path(project_root, st.st_ino)
+    with _lock:
+        index = _loaded.get(ipath) if cache.is_enabled() else None
+        if index is None:
+            try:
+                with open(ipath, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = None
+        if (not index or index.get("version") != INDEX_VERSION or index.get("ino") != st.st_ino
+                or not head.startswith(index.get("head", "")[:len(head)]) or index.get("size", 0) > st.st_size):
+            index = _empty_index(st.st_ino, head)
+
+        if index["size"] < st.st_size or len(index["head"]) < len(head):
+            index = _copy(index)
+            index["head"] = max(index["head"], head, key=len)
+            if index["size"] < st.st_size:
+                _extend(index, path, st.st_size)
+                os.makedirs(os.path.dirname(ipath), exist_ok=True)
+                tmp = ipath + f".tmp.{os.getpid()}.{threading.get_ident()}"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(index, f, separators=(",", ":"))
+                os.replace(tmp, ipath)
+        if cache.is_enabled():
+            _loaded[ipath] = index
+    return index
+
+
+def prune_indexes(project_root: str) -> int:
+    """Remove indexes of segments that no longer exist; returns the count."""
+    live = set()
+    for path in writer.segments(project_root):
+        try:
+            live.add(f"{os.stat(path).st_ino}.idx")
+        except OSError:
+            continue
+    removed = 0
+    directory = index_dir(project_root)
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return 0
+    for name in names:
+        if name not in live:
+            try:
+                os.unlink(os.path.join(directory, name))
+                with _lock:
+                    _loaded.pop(os.path.join(directory, name), None)
+                removed += 1
+            except OSError:
+                continue
+    return removed
+
+
+def _candidate_blocks(
+    index: Dict[str, Any],
+    terminal_id: Optional[str],
+    types: Optional[Set[str]],
+    since: Optional[str],
+    until: Optional[str],
+) -> List[int]:
+    candidates: Optional[Set[int]] = None
+    if terminal_id:
+        candidates = set(index["terminals"].get(terminal_id, ()))
+    if types:
+        by_type: Set[int] = set()
+        for name in types:
+            by_type.update(index["types"].get(name, ()))
+        candidates = by_type if candidates is None else candidates & by_type
+    blocks = index["blocks"]
+    numbers = sorted(candidates) if candidates is not None else range(len(blocks))
+    return [
+        n for n in numbers
+        if blocks[n][4]
+        and (since is None or blocks[n][3] >= since)
+        and (until is None or blocks[n][2] <= until)
+    ]
+
+
+def _matches(
+    fields: Tuple[str, str, Optional[str]],
+    terminal_id: Optional[str],
+    types: Optional[Set[str]],
+    since: Optional[str],
+    until: Optional[str],
+) -> bool:
+    ts, name, tid = fields
+    return (
+        (not terminal_id or tid == terminal_id)
+        and (not types or name in types)
+        and (since is None or ts >= since)
+        and (until is None or ts <= until)
+    )
+
+
+def _lines(block: bytes, needle: Optional[bytes]) -> List[bytes]:
+    """The block's lines, or only those containing `needle` (found with bytes.find)."""
+    if needle is None:
+        return block.splitlines()
+    found: List[bytes] = []
+    pos = block.find(needle)
+    while pos >= 0:
+        start = block.rfind(b"\n", 0, pos) + 1
+        end = block.find(b"\n", pos)
+        if end < 0:
+            end = len(block)
+        found.append(block[start:end])
+        pos = block.find(needle, end)
+    return found
+
+
+def read_segment(
+    path: str,
+    index: Dict[str, Any],
+    terminal_id: Optional[str],
+    types: Optional[Set[str]],
+    since: Optional[str],
+    until: Optional[str],
+    reverse: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """Matching events of one segment, up to index["size"]."""
+    blocks = _candidate_blocks(index, terminal_id, types, since, until)
+    if not blocks:
+        return
+    needle = terminal_id.encode() if terminal_id else None
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return
+    with f:
+        for n in reversed(blocks) if reverse else blocks:
+            offset, length = index["blocks"][n][:2]
+            f.seek(offset)
+            yield from parse_lines(f.read(length), needle, terminal_id, types, since, until, reverse)
+
+
+def parse_lines(
+    data: bytes,
+    needle: Optional[bytes],
+    terminal_id: Optional[str],
+    types: Optional[Set[str]],
+    since: Optional[str],
+    until: Optional[str],
+    reverse: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """Matching events among complete ledger lines; `needle` is the encoded terminal_id."""
+    lines = _lines(data, needle)
+    for line in reversed(lines) if reverse else lines:
+        fields = _fields(line)
+        if not fields or not _matches(fields, terminal_id, types, since, until):
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+
+def parse_lines_at(
+    data: bytes,
+    needle: Optional[bytes],
+    terminal_id: Optional[str],
+    types: Optional[Set[str]],
+    since: Optional[str],
+) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """As parse_lines (oldest first), with the offset in `data` just past each event's line."""
+    pos = 0
+    while pos < len(data):
+        if needle is None:
+            start = pos
+        else:
+            hit = data.find(needle, pos)
+            if hit < 0:
+                return
+            start = data.rfind(b"\n", 0, hit) + 1
+        end = data.find(b"\n", start)
+        end = len(data) if end < 0 else end + 1
+        pos = end
+        line = data[start:end].rstrip(b"\r\n")
+        fields = _fields(line)
+        if not fields or not _matches(fields, terminal_id, types, since, None):
+            continue
+        try:
+            yield json.loads(line), end
+        except ValueError:
+            continue
+
+
+def query_events(
+    project_root: str,
+    terminal_id: Optional[str] = None,
+    types: Optional[Iterable[str]] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    reverse: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """Matching ledger events, oldest first (newest first with `reverse`).
+
+    `since`/`until` are inclusive UTC ISO timestamps. The generator reads
+    lazily; stop iterating after N events for "first/last N".
+    """
+    wanted: Optional[Set[str]] = set(types) if types else None
+    writer.flush(project_root)
+    db = store.sqlite(project_root)
+    if db:
+        yield from db.query_events(project_root, terminal_id, wanted, since, until, reverse)
+        return
+
+    files = writer.segments(project_root)
+    for path in reversed(files) if reverse else files:
+        index = segment_index(project_root, path)
+        if index:
+            yield from read_segment(path, index, terminal_id, wanted, since, until, reverse)
+
+
+def last_events(
+    project_root: str,
+    limit: int,
+    terminal_id: Optional[str] = None,
+    types: Optional[Sequence[str]] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """The most recent `limit` matching events, oldest first (read in reverse)."""
+    found: List[Dict[str, Any]] = []
+    if limit <= 0:
+        return found
+    for entry in query_events(project_root, terminal_id, types, since, until, reverse=True):
+        found.append(entry)
+        if len(found) >= limit:
+            break
+    found.reverse()
+    return found
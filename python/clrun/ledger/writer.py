@@ -0,0 +1,208 @@
+"""Buffered ledger writer: batched appends and size-based segment rotation.
+
+One writer per project per process. Events are buffered and written as a
+single O_APPEND write: once MAX_BATCH events are pending, after at most
+`ledger.flush_interval`, before the ledger is read in-process, and at exit.
+The file descriptor stays open between batches, and the directory is only
+created when opening fails.
+
+When `events.log` reaches `ledger.segment_bytes` it is renamed to
+`events.<n>.log` (n increasing, so older segments sort first) under an
+flock, and writers in other processes notice the new inode on their next
+flush and reopen.
+"""
+
+from __future__ import annotations
+
+import atexit
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from clrun import store
+from clrun.utils.config import load_config, parse_size
+from clrun.utils.paths import ensure_clrun_dirs, get_clrun_paths
+from clrun.utils.timespec import parse_duration
+
+MAX_BATCH = 256
+DEFAULT_FLUSH_INTERVAL_S = 0.05
+DEFAULT_SEGMENT_BYTES = 16 << 20
+LOCK_FILE = ".rotate.lock"
+
+_SEGMENT_RE = re.compile(r"^events\.(\d+)\.log$")
+
+
+def segments(project_root: str) -> List[str]:
+    """Ledger files oldest first: rotated segments, then events.log."""
+    paths = get_clrun_paths(project_root)
+    try:
+        names = os.listdir(paths.ledger_dir)
+    except OSError:
+        return []
+    numbered = sorted(
+        (int(m.group(1)), name) for name in names for m in [_SEGMENT_RE.match(name)] if m
+    )
+    files = [os.path.join(paths.ledger_dir, name) for _, name in numbered]
+    if "events.log" in names:
+        files.append(paths.events_log)
+    return files
+
+
+def next_segment(project_root: str) -> str:
+    paths = get_clrun_paths(project_root)
+    numbers = [int(m.group(1)) for name in os.listdir(paths.ledger_dir) for m in [_SEGMENT_RE.match(name)] if m]
+    return os.path.join(paths.ledger_dir, f"events.{max(numbers, default=0) + 1}.log")
+
+
+class LedgerWriter:
+    def __init__(self, project_root: str, flush_interval_s: float, segment_bytes: Optional[int]) -> None:
+        self.project_root = project_root
+        self.path = get_clrun_paths(project_root).events_log
+        self.flush_interval_s = flush_interval_s
+        self.segment_bytes = segment_bytes
+        self._lock = threading.RLock()  # re-entered when a signal handler exits mid-append
+        self._pending: List[Dict[str, Any]] = []
+        self._fd: Optional[int] = None
+        self._ino = 0
+        self._size = 0
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, project_root: str) -> "LedgerWriter":
+        settings = load_config(project_root).get("ledger", {})
+        try:
+            interval = parse_duration(settings.get("flush_interval"))
+        except ValueError:
+            interval = None
+        try:
+            segment = parse_size(settings.get("segment_bytes"))
+        except ValueError:
+            segment = DEFAULT_SEGMENT_BYTES
+        return cls(project_root, DEFAULT_FLUSH_INTERVAL_S if interval is None else interval, segment)
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._pending.append(entry)
+            if len(self._pending) >= MAX_BATCH or self.flush_interval_s <= 0:
+                self.flush()
+                return
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="clrun-ledger", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            time.sleep(self.flush_interval_s)
+            try:
+                self.flush()
+            except Exception:
+                pass
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            db = store.sqlite(self.project_root)
+            if db:
+                db.log_events(batch, self.project_root)
+                return
+            data = "".join(json.dumps(e) + "\n" for e in batch).encode("utf-8")
+            fd = self._open()
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            self._size += len(data)
+            if self.segment_bytes and self._size >= self.segment_bytes:
+                self._rotate()
+
+    def _open(self) -> int:
+        if self._fd is not None:
+            try:
+                if os.stat(self.path).st_ino == self._ino:
+                    return self._fd
+            except OSError:
+                pass
+            self.close()  # rotated (or removed) by another process
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        except FileNotFoundError:
+            ensure_clrun_dirs(self.project_root)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        st = os.fstat(fd)
+        self._fd, self._ino, self._size = fd, st.st_ino, st.st_size
+        return fd
+
+    def _rotate(self) -> None:
+        lock_path = os.path.join(os.path.dirname(self.path), LOCK_FILE)
+        with open(lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                if os.stat(self.path).st_size >= (self.segment_bytes or 0):
+                    os.rename(self.path, next_segment(self.project_root))
+            except OSError:
+                pass
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+_writers: Dict[str, LedgerWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def writer_for(project_root: str) -> LedgerWriter:
+    writer = _writers.get(project_root)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(project_root)
+            if writer is None:
+                writer = _writers[project_root] = LedgerWriter.from_config(project_root)
+    return writer
+
+
+def flush(project_root: Optional[str] = None) -> None:
+    """Write out buffered events (for one project, or all)."""
+    if project_root is None:
+        writers = list(_writers.values())
+    else:
+        writers = [_writers[project_root]] if project_root in _writers else []
+    for writer in writers:
+        try:
+            writer.flush()
+        except OSError:
+            pass
+
+
+def close_all() -> None:
+    """Flush and close every writer (for a process leaving with os._exit, which skips atexit)."""
+    for writer in list(_writers.values()):
+        try:
+            writer.flush()
+        except OSError:
+            pass
+        writer.close()
+
+
+def _after_fork() -> None:
+    # The child gets copies of the parent's buffers, locks and descriptors
+    # but not its flusher threads; start over.
+    global _writers_lock
+    _writers.clear()
+    _writers_lock = threading.Lock()
+
+
+atexit.register(flush)
+os.register_at_fork(after_in_child=_after_fork)
@@ -0,0 +1,208 @@
+"""PTY backends: how a worker runs its shell on a pseudo-terminal.
+
+The worker needs little from a PTY library: spawn a shell, read what is
+available without blocking, write input, and find out whether (and how)
+the shell exited. `PtyProcess` is that interface, with two backends:
+
+  * "pexpect" (default): pexpect.spawn, as the worker has always used.
+  * "stdlib": pty.fork, os.read/os.write and waitpid. It skips pexpect's
+    import (about a quarter of a worker's import time), its per-read
+    select and buffering, and its 50 ms delay before every send.
+
+The backend is chosen by `worker.pty_backend` in .clrun/config.json, or
+per session with CLRUN_WORKER_PTY_BACKEND in the environment of the
+`clrun` call that starts it. The session records it (`pty_backend`) and
+keeps it across suspend and restore.
+"""
+
+from __future__ import annotations
+
+import codecs
+import errno
+import fcntl
+import os
+import select
+import signal
+import struct
+import termios
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+
+from clrun.utils.config import load_config
+
+BACKENDS = ("pexpect", "stdlib")
+DEFAULT_BACKEND = "pexpect"
+# Between the signals of terminate(), as pexpect's delayafterterminate.
+TERMINATE_DELAY_S = 0.1
+
+
+def backend_name(project_root: str) -> str:
+    """The project's configured backend (unknown names fall back to the default)."""
+    name = str(load_config(project_root).get("worker", {}).get("pty_backend", DEFAULT_BACKEND)).lower()
+    return name if name in BACKENDS else DEFAULT_BACKEND
+
+
+class PtyProcess(ABC):
+    """A shell running on a PTY, as seen by the worker.
+
+    `read` returns the decoded text available right now ("" if none) and
+    raises EOFError once the terminal has closed. After `isalive` has
+    returned False, `exitstatus` or `signalstatus` tells how it ended.
+    """
+
+    name = ""
+    pid: int
+    child_fd: int
+    exitstatus: Optional[int] = None
+    signalstatus: Optional[int] = None
+
+    def fileno(self) -> int:
+        return self.child_fd
+
+    @abstractmethod
+    def read(self, size: int) -> str: ...
+
+    @abstractmethod
+    def send(self, text: str) -> None: ...
+
+    def sendline(self, text: str = "") -> None:
+        self.send(text + os.linesep)
+
+    @abstractmethod
+    def isalive(self) -> bool: ...
+
+    @abstractmethod
+    def terminate(self, force: bool = False) -> bool: ...
+
+
+class PexpectProcess(PtyProcess):
+    """pexpect.spawn behind the PtyProcess interface."""
+
+    name = "pexpect"
+
+    def __init__(self, argv: Tuple[str, ...], cwd: str, env: Dict[str, str], dimensions: Tuple[int, int]) -> None:
+        import pexpect
+
+        self._pexpect = pexpect
+        self._child = pexpect.spawn(
+            argv[0], list(argv[1:]), encoding="utf-8", cwd=cwd, env=env, dimensions=dimensions, timeout=None,
+        )
+        self.pid = self._child.pid
+        self.child_fd = self._child.child_fd
+
+    def read(self, size: int) -> str:
+        try:
+            return self._child.read_nonblocking(size=size, timeout=0)
+        except self._pexpect.TIMEOUT:
+            return ""
+        except self._pexpect.EOF:
+            raise EOFError from None
+
+    def send(self, text: str) -> None:
+        self._child.send(text)
+
+    def sendline(self, text: str = "") -> None:
+        self._child.sendline(text)
+
+    def isalive(self) -> bool:
+        alive = self._child.isalive()
+        self.exitstatus, self.signalstatus = self._child.exitstatus, self._child.signalstatus
+        return alive
+
+    def terminate(self, force: bool = False) -> bool:
+        return self._child.terminate(force=force)
+
+
+class StdlibProcess(PtyProcess):
+    """A shell on a PTY from pty.fork, read and written with plain os calls."""
+
+    name = "stdlib"
+
+    def __init__(self, argv: Tuple[str, ...], cwd: str, env: Dict[str, str], dimensions: Tuple[int, int]) -> None:
+        import pty
+
+        pid, fd = pty.fork()
+        if pid == 0:
+            _exec_child(argv, cwd, env, dimensions)
+        self.pid = pid
+        self.child_fd = fd
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._exited = False
+
+    def read(self, size: int) -> str:
+        if not select.select([self.child_fd], [], [], 0)[0]:
+            return ""
+        try:
+            data = os.read(self.child_fd, size)
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EINTR):
+                return ""
+            raise EOFError from None  # EIO: every process on the terminal is gone
+        if not data:
+            raise EOFError
+        return self._decoder.decode(data)
+
+    def send(self, text: str) -> None:
+        data = text.encode("utf-8")
+        while data:
+            try:
+                written = os.write(self.child_fd, data)
+            except InterruptedError:
+                continue
+            data = data[written:]
+
+    def isalive(self) -> bool:
+        if self._exited:
+            return False
+        try:
+            pid, status = os.waitpid(self.pid, os.WNOHANG)
+        except ChildProcessError:
+            # Reaped elsewhere (SIGCHLD ignored): gone, with no status to report.
+            self._exited = True
+            return False
+        if pid == 0:
+            return True
+        self._exited = True
+        if os.WIFEXITED(status):
+            self.exitstatus = os.WEXITSTATUS(status)
+        elif os.WIFSIGNALED(status):
+            self.signalstatus = os.WTERMSIG(status)
+        return False
+
+    def terminate(self, force: bool = False) -> bool:
+        """SIGHUP, SIGCONT, SIGINT (and SIGKILL if `force`) until the shell exits, as pexpect does."""
+        signals = [signal.SIGHUP, signal.SIGCONT, signal.SIGINT] + ([signal.SIGKILL] if force else [])
+        for signum in signals:
+            if not self.isalive():
+                return True
+            try:
+                os.kill(self.pid, signum)
+            except ProcessLookupError:
+                pass
+            time.sleep(TERMINATE_DELAY_S)
+        return not self.isalive()
+
+
+def _exec_child(argv: Tuple[str, ...], cwd: str, env: Dict[str, str], dimensions: Tuple[int, int]) -> None:
+    """In the forked child (already on the PTY, in its own session): exec the shell. Never returns."""
+    try:
+        fcntl.ioctl(0, termios.TIOCSWINSZ, struct.pack("HHHH", dimensions[0], dimensions[1], 0, 0))
+        # Python ignores these; the shell should start with the defaults.
+        for signum in (signal.SIGPIPE, signal.SIGXFSZ):
+            signal.signal(signum, signal.SIG_DFL)
+        os.chdir(cwd)
+        os.execvpe(argv[0], list(argv), env)
+    except BaseException:
+        pass
+    os._exit(127)
+
+
+_BACKENDS: Dict[str, Any] = {"pexpect": PexpectProcess, "stdlib": StdlibProcess}
+
+
+def spawn(
+    shell: str, cwd: str, env: Dict[str, str], dimensions: Tuple[int, int] = (40, 120), backend: str = DEFAULT_BACKEND
+) -> PtyProcess:
+    """Start `shell` on a new PTY with the given backend."""
+    return _BACKENDS.get(backend, PexpectProcess)((shell,), cwd, env, dimensions)
@@ -0,0 +1,226 @@
+"""Capture a session shell's cwd and environment before it is suspended,
+and put the environment back when it is restored.
+
+The kernel answers most of this without involving the shell:
+
+  * cwd: /proc/<shell>/cwd, exact while the shell runs a foreground job.
+  * environment: /proc/<pid>/environ holds only the environment a process
+    was exec'd with, so for the shell itself it misses every later
+    `export`. When the shell is busy in a foreground job, that job's
+    environ is the better source: the shell exec'd it with its exports
+    at the time.
+
+When the shell is idle at its prompt (its process group owns the
+terminal), its exported variables are dumped by the shell itself. The
+dump is written to a temporary file and renamed into place, and the
+rename is the acknowledgement: the capture waits for it instead of
+sleeping a fixed time, and falls back to /proc if it does not come within
+CAPTURE_TIMEOUT_S. The dump bypasses pexpect's send delay, and the
+terminal echo it causes is read and discarded so it never reaches the
+session buffer.
+
+Without /proc (macOS), only the shell dump is available, with the old
+fallbacks (the session's cwd, an empty environment) when it times out.
+
+Restore writes the environment as `export` lines to a private (0600)
+script and has the new shell source it with one short command. The
+script deletes itself as its last line, which is the acknowledgement;
+the worker removes it too if the shell never gets to it. The source
+command's echo is discarded like the dump's.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import select
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+CAPTURE_TIMEOUT_S = 2.0
+RESTORE_TIMEOUT_S = 2.0
+_POLL_S = 0.005
+_NAME_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*\Z")
+
+
+@dataclass
+class Capture:
+    cwd: str
+    env: Dict[str, str]
+    method: str  # "shell", "proc", "proc-foreground" or "none"
+    elapsed_ms: float
+
+
+def _read_proc_cwd(pid: int) -> Optional[str]:
+    try:
+        return os.readlink(f"/proc/{pid}/cwd")
+    except OSError:
+        return None
+
+
+def _read_proc_environ(pid: int) -> Optional[Dict[str, str]]:
+    try:
+        with open(f"/proc/{pid}/environ", "rb") as f:
+            return parse_environ(f.read())
+    except OSError:
+        return None
+
+
+def _terminal_owner(pid: int) -> Optional[Tuple[int, int]]:
+    """(process group, foreground process group of its terminal) of pid, from /proc."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+        fields = stat[stat.rindex(b")") + 2:].split()
+        return int(fields[2]), int(fields[5])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def parse_environ(raw: bytes) -> Dict[str, str]:
+    """Parse NUL-separated KEY=value entries (env -0, /proc/<pid>/environ)."""
+    env: Dict[str, str] = {}
+    for entry in raw.decode("utf-8", "replace").split("\0"):
+        eq = entry.find("=")
+        if eq > 0:
+            env[entry[:eq]] = entry[eq + 1:]
+    return env
+
+
+def discard_output(fd: int) -> None:
+    try:
+        while select.select([fd], [], [], 0)[0]:
+            if not os.read(fd, 65536):
+                break
+    except OSError:
+        pass
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "'\\''") + "'"
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _shell_dump(pty_fd: int, state_prefix: str, timeout: float) -> Optional[Tuple[str, Dict[str, str]]]:
+    """Have the shell write its cwd and exported environment; wait for the acknowledging rename."""
+    cwd_file, env_file = state_prefix + ".cwd", state_prefix + ".env"
+    tmp = env_file + f".tmp.{os.getpid()}"
+    for path in (cwd_file, env_file, tmp):
+        _unlink(path)
+    # The leading space keeps the line out of bash/zsh history (ignorespace).
+    # The rename happens even if env fails (e.g. E2BIG), so a failed dump is noticed at once.
+    line = f" pwd > {_quote(cwd_file)}; env -0 > {_quote(tmp)}; mv -f {_quote(tmp)} {_quote(env_file)}\n"
+    try:
+        os.write(pty_fd, line.encode("utf-8"))
+    except OSError:
+        return None
+    deadline = time.monotonic() + timeout
+    try:
+        while not os.path.exists(env_file):
+            if time.monotonic() >= deadline:
+                return None
+            discard_output(pty_fd)
+            time.sleep(_POLL_S)
+        with open(env_file, "rb") as f:
+            env = parse_environ(f.read())
+        if not env:
+            return None
+        try:
+            with open(cwd_file, "r", encoding="utf-8") as f:
+                cwd = f.read().strip()
+        except OSError:
+            cwd = ""
+        return cwd, env
+    finally:
+        discard_output(pty_fd)
+        for path in (cwd_file, env_file, tmp):
+            _unlink(path)
+
+
+def capture_shell_state(
+    pty_fd: int,
+    shell_pid: int,
+    state_prefix: str,
+    default_cwd: str,
+    timeout: float = CAPTURE_TIMEOUT_S,
+) -> Capture:
+    """The shell's cwd and environment, from /proc where it is exact, else from the shell.
+
+    `state_prefix` is the path prefix for the dump files (`<prefix>.cwd`,
+    `<prefix>.env`).
+    """
+    started = time.perf_counter()
+
+    def done(cwd: Optional[str], env: Dict[str, str], method: str) -> Capture:
+        return Capture(cwd or default_cwd, env, method, round((time.perf_counter() - started) * 1000, 2))
+
+    cwd = _read_proc_cwd(shell_pid)
+    owner = _terminal_owner(shell_pid)
+    if owner is not None:
+        pgrp, foreground = owner
+        if foreground > 0 and foreground != pgrp:
+            # Busy: the foreground job's exec-time environment holds the shell's exports.
+            env = _read_proc_environ(foreground)
+            if env is not None:
+                return done(cwd, env, "proc-foreground")
+            return done(cwd, _read_proc_environ(shell_pid) or {}, "proc")
+
+    dumped = _shell_dump(pty_fd, state_prefix, timeout)
+    if dumped is not None:
+        # The dump ran after everything typed before it, so its pwd is the current one.
+        return done(dumped[0] or cwd, dumped[1], "shell")
+    env = _read_proc_environ(shell_pid)
+    if env is not None:
+        return done(cwd, env, "proc")
+    return done(cwd, {}, "none")
+
+
+def write_restore_script(path: str, env: Dict[str, str], unset: Iterable[str] = ()) -> int:
+    """Write `env` as a self-deleting script of export lines; returns how many it exports.
+
+    Names in `unset` are removed from the environment first. Names a shell
+    cannot export (e.g. `a-b`, inherited from some parent process) are
+    skipped rather than aborting the script.
+    """
+    names = [name for name in unset if _NAME_RE.match(name)]
+    lines = [f"unset {' '.join(names)}\n"] if names else []
+    lines += [f"export {key}={_quote(value)}\n" for key, value in env.items() if _NAME_RE.match(key)]
+    lines.append(f"rm -f {_quote(path)}\n")
+    _unlink(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with open(fd, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+    return len(lines) - (2 if names else 1)
+
+
+def source_restore_script(pty_fd: int, path: str, timeout: float = RESTORE_TIMEOUT_S) -> bool:
+    """Have the shell source `path`; True once the script has removed itself.
+
+    Output up to then (the command's echo, the prompt) is discarded. On a
+    timeout the script is left for the shell, and the caller removes it later.
+    """
+    try:
+        os.write(pty_fd, f" . {_quote(path)}\n".encode("utf-8"))
+    except OSError:
+        return False
+    deadline = time.monotonic() + timeout
+    while os.path.exists(path):
+        if time.monotonic() >= deadline:
+            return False
+        discard_output(pty_fd)
+        time.sleep(_POLL_S)
+    # The prompt that follows may still be on its way; give it a moment to arrive and be dropped.
+    if select.select([pty_fd], [], [], _POLL_S * 4)[0]:
+        discard_output(pty_fd)
+    return True
+
+
+def remove_restore_script(path: str) -> None:
+    _unlink(path)
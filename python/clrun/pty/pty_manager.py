@@ -4,34 +4,48 @@ from __future__ import annotations
 
 import json
 import os
-import platform
-import signal
-import uuid
-from datetime import datetime, timezone
+import threading
 from typing import Any, Dict, List, Optional
 
+from clrun import store
 from clrun.types import SessionMetadata
+from clrun.utils import cache
 from clrun.utils.paths import session_path, get_clrun_paths
 
 
-def _atomic_write(filepath: str, content: str) -> None:
-    tmp = filepath + f".tmp.{os.getpid()}"
+def _atomic_write(filepath: str, content: str, sync: bool = False) -> None:
+    tmp = filepath + f".tmp.{os.getpid()}.{threading.get_ident()}"
     with open(tmp, "w", encoding="utf-8") as f:
         f.write(content)
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
     os.replace(tmp, filepath)
+    if sync:
+        dir_fd = os.open(os.path.dirname(filepath), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
 
 
 def detect_shell() -> str:
+    import platform
+
     return os.environ.get("SHELL", "/bin/sh" if platform.system() != "Windows" else "powershell.exe")
 
 
 def generate_terminal_id() -> str:
+    import uuid
+
     return str(uuid.uuid4())
 
 
 def create_session_metadata(
     terminal_id: str, command: str, cwd: str, pid: int, worker_pid: int
 ) -> SessionMetadata:
+    from datetime import datetime, timezone
+
     now = datetime.now(timezone.utc).isoformat()
     return SessionMetadata(
         terminal_id=terminal_id,
@@ -48,36 +62,69 @@ def create_session_metadata(
     )
 
 
-def write_session(session: SessionMetadata, project_root: str) -> None:
+def write_session(
+    session: SessionMetadata,
+    project_root: str,
+    previous: Optional[SessionMetadata] = None,
+    sync: bool = False,
+) -> None:
+    """Write session metadata and record the change in the session index.
+
+    `previous` is the version being replaced, if known, so that only the
+    changed index fields are appended. `sync` fsyncs the write (used for
+    status transitions). The index lock is held across the file write and
+    the index record, so concurrent writers cannot record out of order.
+    """
+    from clrun.pty import session_index
+
+    db = store.sqlite(project_root)
+    if db:
+        db.write_session(session, project_root)
+        return
     fp = session_path(session.terminal_id, project_root)
-    _atomic_write(fp, json.dumps(session.to_dict(), indent=2))
+    with session_index.locked(project_root):
+        _atomic_write(fp, json.dumps(session.to_dict(), indent=2), sync)
+        session_index.record_session(session, project_root, previous)
 
 
 def read_session(terminal_id: str, project_root: str) -> Optional[SessionMetadata]:
+    db = store.sqlite(project_root)
+    if db:
+        return db.read_session(terminal_id, project_root)
     fp = session_path(terminal_id, project_root)
     if not os.path.exists(fp):
         return None
     try:
-        with open(fp, "r", encoding="utf-8") as f:
-            return SessionMetadata.from_dict(json.load(f))
+        return SessionMetadata.from_dict(cache.load_json(fp))
     except Exception:
         return None
 
 
 def update_session(
-    terminal_id: str, updates: Dict[str, Any], project_root: str
+    terminal_id: str, updates: Dict[str, Any], project_root: str, sync: bool = False
 ) -> Optional[SessionMetadata]:
-    session = read_session(terminal_id, project_root)
-    if not session:
-        return None
-    d = session.to_dict()
-    d.update(updates)
-    updated = SessionMetadata.from_dict(d)
-    write_session(updated, project_root)
+    from clrun.pty import session_index
+
+    db = store.sqlite(project_root)
+    if db:
+        return db.update_session(terminal_id, updates, project_root, sync)
+    # Read under the index lock too, so `previous` is what the write replaces.
+    with session_index.locked(project_root):
+        session = read_session(terminal_id, project_root)
+        if not session:
+            return None
+        d = session.to_dict()
+        d.update(updates)
+        updated = SessionMetadata.from_dict(d)
+        if updated != session:
+            write_session(updated, project_root, previous=session, sync=sync)
     return updated
 
 
 def list_sessions(project_root: str) -> List[SessionMetadata]:
+    db = store.sqlite(project_root)
+    if db:
+        return db.list_sessions(project_root)
     paths = get_clrun_paths(project_root)
     if not os.path.exists(paths.sessions_dir):
         return []
@@ -86,8 +133,7 @@ def list_sessions(project_root: str) -> List[SessionMetadata]:
         if not fname.endswith(".json"):
             continue
         try:
-            with open(os.path.join(paths.sessions_dir, fname), "r", encoding="utf-8") as f:
-                sessions.append(SessionMetadata.from_dict(json.load(f)))
+            sessions.append(SessionMetadata.from_dict(cache.load_json(os.path.join(paths.sessions_dir, fname))))
         except Exception:
             continue
     return sessions
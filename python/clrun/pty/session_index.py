@@ -0,0 +1,318 @@
+"""Compact session index: one journal with a summary of every session.
+
+`clrun status`, crash recovery and the "session not found" hints need a
+handful of fields from every session. Rather than parsing each
+sessions/*.json and queues/*.json, they read `.clrun/sessions.idx`: an
+append-only JSON-lines journal of per-session field patches, replayed in
+order. Session and queue writes append a patch for the fields that
+changed; readers compact the journal once it holds more than twice as
+many lines as there are sessions.
+
+Appends and compaction serialize on an flock of `sessions.idx.lock`.
+Session writes hold the same lock from replacing the session file until
+their patch is appended (see `locked`), so the journal records writes to
+the same session in the order they reached the files. A missing index is rebuilt from the session and queue files, so projects
+created by older versions pick it up on first use. With the SQLite state
+backend the same records come from the indexed sessions table instead.
+"""
+
+from __future__ import annotations
+
+import base64
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from clrun import store
+from clrun.types import SessionMetadata
+from clrun.utils import cache
+from clrun.utils.paths import get_clrun_paths
+
+COMPACT_RATIO = 2
+COMPACT_SLACK = 64
+
+# Long-lived processes (cache enabled) replay only the journal's new tail.
+_replayed: Dict[str, Tuple[int, int, int, Dict[str, Dict[str, Any]]]] = {}
+# Projects whose index lock the current thread holds (flock is not reentrant).
+_held = threading.local()
+
+
+def summarize(session: SessionMetadata) -> Dict[str, Any]:
+    """The indexed fields of a session."""
+    saved = session.saved_state if session.status == "suspended" else None
+    return {
+        "command": session.command,
+        "status": session.status,
+        "pid": session.pid,
+        "worker_pid": session.worker_pid,
+        "queue_length": session.queue_length,
+        "created_at": session.created_at,
+        "last_activity_at": session.last_activity_at,
+        "last_exit_code": session.last_exit_code,
+        "suspended_at": saved.captured_at if saved else None,
+        "saved_cwd": saved.cwd if saved else None,
+    }
+
+
+@contextmanager
+def locked(project_root: str) -> Iterator[None]:
+    """Hold the index lock; reentrant within a thread."""
+    held = getattr(_held, "roots", None)
+    if held is None:
+        held = _held.roots = set()
+    if project_root in held:
+        yield
+        return
+    lock_path = get_clrun_paths(project_root).session_index + ".lock"
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        held.add(project_root)
+        try:
+            yield
+        finally:
+            held.discard(project_root)
+    finally:
+        os.close(fd)
+
+
+def _append(project_root: str, lines: str) -> None:
+    paths = get_clrun_paths(project_root)
+    if not os.path.isdir(paths.root) or store.sqlite(project_root):
+        return
+    if not os.path.exists(paths.session_index):
+        # First write in this project (or an index deleted by hand): build it
+        # from the files, which already include the change being recorded.
+        load_index(project_root)
+        return
+    with locked(project_root):
+        fd = os.open(paths.session_index, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, lines.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+
+def record(terminal_id: str, fields: Dict[str, Any], project_root: str) -> None:
+    """Append a patch for `terminal_id`; a no-op for an empty patch."""
+    if not fields:
+        return
+    patch = {"id": terminal_id}
+    patch.update(fields)
+    try:
+        _append(project_root, json.dumps(patch, separators=(",", ":")) + "\n")
+    except OSError:
+        pass
+
+
+def record_session(session: SessionMetadata, project_root: str, previous: Optional[SessionMetadata] = None) -> None:
+    """Record the indexed fields of `session` that differ from `previous`."""
+    summary = summarize(session)
+    if previous is not None:
+        before = summarize(previous)
+        summary = {k: v for k, v in summary.items() if before.get(k) != v}
+    record(session.terminal_id, summary, project_root)
+
+
+def remove(terminal_ids: Iterable[str], project_root: str) -> None:
+    """Drop sessions from the index (their files are being deleted)."""
+    lines = "".join(
+        json.dumps({"id": tid, "deleted": True}, separators=(",", ":")) + "\n" for tid in terminal_ids
+    )
+    if lines:
+        try:
+            _append(project_root, lines)
+        except OSError:
+            pass
+
+
+def _replay(data: bytes, sessions: Dict[str, Dict[str, Any]]) -> int:
+    """Apply journal lines to `sessions`; returns the number of complete lines."""
+    raw_lines = data.split(b"\n")[:-1]
+    try:
+        # One parse for the whole journal; fall back line by line on damage.
+        patches = json.loads(b"[" + b",".join(raw_lines) + b"]")
+    except ValueError:
+        patches = []
+        for raw in raw_lines:
+            try:
+                patches.append(json.loads(raw))
+            except ValueError:
+                continue
+    for patch in patches:
+        try:
+            terminal_id = patch.pop("id")
+        except (KeyError, TypeError, AttributeError):
+            continue
+        if patch.get("deleted"):
+            sessions.pop(terminal_id, None)
+        elif terminal_id in sessions:
+            sessions[terminal_id].update(patch)
+        else:
+            sessions[terminal_id] = patch
+    return len(raw_lines)
+
+
+def _scan_files(project_root: str) -> Dict[str, Dict[str, Any]]:
+    from clrun.pty.pty_manager import list_sessions
+    from clrun.queue.queue_engine import pending_count
+
+    sessions = sorted(list_sessions(project_root), key=lambda s: s.created_at)
+    index: Dict[str, Dict[str, Any]] = {}
+    for session in sessions:
+        summary = summarize(session)
+        summary["queue_length"] = pending_count(session.terminal_id, project_root)
+        index[session.terminal_id] = summary
+    return index
+
+
+def _write_compacted(project_root: str, sessions: Dict[str, Dict[str, Any]]) -> None:
+    path = get_clrun_paths(project_root).session_index
+    tmp = path + f".tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for terminal_id, fields in sessions.items():
+            patch = {"id": terminal_id}
+            patch.update(fields)
+            f.write(json.dumps(patch, separators=(",", ":")) + "\n")
+    os.replace(tmp, path)
+    _replayed.pop(path, None)
+
+
+def rebuild_index(project_root: str) -> Dict[str, Dict[str, Any]]:
+    """Rebuild the index from the session and queue files."""
+    with locked(project_root):
+        sessions = _scan_files(project_root)
+        _write_compacted(project_root, sessions)
+    return sessions
+
+
+def load_index(project_root: str) -> Dict[str, Dict[str, Any]]:
+    """All sessions as {terminal_id: fields}, oldest first.
+
+    Returns an empty dict when the project has no .clrun directory. Callers
+    must not mutate the returned value.
+    """
+    db = store.sqlite(project_root)
+    if db:
+        return db.summaries(project_root) if os.path.exists(db.db_path(project_root)) else {}
+
+    paths = get_clrun_paths(project_root)
+    path = paths.session_index
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        if not os.path.isdir(paths.sessions_dir):
+            return {}
+        return rebuild_index(project_root)
+
+    with f:
+        st = os.fstat(f.fileno())
+        hit = _replayed.get(path) if cache.is_enabled() else None
+        if hit and hit[0] == st.st_ino and hit[1] <= st.st_size:
+            _, offset, lines, sessions = hit
+            f.seek(offset)
+        else:
+            offset, lines, sessions = 0, 0, {}
+        data = f.read()
+
+    # Only complete lines are consumed; a torn final line is re-read next time.
+    complete = data.rfind(b"\n") + 1
+    lines += _replay(data[:complete], sessions)
+    offset += complete
+    if cache.is_enabled():
+        _replayed[path] = (st.st_ino, offset, lines, sessions)
+
+    if lines > COMPACT_RATIO * len(sessions) + COMPACT_SLACK:
+        try:
+            with locked(project_root):
+                if os.stat(path).st_ino == st.st_ino:
+                    # Re-read under the lock so appends since our read are kept.
+                    with open(path, "rb") as f:
+                        current: Dict[str, Dict[str, Any]] = {}
+                        _replay(f.read(), current)
+                    _write_compacted(project_root, current)
+                    sessions = current
+        except OSError:
+            pass
+    return sessions
+
+
+SESSION_STATES = ("running", "suspended", "exited", "detached", "killed")
+SORT_KEYS = {
+    "created": "created_at",
+    "activity": "last_activity_at",
+    "status": "status",
+    "command": "command",
+}
+
+
+def encode_cursor(sort_value: Any, terminal_id: str) -> str:
+    raw = json.dumps([sort_value, terminal_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, str]:
+    """Inverse of encode_cursor; raises ValueError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, terminal_id = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return sort_value, str(terminal_id)
+
+
+def query_index(
+    sessions: Dict[str, Dict[str, Any]],
+    states: Optional[Sequence[str]] = None,
+    command: Optional[str] = None,
+    since: Optional[str] = None,
+    active_since: Optional[str] = None,
+    id_prefix: Optional[str] = None,
+    sort: str = "created",
+    desc: bool = False,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Tuple[str, Dict[str, Any]]], int, Optional[str]]:
+    """Filter, sort and page index records.
+
+    `since` / `active_since` are UTC ISO strings (see clrun.utils.timespec).
+    Pagination is keyset-based: the cursor names the last (sort value,
+    terminal ID) returned, so sessions created between pages do not shift
+    the results. Returns (page, matched_count, next_cursor).
+    """
+    key = SORT_KEYS[sort]
+    wanted = set(states) if states else None
+    needle = command.lower() if command else None
+    prefix = id_prefix.lower() if id_prefix else None
+
+    matched: List[Tuple[Tuple[Any, str], str, Dict[str, Any]]] = []
+    for terminal_id, s in sessions.items():
+        status = s.get("status")
+        if status is None:
+            continue
+        if wanted is not None and status not in wanted:
+            continue
+        if prefix is not None and not terminal_id.lower().startswith(prefix):
+            continue
+        if needle is not None and needle not in s.get("command", "").lower():
+            continue
+        if since is not None and s.get("created_at", "") < since:
+            continue
+        if active_since is not None and s.get("last_activity_at", "") < active_since:
+            continue
+        matched.append(((s.get(key) or "", terminal_id), terminal_id, s))
+
+    matched.sort(key=lambda m: m[0], reverse=desc)
+    rows = matched
+    if cursor:
+        after = tuple(decode_cursor(cursor))
+        rows = [m for m in matched if (m[0] < after if desc else m[0] > after)]
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(*rows[-1][0])
+    return [(tid, s) for _, tid, s in rows], len(matched), next_cursor
@@ -4,43 +4,63 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 import uuid
 from datetime import datetime, timezone
 
+from clrun import store
 from clrun.types import QueueEntry, QueueFile
+from clrun.utils import cache
 from clrun.utils.paths import queue_path
 
 
 def _atomic_write(filepath: str, content: str) -> None:
-    tmp = filepath + f".tmp.{os.getpid()}"
+    tmp = filepath + f".tmp.{os.getpid()}.{threading.get_ident()}"
     with open(tmp, "w", encoding="utf-8") as f:
         f.write(content)
     os.replace(tmp, filepath)
 
 
 def init_queue(terminal_id: str, project_root: str) -> None:
+    db = store.sqlite(project_root)
+    if db:
+        db.init_queue(terminal_id, project_root)
+        return
     fp = queue_path(terminal_id, project_root)
     q = QueueFile(terminal_id=terminal_id)
     _atomic_write(fp, json.dumps(q.to_dict(), indent=2))
 
 
 def read_queue(terminal_id: str, project_root: str) -> QueueFile:
+    db = store.sqlite(project_root)
+    if db:
+        return db.read_queue(terminal_id, project_root)
     fp = queue_path(terminal_id, project_root)
     if not os.path.exists(fp):
         return QueueFile(terminal_id=terminal_id)
     try:
-        with open(fp, "r", encoding="utf-8") as f:
-            return QueueFile.from_dict(json.load(f))
+        return QueueFile.from_dict(cache.load_json(fp))
     except Exception:
         return QueueFile(terminal_id=terminal_id)
 
 
 def write_queue(terminal_id: str, queue: QueueFile, project_root: str) -> None:
+    from clrun.pty import session_index
+
+    db = store.sqlite(project_root)
+    if db:
+        db.write_queue(terminal_id, queue, project_root)
+        return
     fp = queue_path(terminal_id, project_root)
     _atomic_write(fp, json.dumps(queue.to_dict(), indent=2))
+    pending = sum(1 for e in queue.entries if e.status == "queued")
+    session_index.record(terminal_id, {"queue_length": pending}, project_root)
 
 
 def enqueue_input(terminal_id: str, text: str, priority: int, project_root: str) -> QueueEntry:
+    db = store.sqlite(project_root)
+    if db:
+        return db.enqueue_input(terminal_id, text, priority, project_root)
     queue = read_queue(terminal_id, project_root)
     entry = QueueEntry(
         queue_id=str(uuid.uuid4()),
@@ -56,6 +76,9 @@ def enqueue_input(terminal_id: str, text: str, priority: int, project_root: str)
 
 
 def enqueue_override(terminal_id: str, text: str, project_root: str) -> tuple[QueueEntry, int]:
+    db = store.sqlite(project_root)
+    if db:
+        return db.enqueue_override(terminal_id, text, project_root)
     queue = read_queue(terminal_id, project_root)
     cancelled = 0
     for e in queue.entries:
@@ -76,6 +99,9 @@ def enqueue_override(terminal_id: str, text: str, project_root: str) -> tuple[Qu
 
 
 def get_next_queued(terminal_id: str, project_root: str) -> QueueEntry | None:
+    db = store.sqlite(project_root)
+    if db:
+        return db.get_next_queued(terminal_id, project_root)
     queue = read_queue(terminal_id, project_root)
     pending = [e for e in queue.entries if e.status == "queued"]
     if not pending:
@@ -85,6 +111,10 @@ def get_next_queued(terminal_id: str, project_root: str) -> QueueEntry | None:
 
 
 def mark_sent(terminal_id: str, queue_id: str, project_root: str) -> None:
+    db = store.sqlite(project_root)
+    if db:
+        db.mark_sent(terminal_id, queue_id, project_root)
+        return
     queue = read_queue(terminal_id, project_root)
     for e in queue.entries:
         if e.queue_id == queue_id:
@@ -95,5 +125,8 @@ def mark_sent(terminal_id: str, queue_id: str, project_root: str) -> None:
 
 
 def pending_count(terminal_id: str, project_root: str) -> int:
+    db = store.sqlite(project_root)
+    if db:
+        return db.pending_count(terminal_id, project_root)
     queue = read_queue(terminal_id, project_root)
     return sum(1 for e in queue.entries if e.status == "queued")
@@ -0,0 +1,75 @@
+"""Thin client: forward a CLI invocation to the project's runtime server, if one is running."""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+from typing import Any, Dict, List, Optional
+
+from clrun.utils.context import get_stdout, get_stderr
+from clrun.utils.paths import resolve_project_root, get_clrun_paths
+
+REQUEST_TIMEOUT_S = 120.0
+
+
+def exchange(sock: socket.socket, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Send one request over a connected socket and read the response line."""
+    sock.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+    with sock.makefile("rb") as f:
+        line = f.readline()
+    if not line:
+        raise ConnectionError("runtime server closed the connection")
+    return json.loads(line)
+
+
+def request(address: Any, payload: Dict[str, Any], timeout: float = REQUEST_TIMEOUT_S) -> Dict[str, Any]:
+    """Send one request to a runtime server (Unix path or (host, port))."""
+    family = socket.AF_INET if isinstance(address, tuple) else socket.AF_UNIX
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(address)
+        return exchange(sock, payload)
+
+
+def forward(args: List[str], project_root: Optional[str] = None) -> Optional[int]:
+    """Execute `args` on the runtime server and return its exit code.
+
+    Returns None when no server is reachable, in which case the caller runs
+    the command locally. Once the request has been sent, the command may
+    already have taken effect, so later failures are reported rather than
+    retried locally.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    sock_path = get_clrun_paths(project_root or resolve_project_root()).runtime_sock
+    if not os.path.exists(sock_path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(1.0)
+        sock.connect(sock_path)
+    except OSError:
+        sock.close()
+        return None
+
+    try:
+        with sock:
+            sock.settimeout(REQUEST_TIMEOUT_S)
+            resp = exchange(sock, {"argv": args, "cwd": os.getcwd(), "env": dict(os.environ)})
+    except (OSError, ValueError) as e:
+        from clrun.utils.output import fail
+        fail({
+            "error": f"Lost connection to runtime server: {e}",
+            "hints": {
+                "server_status": "clrun server status",
+                "stop_server": "clrun server stop",
+            },
+        })
+        return 1
+
+    get_stdout().write(resp.get("stdout", ""))
+    if resp.get("stderr"):
+        get_stderr().write(resp["stderr"])
+    return int(resp.get("exit_code", 1))
@@ -6,41 +6,46 @@ import os
 from datetime import datetime, timezone
 from typing import List
 
-from clrun.types import SessionMetadata
 from clrun.utils.paths import get_clrun_paths
-from clrun.pty.pty_manager import list_sessions, update_session, is_pty_alive
+from clrun.pty.pty_manager import update_session, is_pty_alive
+from clrun.pty.session_index import load_index
+from clrun.runtime.heartbeat import read_heartbeats, session_alive
 from clrun.ledger.ledger import log_event
 
 
 def recover_sessions(project_root: str) -> dict:
-    sessions = list_sessions(project_root)
-    detached: List[SessionMetadata] = []
-    active: List[SessionMetadata] = []
-    recovered = 0
+    """Mark running sessions whose worker and shell are both gone as detached.
 
-    for session in sessions:
-        if session.status == "running":
-            worker_alive = is_pty_alive(session.worker_pid)
-            pty_alive = is_pty_alive(session.pid)
+    Reads the session index and the heartbeat table rather than every
+    session file and process; returns the recovered count and the terminal
+    IDs of detached and active sessions.
+    """
+    detached: List[str] = []
+    active: List[str] = []
+    recovered = 0
+    beats = read_heartbeats(project_root)
 
-            if not worker_alive and not pty_alive:
+    for terminal_id, entry in list(load_index(project_root).items()):
+        status = entry.get("status")
+        if status == "running" and "pid" in entry:
+            if not session_alive(terminal_id, entry["worker_pid"], entry["pid"], beats=beats):
                 updated = update_session(
-                    session.terminal_id,
+                    terminal_id,
                     {"status": "detached", "last_activity_at": datetime.now(timezone.utc).isoformat()},
                     project_root,
                 )
                 if updated:
-                    detached.append(updated)
+                    detached.append(terminal_id)
                     recovered += 1
-                    log_event("session.detached", project_root, session.terminal_id, {
+                    log_event("session.detached", project_root, terminal_id, {
                         "reason": "crash_recovery",
-                        "original_pid": session.pid,
-                        "original_worker_pid": session.worker_pid,
+                        "original_pid": updated.pid,
+                        "original_worker_pid": updated.worker_pid,
                     })
             else:
-                active.append(session)
-        elif session.status == "detached":
-            detached.append(session)
+                active.append(terminal_id)
+        elif status == "detached":
+            detached.append(terminal_id)
 
     return {"recovered": recovered, "detached": detached, "active": active}
 
@@ -0,0 +1,279 @@
+"""OpenMetrics text exposition for fleet monitoring (`clrun metrics`).
+
+Every scrape is computed from sources that are cheap to read:
+
+  * session counts by status come from the session index (sessions.idx,
+    replayed incrementally in the runtime server), overlaid with the
+    heartbeat table;
+  * queue depth, buffer bytes and worker liveness of running sessions come
+    from one read of the heartbeat table;
+  * worker RSS comes from /proc/<pid>/statm, one small read per running
+    worker;
+  * event counters and the input latency histogram come from the ledger,
+    through a LedgerFollower that only reads events logged since the last
+    scrape. Input latency pairs each input.queued / input.override with
+    its input.sent by queue_id.
+
+The follower's cursor and the counters are kept in
+`.clrun/metrics/exporter.json`, so one-shot `clrun metrics` calls are
+incremental too. Counters start at the first scrape and carry `_created`
+timestamps; they restart (with a new `_created`) if the state is lost or
+the ledger backend changes.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from clrun.ledger import writer as ledger_writer
+from clrun.ledger.follow import LedgerFollower
+from clrun.pty.session_index import SESSION_STATES, load_index
+from clrun.runtime import heartbeat, metrics
+from clrun.utils.paths import get_clrun_paths
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_PENDING = 10000
+
+_QUEUED = ("input.queued", "input.override")
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _epoch(timestamp: str) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _resident_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_label(v)}"' for k, v in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Family:
+    def __init__(self, name: str, kind: str, help_text: str, unit: str = "") -> None:
+        self.lines = [f"# TYPE {name} {kind}"]
+        if unit:
+            self.lines.append(f"# UNIT {name} {unit}")
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.name = name
+
+    def sample(self, value: float, suffix: str = "", **labels: Any) -> None:
+        self.lines.append(f"{self.name}{suffix}{_labels(labels)} {_number(value)}")
+
+
+class ExporterState:
+    """Ledger-derived counters, persisted between scrapes."""
+
+    def __init__(self) -> None:
+        self.cursor: Optional[str] = None
+        self.created = time.time()
+        self.events: Dict[str, int] = {}
+        self.pending: Dict[str, float] = {}
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"cursor": self.cursor, "created": self.created, "events": self.events,
+                "pending": self.pending, "latency_buckets": self.latency_buckets,
+                "latency_sum": self.latency_sum}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "ExporterState":
+        state = cls()
+        state.cursor = d.get("cursor")
+        state.created = float(d.get("created", state.created))
+        state.events = {k: int(v) for k, v in d.get("events", {}).items()}
+        state.pending = {k: float(v) for k, v in d.get("pending", {}).items()}
+        buckets = [int(n) for n in d.get("latency_buckets", [])]
+        if len(buckets) == len(state.latency_buckets):
+            state.latency_buckets = buckets
+        state.latency_sum = float(d.get("latency_sum", 0.0))
+        return state
+
+    def observe_latency(self, seconds: float) -> None:
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.latency_buckets[i] += 1
+                break
+        else:
+            self.latency_buckets[-1] += 1
+        self.latency_sum += seconds
+
+    def consume(self, events: Iterable[Dict[str, Any]]) -> None:
+        for entry in events:
+            name = entry.get("event", "")
+            self.events[name] = self.events.get(name, 0) + 1
+            data = entry.get("data") or {}
+            qid = data.get("queue_id") if isinstance(data, dict) else None
+            if not qid:
+                continue
+            at = _epoch(entry.get("timestamp", ""))
+            if at is None:
+                continue
+            if name in _QUEUED:
+                self.pending[qid] = at
+                if len(self.pending) > MAX_PENDING:
+                    del self.pending[next(iter(self.pending))]  # oldest first (insertion order)
+            elif name == "input.sent":
+                queued = self.pending.pop(qid, None)
+                if queued is not None:
+                    self.observe_latency(max(at - queued, 0.0))
+
+
+def _update_state(project_root: str) -> ExporterState:
+    """Load the persisted state, add the events logged since the last scrape, save it."""
+    directory = get_clrun_paths(project_root).metrics_dir
+    path = metrics.metrics_path(project_root, metrics.EXPORTER_SCOPE)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, metrics.LOCK_FILE), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = ExporterState.from_dict(json.load(f))
+        except (OSError, ValueError, TypeError, AttributeError):
+            state = ExporterState()
+        try:
+            follower = LedgerFollower(project_root, cursor=state.cursor)
+        except ValueError:
+            state = ExporterState()  # the state backend changed; start counting again
+            follower = LedgerFollower(project_root)
+        state.consume(follower.poll())
+        state.cursor = follower.cursor
+        tmp = path + f".tmp.{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state.to_dict(), f, separators=(",", ":"))
+        os.replace(tmp, path)
+    return state
+
+
+def _session_families(project_root: str) -> List[_Family]:
+    beats = heartbeat.read_heartbeats(project_root)
+    index = heartbeat.overlay(load_index(project_root), beats)
+
+    sessions = _Family("clrun_sessions", "gauge", "Sessions by status.")
+    counts = {state: 0 for state in SESSION_STATES}
+    for rec in index.values():
+        # Queue patches for a session whose own record is not in yet have no status.
+        if rec.get("status") in counts:
+            counts[rec["status"]] += 1
+    for status, n in counts.items():
+        sessions.sample(n, status=status)
+
+    up = _Family("clrun_worker_up", "gauge", "1 if a running session's worker is alive.")
+    age = _Family("clrun_worker_heartbeat_age_seconds", "gauge", "Time since the worker's last heartbeat.",
+                  "seconds")
+    rss = _Family("clrun_worker_resident_bytes", "gauge", "Resident memory of the session's worker.", "bytes")
+    depth = _Family("clrun_session_queue_depth", "gauge", "Queued inputs not yet sent.")
+    size = _Family("clrun_session_buffer_bytes", "gauge", "Size of the session's output buffer.", "bytes")
+    for tid, rec in index.items():
+        if rec.get("status") != "running":
+            continue
+        worker_pid = rec.get("worker_pid") or 0
+        labels = {"terminal_id": tid}
+        hb = beats.get(tid)
+        up.sample(int(heartbeat.session_alive(tid, worker_pid, rec.get("pid"), beats=beats)), **labels)
+        depth.sample(rec.get("queue_length") or 0, **labels)
+        if hb and hb.worker_pid == worker_pid:
+            age.sample(round(max(hb.age_s, 0.0), 3), **labels)
+            size.sample(hb.buffer_size, **labels)
+        resident = _resident_bytes(worker_pid)
+        if resident is not None:
+            rss.sample(resident, **labels)
+    return [sessions, up, age, rss, depth, size]
+
+
+def _ledger_families(project_root: str, state: ExporterState) -> List[_Family]:
+    events = _Family("clrun_events", "counter", "Ledger events by type.")
+    for name, n in sorted(state.events.items()):
+        events.sample(n, "_total", event=name)
+        events.sample(state.created, "_created", event=name)
+
+    latency = _Family("clrun_input_latency_seconds", "histogram",
+                      "Time from enqueueing an input to the worker sending it.", "seconds")
+    cumulative = 0
+    for bound, n in zip(LATENCY_BUCKETS, state.latency_buckets):
+        cumulative += n
+        latency.sample(cumulative, "_bucket", le=repr(bound))
+    cumulative += state.latency_buckets[-1]
+    latency.sample(cumulative, "_bucket", le="+Inf")
+    latency.sample(cumulative, "_count")
+    latency.sample(round(state.latency_sum, 6), "_sum")
+    latency.sample(state.created, "_created")
+
+    ledger = _Family("clrun_ledger_bytes", "gauge", "Size of the event ledger files.", "bytes")
+    total = 0
+    for path in ledger_writer.segments(project_root):
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            continue
+    ledger.sample(total)
+    return [events, latency, ledger]
+
+
+def render(project_root: str) -> str:
+    """The project's metrics in OpenMetrics text format."""
+    started = time.perf_counter()
+    families = _session_families(project_root)
+    families += _ledger_families(project_root, _update_state(project_root))
+    scrape = _Family("clrun_scrape_duration_seconds", "gauge", "Time taken to compute this exposition.",
+                     "seconds")
+    scrape.sample(round(time.perf_counter() - started, 6))
+    families.append(scrape)
+    return "\n".join(line for family in families for line in family.lines) + "\n# EOF\n"
+
+
+def serve_http(project_root: str, port: int) -> Tuple[Any, int]:
+    """Start a loopback HTTP server answering GET /metrics; returns (server, bound port)."""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            try:
+                body = render(project_root).encode("utf-8")
+            except Exception as e:
+                self.send_error(500, str(e))
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address[1]
@@ -0,0 +1,212 @@
+"""Fork-server worker launcher: a resident process that forks workers on request.
+
+Launching a worker with `python -m clrun.worker` pays for interpreter
+startup and for importing pexpect and clrun on every session. With
+`{"worker": {"launcher": "forkserver"}}`, a single-threaded process with
+the worker modules already imported listens on `.clrun/forkserver.sock`
+and forks each new worker instead, in the style of multiprocessing's
+forkserver. The forked worker starts a new session, gets the requester's
+environment and runs `clrun.worker.main` with the requested arguments,
+exactly as the spawned process would.
+
+Protocol: one JSON request line in, one JSON response line out.
+
+    {"argv": [...], "env": {...}, "executable": "...", "version": "..."}
+        -> {"pid": N} | {"error": "..."}
+
+The fork server is started on demand: the first launch that finds none
+starts one in the background and spawns its worker the usual way.
+Requests from a different interpreter or clrun version are refused, and
+the server then exits so the next launch starts a matching one. It also
+exits after IDLE_EXIT_S without requests. A lock file keeps it to one per
+project.
+
+Usage: python -m clrun.runtime.forkserver <projectRoot>
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+from clrun.runtime.lock_manager import PACKAGE_VERSION
+from clrun.utils.context import get_env
+from clrun.utils.paths import get_clrun_paths
+
+SOCKET_FILE = "forkserver.sock"
+LOCK_FILE = "forkserver.lock"
+CONNECT_TIMEOUT_S = 1.0
+IDLE_EXIT_S = 30 * 60
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+
+def socket_path(project_root: str) -> str:
+    return os.path.join(get_clrun_paths(project_root).root, SOCKET_FILE)
+
+
+def launch(project_root: str, argv: List[str], env: Optional[Dict[str, str]] = None) -> Optional[int]:
+    """Have the project's fork server start a worker with `argv`; its PID, or None if no server could."""
+    path = socket_path(project_root)
+    if not os.path.exists(path):
+        return None
+    request = {
+        "argv": argv,
+        "env": dict(env if env is not None else os.environ),
+        "executable": sys.executable,
+        "version": PACKAGE_VERSION,
+    }
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT_S)
+            sock.connect(path)
+            sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+            with sock.makefile("rb") as f:
+                reply = json.loads(f.readline() or b"{}")
+    except (OSError, ValueError):
+        return None
+    pid = reply.get("pid")
+    return pid if isinstance(pid, int) and pid > 0 else None
+
+
+def start(project_root: str) -> None:
+    """Start a fork server for the project in the background (it exits at once if one is running)."""
+    subprocess.Popen(
+        [sys.executable, "-m", "clrun.runtime.forkserver", project_root],
+        start_new_session=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        stdin=subprocess.DEVNULL,
+        env=get_env(),
+    )
+
+
+# ─── Server ──────────────────────────────────────────────────────────────
+
+def _run_worker(argv: List[str], env: Dict[str, str]) -> None:
+    """In the forked child: become a detached `python -m clrun.worker <argv>`. Never returns.
+
+    The child leaves with os._exit, so it never unwinds into the server's
+    loop. That skips atexit handlers, so the worker's exit work (removing
+    unsourced restore scripts, writing out buffered events and metrics) is
+    done explicitly first.
+    """
+    from clrun import worker
+    from clrun.ledger import writer as ledger_writer
+    from clrun.runtime import metrics
+
+    code = 1
+    try:
+        os.setsid()
+        for signum in (signal.SIGCHLD, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, signal.SIG_DFL)
+        devnull = os.open(os.devnull, os.O_RDWR)
+        for fd in (0, 1, 2):
+            os.dup2(devnull, fd)
+        os.close(devnull)
+        os.environ.clear()
+        os.environ.update(env)
+
+        sys.argv = [worker.__file__] + argv
+        worker.main()
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        code = 1
+    finally:
+        worker.remove_unsourced_scripts()
+        ledger_writer.close_all()
+        metrics.flush_commands()
+        os._exit(code)
+
+
+def _handle(conn: socket.socket, server_fds: List[int]) -> bool:
+    """Serve one request; False when the server should exit.
+
+    `server_fds` are closed in the forked worker (an inherited lock file
+    descriptor would keep the server's lock held).
+    """
+    with conn.makefile("rb") as f:
+        line = f.readline(MAX_REQUEST_BYTES)
+    try:
+        request: Dict[str, Any] = json.loads(line)
+        argv = [str(a) for a in request["argv"]]
+        env = {str(k): str(v) for k, v in request["env"].items()}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        conn.sendall(b'{"error": "bad request"}\n')
+        return True
+    if request.get("executable") != sys.executable or request.get("version") != PACKAGE_VERSION:
+        conn.sendall(b'{"error": "interpreter or version mismatch"}\n')
+        return False
+
+    pid = os.fork()
+    if pid == 0:
+        for fd in server_fds + [conn.fileno()]:
+            os.close(fd)
+        _run_worker(argv, env)
+    conn.sendall((json.dumps({"pid": pid}) + "\n").encode("utf-8"))
+    return True
+
+
+def serve(project_root: str) -> None:
+    """Run the fork server in the current process until it is idle for IDLE_EXIT_S."""
+    paths = get_clrun_paths(project_root)
+    lock_fd = os.open(os.path.join(paths.root, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return  # another fork server has the project
+
+    # Everything a worker imports, so forked workers start with it loaded.
+    import pexpect  # noqa: F401
+    from clrun import worker  # noqa: F401
+
+    # Forked workers are reaped automatically; each one restores SIGCHLD to wait for its shell.
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    path = socket_path(project_root)
+    if os.path.exists(path):
+        os.unlink(path)  # stale: its server no longer holds the lock
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    os.chmod(path, 0o600)
+    listener.listen(64)
+    listener.settimeout(IDLE_EXIT_S)
+    try:
+        while os.path.isdir(paths.root):
+            try:
+                conn, _ = listener.accept()
+            except socket.timeout:
+                break
+            with conn:
+                conn.settimeout(CONNECT_TIMEOUT_S)
+                try:
+                    if not _handle(conn, [listener.fileno(), lock_fd]):
+                        break
+                except OSError:
+                    continue
+    finally:
+        listener.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        os.close(lock_fd)
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        sys.stderr.write("forkserver: missing project root\n")
+        sys.exit(1)
+    serve(sys.argv[1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""Worker liveness heartbeats in a shared, fixed-size mmap'd slot table.
+
+`.clrun/heartbeats` holds a header and SLOTS fixed-size slots. Each worker
+claims a slot (open addressing on its terminal ID) and, on every loop
+iteration, stores a CLOCK_MONOTONIC timestamp into it: a single write into
+shared memory, no syscall. Queue depth, buffer size and activity time are
+stored the same way when they change.
+
+Readers (`read_heartbeats`) get every session's live state from one read of
+the table. A worker is alive if its beat is fresher than STALE_S. A stale
+beat is confirmed against the process start time recorded in the slot, so
+stopped-but-alive workers are still seen as alive and a reused PID is
+never mistaken for the worker.
+
+Sessions without a slot (the table is full, or a worker from an older
+version) fall back to `os.kill(pid, 0)`.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import mmap
+import os
+import struct
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from clrun.pty.pty_manager import is_pty_alive
+from clrun.utils.paths import get_clrun_paths
+
+TABLE_FILE = "heartbeats"
+MAGIC = b"CLHB"
+VERSION = 1
+SLOTS = 1024
+STALE_S = 5.0
+
+FREE, RUNNING, STOPPED = 0, 1, 2
+
+_HEADER = struct.Struct("<4sHHI4x")
+# terminal_id, state, worker_pid, pid, queue_depth, worker_start, pty_start,
+# beat (monotonic), activity (epoch), buffer_size
+_SLOT = struct.Struct("<16sIIIIQQddQ")
+_BEAT_OFFSET = 48
+_BEAT = struct.Struct("<d")
+_TABLE_SIZE = _HEADER.size + SLOTS * _SLOT.size
+_EMPTY_ID = bytes(16)
+
+
+@dataclass
+class Heartbeat:
+    terminal_id: str
+    state: int
+    worker_pid: int
+    pid: int
+    worker_start: int
+    pty_start: int
+    age_s: float
+    activity: float
+    buffer_size: int
+    queue_depth: int
+
+    @property
+    def fresh(self) -> bool:
+        return self.state == RUNNING and 0 <= self.age_s < STALE_S
+
+
+def table_path(project_root: str) -> str:
+    return os.path.join(get_clrun_paths(project_root).root, TABLE_FILE)
+
+
+def process_start_time(pid: int) -> int:
+    """Start time of a process in clock ticks since boot (Linux); 0 if unknown."""
+    if pid <= 0:
+        return 0
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+        # Field 22; fields are counted after the parenthesised command name.
+        return int(stat[stat.rindex(b")") + 2:].split()[19])
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _same_process(pid: int, start_time: int) -> bool:
+    """True if `pid` is alive and, when known, still the process that started at `start_time`."""
+    if start_time:
+        current = process_start_time(pid)
+        if current:
+            return current == start_time
+    return is_pty_alive(pid)
+
+
+def _decode(raw: bytes, now: float) -> Optional[Heartbeat]:
+    tid, state, worker_pid, pid, depth, worker_start, pty_start, beat, activity, size = _SLOT.unpack(raw)
+    if tid == _EMPTY_ID:
+        return None
+    return Heartbeat(
+        terminal_id=str(uuid.UUID(bytes=tid)), state=state, worker_pid=worker_pid, pid=pid,
+        worker_start=worker_start, pty_start=pty_start, age_s=now - beat, activity=activity,
+        buffer_size=size, queue_depth=depth,
+    )
+
+
+def read_heartbeats(project_root: str) -> Dict[str, Heartbeat]:
+    """Every slot in the table, keyed by terminal ID ({} if there is no table)."""
+    try:
+        with open(table_path(project_root), "rb") as f:
+            data = f.read(_TABLE_SIZE)
+    except OSError:
+        return {}
+    if len(data) < _TABLE_SIZE or data[:4] != MAGIC:
+        return {}
+    now = time.monotonic()
+    beats: Dict[str, Heartbeat] = {}
+    for offset in range(_HEADER.size, _TABLE_SIZE, _SLOT.size):
+        if data[offset:offset + 16] == _EMPTY_ID:
+            continue
+        hb = _decode(data[offset:offset + _SLOT.size], now)
+        if hb:
+            beats[hb.terminal_id] = hb
+    return beats
+
+
+def worker_alive(hb: Heartbeat) -> bool:
+    if hb.state != RUNNING:
+        return False
+    return hb.fresh or _same_process(hb.worker_pid, hb.worker_start)
+
+
+def session_alive(
+    terminal_id: str,
+    worker_pid: int,
+    pty_pid: Optional[int] = None,
+    project_root: Optional[str] = None,
+    beats: Optional[Dict[str, Heartbeat]] = None,
+) -> bool:
+    """Whether a running session's worker (or, if given, its shell) is still alive.
+
+    Pass `beats` from `read_heartbeats` when checking many sessions.
+    """
+    if beats is None:
+        beats = read_heartbeats(project_root) if project_root else {}
+    hb = beats.get(terminal_id)
+    if hb is None or hb.worker_pid != worker_pid:
+        return is_pty_alive(worker_pid) or (pty_pid is not None and is_pty_alive(pty_pid))
+    if worker_alive(hb):
+        return True
+    return pty_pid is not None and hb.state == RUNNING and _same_process(pty_pid, hb.pty_start)
+
+
+class HeartbeatSlot:
+    """A worker's slot in the heartbeat table."""
+
+    def __init__(self, table: mmap.mmap, offset: int) -> None:
+        self._table = table
+        self._offset = offset
+        self._beat_offset = offset + _BEAT_OFFSET
+
+    def beat(self) -> None:
+        _BEAT.pack_into(self._table, self._beat_offset, time.monotonic())
+
+    def update(self, queue_depth: int, buffer_size: int, activity: float) -> None:
+        tid, state, worker_pid, pid, _, worker_start, pty_start, _, _, _ = _SLOT.unpack_from(
+            self._table, self._offset)
+        _SLOT.pack_into(self._table, self._offset, tid, state, worker_pid, pid, queue_depth,
+                        worker_start, pty_start, time.monotonic(), activity, buffer_size)
+
+    def release(self) -> None:
+        """Mark the session stopped; the slot can then be reused by another session."""
+        struct.pack_into("<I", self._table, self._offset + 16, STOPPED)
+        self.beat()
+
+
+def _open_table(project_root: str) -> mmap.mmap:
+    fd = os.open(table_path(project_root), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(fd, _HEADER.size, 0)
+            if os.fstat(fd).st_size != _TABLE_SIZE or header[:4] != MAGIC:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, _TABLE_SIZE)
+                os.pwrite(fd, _HEADER.pack(MAGIC, VERSION, _SLOT.size, SLOTS), 0)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        return mmap.mmap(fd, _TABLE_SIZE)
+    finally:
+        os.close(fd)
+
+
+def claim(terminal_id: str, worker_pid: int, pid: int, project_root: str) -> Optional[HeartbeatSlot]:
+    """Claim (or re-claim, after a restore) the slot for a session; None if the table is full."""
+    try:
+        key = uuid.UUID(terminal_id).bytes
+        table = _open_table(project_root)
+    except (OSError, ValueError):
+        return None
+    start = int.from_bytes(key[:8], "little") % SLOTS
+    now = time.monotonic()
+
+    with open(table_path(project_root), "rb") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        chosen: Optional[int] = None
+        for i in range(SLOTS):
+            offset = _HEADER.size + ((start + i) % SLOTS) * _SLOT.size
+            tid = table[offset:offset + 16]
+            if tid == key:
+                chosen = offset
+                break
+            if tid == _EMPTY_ID:
+                # End of the probe chain: the session has no slot yet.
+                if chosen is None:
+                    chosen = offset
+                break
+            if chosen is None:
+                hb = _decode(table[offset:offset + _SLOT.size], now)
+                if hb and not worker_alive(hb):
+                    chosen = offset
+        if chosen is None:
+            table.close()
+            return None
+        _SLOT.pack_into(table, chosen, key, RUNNING, worker_pid, pid, 0,
+                        process_start_time(worker_pid), process_start_time(pid), now, time.time(), 0)
+    return HeartbeatSlot(table, chosen)
+
+
+def overlay(index: Dict[str, Dict[str, Any]], beats: Dict[str, Heartbeat]) -> Dict[str, Dict[str, Any]]:
+    """Session index records with running sessions' live queue depth and activity time.
+
+    Workers write their metadata behind, so the heartbeat table is fresher
+    than the index for these two fields. Records are copied, not mutated.
+    """
+    if not beats:
+        return index
+    merged = dict(index)
+    for tid, rec in index.items():
+        hb = beats.get(tid)
+        if not hb or rec.get("status") != "running" or hb.state != RUNNING or hb.worker_pid != rec.get("worker_pid"):
+            continue
+        live = dict(rec, queue_length=hb.queue_depth)
+        activity = datetime.fromtimestamp(hb.activity, timezone.utc).isoformat()
+        if activity > (rec.get("last_activity_at") or ""):
+            live["last_activity_at"] = activity
+        merged[tid] = live
+    return merged
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 import time
 from dataclasses import dataclass
 from typing import Optional
@@ -22,9 +23,10 @@ def _is_process_alive(pid: int) -> bool:
         return False
 
 
-def _atomic_write(filepath: str, content: str) -> None:
-    tmp = filepath + f".tmp.{os.getpid()}"
-    with open(tmp, "w", encoding="utf-8") as f:
+def _atomic_write(filepath: str, content: str, mode: int = 0o666) -> None:
+    tmp = filepath + f".tmp.{os.getpid()}.{threading.get_ident()}"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    with open(fd, "w", encoding="utf-8") as f:
         f.write(content)
     os.replace(tmp, filepath)
 
@@ -73,21 +75,35 @@ def acquire_lock(project_root: str) -> LockResult:
         version=PACKAGE_VERSION,
         project_root=project_root,
     )
-
-    _atomic_write(paths.runtime_lock, f"{pid}\n{int(time.time())}")
-    _atomic_write(paths.runtime_pid, str(pid))
-    _atomic_write(
-        paths.runtime_json,
-        json.dumps(
-            {"pid": runtime.pid, "started_at": runtime.started_at, "version": runtime.version, "project_root": runtime.project_root},
-            indent=2,
-        ),
-    )
+    write_runtime_state(runtime, project_root)
     return LockResult(acquired=True, attached=False, message=f"Runtime lock acquired (PID: {pid})")
 
 
-def release_lock(project_root: str) -> None:
+def write_runtime_state(runtime: RuntimeState, project_root: str) -> None:
+    """Write the lock, pid and runtime.json files for the given runtime owner."""
     paths = get_clrun_paths(project_root)
+    d = {"pid": runtime.pid, "started_at": runtime.started_at, "version": runtime.version, "project_root": runtime.project_root}
+    for key in ("port", "socket", "token"):
+        value = getattr(runtime, key)
+        if value is not None:
+            d[key] = value
+
+    _atomic_write(paths.runtime_lock, f"{runtime.pid}\n{int(time.time())}")
+    _atomic_write(paths.runtime_pid, str(runtime.pid))
+    # runtime.json carries the TCP auth token when one is set: keep it private.
+    _atomic_write(paths.runtime_json, json.dumps(d, indent=2), 0o600 if runtime.token else 0o666)
+
+
+def release_lock(project_root: str, pid: Optional[int] = None) -> None:
+    """Remove the runtime lock files (only if owned by `pid`, when given)."""
+    paths = get_clrun_paths(project_root)
+    if pid is not None:
+        try:
+            with open(paths.runtime_pid, "r", encoding="utf-8") as f:
+                if int(f.read().strip()) != pid:
+                    return
+        except Exception:
+            return
     _cleanup_lock(paths)
 
 
@@ -0,0 +1,266 @@
+"""Counters and latency histograms, persisted per session.
+
+Each worker keeps a Metrics object in memory and writes it to
+`.clrun/metrics/<terminal_id>.json` on the same write-behind schedule as
+its session metadata (see clrun.worker.SessionWriter), and once more when
+the session stops. With `metrics.commands` on, CLI commands add their run
+time to `.clrun/metrics/commands.json` under an flock; the runtime server
+keeps them in memory and merges them in every COMMAND_FLUSH_S instead.
+`clrun stats` reads both.
+
+Histograms are HDR-style: log-linear buckets over microseconds, with
+SUB_BUCKETS buckets per power of two (at most ~6% relative error). They
+are stored sparsely, so an idle histogram costs nothing, and histograms
+from many sessions merge exactly.
+
+With `metrics.enabled` off, workers and commands skip the timers as well
+as the writes; the only cost left is reading the setting once per process.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from clrun.utils.config import load_config, parse_bool
+from clrun.utils.paths import get_clrun_paths
+
+COMMANDS_SCOPE = "commands"
+EXPORTER_SCOPE = "exporter"  # clrun.runtime.exporter's ledger counters
+PROJECT_SCOPES = (COMMANDS_SCOPE, EXPORTER_SCOPE)
+LOCK_FILE = ".lock"
+COMMAND_FLUSH_S = 5.0
+
+SUB_BUCKETS = 16
+_SUB_BITS = SUB_BUCKETS.bit_length()  # values below 2 * SUB_BUCKETS get one bucket each
+
+
+def _bucket(us: int) -> int:
+    if us < 2 * SUB_BUCKETS:
+        return us
+    shift = us.bit_length() - _SUB_BITS
+    return (shift << (_SUB_BITS - 1)) + (us >> shift)
+
+
+def _bucket_value(index: int) -> float:
+    """Midpoint, in microseconds, of the values that fall into a bucket."""
+    if index < 2 * SUB_BUCKETS:
+        return float(index)
+    shift = (index >> (_SUB_BITS - 1)) - 1
+    mantissa = index - (shift << (_SUB_BITS - 1))
+    return ((mantissa << shift) + ((mantissa + 1) << shift) - 1) / 2
+
+
+class Histogram:
+    """Latency distribution with constant-time recording."""
+
+    __slots__ = ("counts", "count", "total_us", "min_us", "max_us")
+
+    def __init__(self) -> None:
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us = 0
+        self.max_us = 0
+
+    def record(self, seconds: float) -> None:
+        us = max(int(seconds * 1e6), 0)
+        b = _bucket(us)
+        self.counts[b] = self.counts.get(b, 0) + 1
+        if not self.count or us < self.min_us:
+            self.min_us = us
+        if us > self.max_us:
+            self.max_us = us
+        self.count += 1
+        self.total_us += us
+
+    def merge(self, other: "Histogram") -> None:
+        for b, n in other.counts.items():
+            self.counts[b] = self.counts.get(b, 0) + n
+        if other.count and (not self.count or other.min_us < self.min_us):
+            self.min_us = other.min_us
+        self.max_us = max(self.max_us, other.max_us)
+        self.count += other.count
+        self.total_us += other.total_us
+
+    def percentile(self, q: float) -> float:
+        """Value (seconds) at quantile q in [0, 1]; 0 for an empty histogram."""
+        if not self.count:
+            return 0.0
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for b in sorted(self.counts):
+            seen += self.counts[b]
+            if seen >= rank:
+                return min(max(_bucket_value(b), self.min_us), self.max_us) / 1e6
+        return self.max_us / 1e6
+
+    def summary(self) -> Dict[str, Any]:
+        """count, mean and p50/p95/p99/max in milliseconds."""
+        ms = lambda seconds: round(seconds * 1000, 3)  # noqa: E731
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.total_us / self.count / 1e6) if self.count else 0.0,
+            "p50_ms": ms(self.percentile(0.50)),
+            "p95_ms": ms(self.percentile(0.95)),
+            "p99_ms": ms(self.percentile(0.99)),
+            "max_ms": ms(self.max_us / 1e6),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"counts": {str(b): n for b, n in self.counts.items()}, "count": self.count,
+                "total_us": self.total_us, "min_us": self.min_us, "max_us": self.max_us}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Histogram":
+        h = cls()
+        h.counts = {int(b): int(n) for b, n in d.get("counts", {}).items()}
+        h.count = int(d.get("count", 0))
+        h.total_us = int(d.get("total_us", 0))
+        h.min_us = int(d.get("min_us", 0))
+        h.max_us = int(d.get("max_us", 0))
+        return h
+
+
+class Metrics:
+    """The counters and histograms of one scope (a session, or the CLI commands)."""
+
+    def __init__(self) -> None:
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.started = time.time()
+        self.updated = self.started
+        self.dirty = False
+
+    def incr(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+        self.dirty = True
+
+    def observe(self, name: str, seconds: float) -> None:
+        h = self.histograms.get(name)
+        if h is None:
+            h = self.histograms[name] = Histogram()
+        h.record(seconds)
+        self.dirty = True
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def merge(self, other: "Metrics") -> None:
+        for name, n in other.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + n
+        for name, h in other.histograms.items():
+            self.histograms.setdefault(name, Histogram()).merge(h)
+        self.started = min(self.started, other.started)
+        self.updated = max(self.updated, other.updated)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started": self.started,
+            "updated": self.updated,
+            "counters": dict(self.counters),
+            "histograms": {name: h.to_dict() for name, h in self.histograms.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Metrics":
+        m = cls()
+        m.started = float(d.get("started", m.started))
+        m.updated = float(d.get("updated", m.started))
+        m.counters = {k: int(v) for k, v in d.get("counters", {}).items()}
+        m.histograms = {k: Histogram.from_dict(v) for k, v in d.get("histograms", {}).items()}
+        return m
+
+
+def enabled(project_root: str) -> bool:
+    return parse_bool(load_config(project_root).get("metrics", {}).get("enabled", True))
+
+
+def commands_enabled(project_root: str) -> bool:
+    settings = load_config(project_root).get("metrics", {})
+    return parse_bool(settings.get("enabled", True)) and parse_bool(settings.get("commands", False))
+
+
+def metrics_path(project_root: str, scope: str) -> str:
+    return os.path.join(get_clrun_paths(project_root).metrics_dir, f"{scope}.json")
+
+
+def load(project_root: str, scope: str) -> Optional[Metrics]:
+    try:
+        with open(metrics_path(project_root, scope), "r", encoding="utf-8") as f:
+            return Metrics.from_dict(json.load(f))
+    except (OSError, ValueError, TypeError, AttributeError):
+        return None
+
+
+def save(project_root: str, scope: str, metrics: Metrics) -> None:
+    metrics.updated = time.time()
+    metrics.dirty = False
+    path = metrics_path(project_root, scope)
+    tmp = path + f".tmp.{os.getpid()}.{threading.get_ident()}"
+    try:
+        f = open(tmp, "w", encoding="utf-8")
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        f = open(tmp, "w", encoding="utf-8")
+    with f:
+        json.dump(metrics.to_dict(), f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+# Command metrics not yet merged into commands.json, per project (runtime server only).
+_pending: Optional[Dict[str, Metrics]] = None
+_pending_lock = threading.Lock()
+
+
+def batch_commands() -> None:
+    """Keep recorded commands in memory until flush_commands() (used by the runtime server)."""
+    global _pending
+    with _pending_lock:
+        if _pending is None:
+            _pending = {}
+
+
+def record_command(project_root: str, name: str, seconds: float) -> None:
+    """Add one command's run time to the project's command metrics."""
+    with _pending_lock:
+        if _pending is not None:
+            _pending.setdefault(project_root, Metrics()).observe(f"command.{name}", seconds)
+            return
+    recorded = Metrics()
+    recorded.observe(f"command.{name}", seconds)
+    _merge_commands(project_root, recorded)
+
+
+def flush_commands() -> None:
+    """Merge the commands batched since the last flush into each project's commands.json."""
+    global _pending
+    with _pending_lock:
+        if not _pending:
+            return
+        batched, _pending = _pending, {}
+    for project_root, recorded in batched.items():
+        _merge_commands(project_root, recorded)
+
+
+def _merge_commands(project_root: str, recorded: Metrics) -> None:
+    directory = get_clrun_paths(project_root).metrics_dir
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, LOCK_FILE), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            metrics = load(project_root, COMMANDS_SCOPE) or Metrics()
+            metrics.merge(recorded)
+            save(project_root, COMMANDS_SCOPE, metrics)
+    except OSError:
+        pass
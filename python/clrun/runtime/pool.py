@@ -0,0 +1,344 @@
+"""Pre-warmed shells: idle workers whose shell has already started.
+
+Shell startup (rc files, prompt frameworks) can take most of a second, and
+a new session normally pays for it before its command runs. With a pool
+configured (`{"pool": {"size": 2}}`), `clrun run` instead hands the session
+to an idle pooled worker, which types the command into its ready shell at
+once and becomes an ordinary session worker.
+
+Pooled workers are keyed by cwd, shell and a per-call PTY backend override
+(CLRUN_WORKER_PTY_BACKEND; see clrun.pty.backend). The rest of the
+environment is not part of the key, because agents' environments tend to
+differ in some variable on every call. Instead the claim carries the caller's environment, and the
+worker brings its shell in line before typing the command: it exports what
+differs and unsets what is missing, with the same self-deleting script as
+a restore (clrun.pty.capture). Only what rc files derived from the old
+environment at startup can differ from a fresh spawn. Each pooled worker
+keeps its files in `.clrun/pool/<key>/`:
+
+  * `<id>.starting`: created when it is launched, so it counts towards
+    the pool size while its shell starts.
+  * `<id>.ready`: renamed from `.starting` (holding the worker PID) once
+    the shell has gone quiet after printing its prompt.
+  * `<id>.fifo`: the worker's wake-up pipe.
+
+A claim unlinks a `.ready` file (only one claimer can), writes
+`<id>.claim` with the session, and writes a byte to the FIFO. A worker
+that has been idle for `idle_ttl` retires by unlinking its own `.ready`
+file; if that fails, it has just been claimed and waits for the claim.
+
+The pool is filled when a run finds it empty, and a claimed worker
+launches its own replacement, so steady-state runs never pay for a spawn.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+import select
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from clrun.pty.capture import discard_output
+from clrun.runtime.spawn import launch_worker, spawn_worker
+from clrun.utils import trace
+from clrun.utils.config import load_config, parse_int
+from clrun.utils.context import get_env
+from clrun.utils.paths import get_clrun_paths
+from clrun.utils.timespec import parse_duration
+
+POOL_DIR = "pool"
+STARTING_GRACE_S = 30.0
+READY_QUIET_S = 0.1
+READY_MAX_S = 5.0
+CLAIM_WAIT_S = 5.0
+# How often `clrun run` checks for output from a claimed worker (its shell is already up).
+POOLED_POLL_S = 0.02
+
+# Set by the shell or the worker itself, never carried over from the caller.
+_SHELL_ENV = {"_", "PWD", "OLDPWD", "SHLVL", "TERM"}
+
+
+@dataclass
+class Claim:
+    terminal_id: str
+    command: str
+    env: Dict[str, str]
+
+
+@dataclass
+class PoolSettings:
+    size: int = 0
+    idle_ttl_s: Optional[float] = 600.0
+
+    @classmethod
+    def from_config(cls, project_root: str) -> "PoolSettings":
+        settings = load_config(project_root).get("pool", {})
+        pool = cls()
+        try:
+            pool.size = parse_int(settings.get("size")) or 0
+        except ValueError:
+            pass
+        try:
+            pool.idle_ttl_s = parse_duration(settings.get("idle_ttl"))
+        except ValueError:
+            pass
+        return pool
+
+
+def pool_key(cwd: str, env: Optional[Dict[str, str]] = None) -> str:
+    """Identifies the shells a session started in `cwd` (with $SHELL and its PTY backend from `env`) may use."""
+    if env is None:
+        env = get_env() or os.environ
+    key = f"{os.path.realpath(cwd)}\0{env.get('SHELL', '')}\0{env.get('CLRUN_WORKER_PTY_BACKEND', '')}"
+    return hashlib.sha1(key.encode("utf-8", "surrogateescape")).hexdigest()[:16]
+
+
+def env_changes(current: Dict[str, str], wanted: Dict[str, str]) -> Tuple[Dict[str, str], List[str]]:
+    """(variables to export, names to unset) to turn a shell's `current` environment into `wanted`."""
+    exports = {k: v for k, v in wanted.items() if k not in _SHELL_ENV and current.get(k) != v}
+    unsets = [k for k in current if k not in _SHELL_ENV and k not in wanted]
+    return exports, unsets
+
+
+def pool_dir(project_root: str, key: str) -> str:
+    return os.path.join(get_clrun_paths(project_root).root, POOL_DIR, key)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+
+
+def _read_pid(path: str) -> int:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _unlink(path: str) -> bool:
+    try:
+        os.unlink(path)
+        return True
+    except OSError:
+        return False
+
+
+def _prune(directory: str) -> int:
+    """Remove entries of workers that died; returns the number still starting or ready."""
+    now = time.time()
+    count = 0
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        worker_id, _, kind = name.partition(".")
+        if kind == "starting":
+            try:
+                stale = now - os.path.getmtime(path) > STARTING_GRACE_S
+            except OSError:
+                continue
+            if stale:
+                _unlink(path)
+                continue
+        elif kind == "ready":
+            if not _alive(_read_pid(path)):
+                _unlink(path)
+                _unlink(os.path.join(directory, worker_id + ".fifo"))
+                continue
+        else:
+            continue
+        count += 1
+    return count
+
+
+def fill(project_root: str, cwd: str) -> int:
+    """Launch pooled workers for `cwd` (and the current environment) up to the pool size."""
+    settings = PoolSettings.from_config(project_root)
+    if settings.size <= 0:
+        return 0
+    key = pool_key(cwd)
+    directory = pool_dir(project_root, key)
+    os.makedirs(directory, exist_ok=True)
+    fd = os.open(os.path.join(directory, ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    launched = 0
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        for _ in range(settings.size - _prune(directory)):
+            worker_id = uuid.uuid4().hex[:12]
+            with open(os.path.join(directory, worker_id + ".starting"), "x", encoding="utf-8"):
+                pass
+            # The worker is handed the key rather than deriving it from its own environment.
+            launch_worker(["--pool", worker_id, cwd, project_root, key], project_root)
+            launched += 1
+    finally:
+        os.close(fd)
+    return launched
+
+
+def claim(project_root: str, cwd: str, terminal_id: str, command: str) -> Optional[int]:
+    """Hand a new session to an idle pooled worker; its PID, or None if none is ready."""
+    directory = pool_dir(project_root, pool_key(cwd))
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return None
+    for name in names:
+        if not name.endswith(".ready"):
+            continue
+        worker_id = name[:-len(".ready")]
+        ready = os.path.join(directory, name)
+        pid = _read_pid(ready)
+        if not _unlink(ready):
+            continue  # someone else claimed it (or it retired)
+        claim_path = os.path.join(directory, worker_id + ".claim")
+        tmp = claim_path + f".tmp.{os.getpid()}.{threading.get_ident()}"
+        # The caller's whole environment (tokens included): readable by the owner only.
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with open(fd, "w", encoding="utf-8") as f:
+            json.dump({"terminal_id": terminal_id, "command": command,
+                       "env": dict(get_env() or os.environ)}, f)
+        os.replace(tmp, claim_path)
+        try:
+            # ENXIO if no one has the FIFO open: the worker is gone.
+            fifo = os.open(os.path.join(directory, worker_id + ".fifo"), os.O_WRONLY | os.O_NONBLOCK)
+        except OSError:
+            _unlink(claim_path)
+            _unlink(os.path.join(directory, worker_id + ".fifo"))
+            continue
+        try:
+            trace.flow("worker", terminal_id, start=True)
+            os.write(fifo, b"\n")
+        finally:
+            os.close(fifo)
+        return pid
+    return None
+
+
+def start_worker(terminal_id: str, command: str, cwd: str, project_root: str) -> Tuple[int, bool]:
+    """Start a new session's worker: a pooled one if ready, else a fresh spawn. Returns (pid, pooled)."""
+    with trace.span("claim pooled worker", terminal_id=terminal_id) as span:
+        pid = claim(project_root, cwd, terminal_id, command)
+        if span is not None:
+            span.args["claimed"] = pid is not None
+    if pid is not None:
+        return pid, True
+    pid = spawn_worker(terminal_id, command, cwd, project_root)
+    try:
+        fill(project_root, cwd)
+    except OSError:
+        pass
+    return pid, False
+
+
+# ─── Worker side ─────────────────────────────────────────────────────────
+
+def _wait_until_quiet(pty_fd: int) -> bool:
+    """Discard shell startup output until it pauses after the prompt; False if the shell died."""
+    deadline = time.monotonic() + READY_MAX_S
+    seen = False
+    while time.monotonic() < deadline:
+        if not select.select([pty_fd], [], [], READY_QUIET_S if seen else 0.5)[0]:
+            if seen:
+                return True
+            continue
+        try:
+            if not os.read(pty_fd, 65536):
+                return False
+        except OSError:
+            return False
+        seen = True
+    return True
+
+
+def _read_claim(path: str) -> Optional[Claim]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return Claim(data["terminal_id"], data["command"], dict(data["env"]))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def serve(pty_fd: int, worker_id: str, cwd: str, project_root: str, key: str) -> Optional[Claim]:
+    """Run in a pooled worker once its shell is spawned: mark it ready and wait.
+
+    `key` is the pool_key `fill` computed for the environment it launched
+    the worker with, so the worker waits where `claim` looks.
+
+    Returns the claim for the session it was handed, or None once it has
+    retired (idle TTL, shell exited, pool removed).
+    """
+    directory = pool_dir(project_root, key)
+    starting = os.path.join(directory, worker_id + ".starting")
+    ready = os.path.join(directory, worker_id + ".ready")
+    fifo = os.path.join(directory, worker_id + ".fifo")
+    claim_path = os.path.join(directory, worker_id + ".claim")
+    settings = PoolSettings.from_config(project_root)
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        os.mkfifo(fifo, 0o600)
+        # Opened read-write so the FIFO always has a writer and only a claim makes it readable.
+        wake = os.open(fifo, os.O_RDWR | os.O_NONBLOCK)
+    except OSError:
+        _unlink(starting)
+        return None
+
+    try:
+        if not _wait_until_quiet(pty_fd):
+            _unlink(starting)
+            return None
+        with open(starting, "w", encoding="utf-8") as f:
+            f.write(str(os.getpid()))
+        os.rename(starting, ready)
+
+        deadline = time.monotonic() + settings.idle_ttl_s if settings.idle_ttl_s else None
+        watched = [pty_fd, wake]
+        retiring = False
+        while True:
+            timeout = 1.0 if deadline is None else max(min(deadline - time.monotonic(), 1.0), 0.0)
+            readable = select.select(watched, [], [], timeout)[0]
+            if wake in readable:
+                try:
+                    os.read(wake, 64)
+                except OSError:
+                    pass
+                claimed = _read_claim(claim_path)
+                if claimed:
+                    _unlink(claim_path)
+                    discard_output(pty_fd)
+                    return claimed
+            if pty_fd in readable:
+                try:
+                    shell_alive = bool(os.read(pty_fd, 65536))
+                except OSError:
+                    shell_alive = False
+                if not shell_alive:
+                    watched.remove(pty_fd)
+                    if _unlink(ready):
+                        return None
+                    # Claimed just now: hand over anyway; the session reports the exit.
+                    retiring = True
+                    deadline = time.monotonic() + CLAIM_WAIT_S
+            if deadline is not None and time.monotonic() >= deadline:
+                if retiring:
+                    return None
+                # Retire, unless a claim got there first; then wait for it.
+                if _unlink(ready) or not os.path.isdir(get_clrun_paths(project_root).root):
+                    return None
+                retiring = True
+                deadline = time.monotonic() + CLAIM_WAIT_S
+    finally:
+        os.close(wake)
+        _unlink(fifo)
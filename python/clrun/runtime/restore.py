@@ -2,12 +2,11 @@
 
 from __future__ import annotations
 
-import os
-import subprocess
-import sys
 import time
 
 from clrun.pty.pty_manager import read_session
+from clrun.queue.queue_engine import read_queue
+from clrun.runtime.spawn import spawn_worker
 from clrun.ledger.ledger import log_event
 
 
@@ -18,25 +17,15 @@ def restore_session(terminal_id: str, project_root: str) -> None:
 
     restored_cwd = session.saved_state.cwd if session.saved_state else session.cwd
 
-    worker_module = "clrun.worker"
-    child = subprocess.Popen(
-        [
-            sys.executable, "-m", worker_module,
-            terminal_id, session.command, restored_cwd, project_root, "--restore",
-        ],
-        start_new_session=True,
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-        stdin=subprocess.DEVNULL,
-    )
+    worker_pid = spawn_worker(terminal_id, session.command, restored_cwd, project_root, restore=True)
 
     log_event("session.restored", project_root, terminal_id, {
-        "worker_pid": child.pid,
+        "worker_pid": worker_pid,
         "restored_cwd": restored_cwd,
     })
 
     max_wait = 3.0
-    poll_interval = 0.1
+    poll_interval = 0.02
     elapsed = 0.0
 
     while elapsed < max_wait:
@@ -45,3 +34,18 @@ def restore_session(terminal_id: str, project_root: str) -> None:
         updated = read_session(terminal_id, project_root)
         if updated and updated.status == "running" and updated.worker_pid != session.worker_pid:
             return
+
+
+def wait_until_sent(terminal_id: str, queue_id: str, project_root: str, max_wait: float = 3.0) -> bool:
+    """Poll until the restored worker has sent a queued entry (it does so right after restoring)."""
+    deadline = time.monotonic() + max_wait
+    while time.monotonic() < deadline:
+        for entry in read_queue(terminal_id, project_root).entries:
+            if entry.queue_id == queue_id:
+                if entry.status != "queued":
+                    return True
+                break
+        else:
+            return False
+        time.sleep(0.02)
+    return False
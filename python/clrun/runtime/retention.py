@@ -0,0 +1,357 @@
+"""Retention: remove old sessions, trim queue history and prune the ledger.
+
+Policies come from the `gc` section of the project config (see
+clrun.utils.config). Only sessions that are no longer running are ever
+removed; suspended sessions only when a per-status rule names them.
+Sessions go in order of inactivity: first those past their max age, then
+the oldest until the session count and total size fit.
+
+`clrun gc` runs a collection on demand. With `gc.auto` enabled,
+`maybe_schedule` (called when sessions are created) starts a detached
+collection at most once per `gc.auto_interval`, tracked by the mtime of
+`.clrun/gc.stamp`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from clrun import store
+from clrun.utils import cache
+from clrun.utils.config import load_config, parse_bool, parse_int, parse_size
+from clrun.utils.paths import get_clrun_paths, session_path, queue_path, buffer_path
+from clrun.utils.timespec import parse_duration
+from clrun.pty import session_index
+from clrun.queue.queue_engine import read_queue, write_queue
+from clrun.ledger import query as ledger_query, writer as ledger_writer
+from clrun.ledger.ledger import log_event
+from clrun.runtime import metrics
+
+STAMP_FILE = "gc.stamp"
+ORPHAN_GRACE_S = 3600
+LOGGED_IDS = 100
+
+# Statuses whose sessions can be collected without an explicit rule.
+STOPPED = ("exited", "killed", "detached")
+
+
+@dataclass
+class RetentionPolicy:
+    max_age_s: Optional[float] = None
+    status_max_age_s: Dict[str, Optional[float]] = field(default_factory=dict)
+    max_sessions: Optional[int] = None
+    max_bytes: Optional[int] = None
+    queue_history: Optional[int] = None
+    ledger_max_bytes: Optional[int] = None
+
+    @classmethod
+    def from_config(cls, project_root: str, **overrides: Any) -> "RetentionPolicy":
+        """Policy from the project's gc settings; non-None overrides win.
+
+        Raises ValueError for malformed values.
+        """
+        gc = load_config(project_root)["gc"]
+        gc.update({k: v for k, v in overrides.items() if v is not None})
+
+        rules = gc.get("status_max_age") or {}
+        if isinstance(rules, str):  # from the environment: "killed=1d,exited=3d"
+            rules = dict(part.split("=", 1) for part in rules.split(",") if "=" in part)
+        return cls(
+            max_age_s=parse_duration(gc.get("max_age")),
+            status_max_age_s={k.strip(): parse_duration(v) for k, v in rules.items()},
+            max_sessions=parse_int(gc.get("max_sessions")),
+            max_bytes=parse_size(gc.get("max_bytes")),
+            queue_history=parse_int(gc.get("queue_history")),
+            ledger_max_bytes=parse_size(gc.get("ledger_max_bytes")),
+        )
+
+    def collectable(self, status: str) -> bool:
+        return status in STOPPED or status in self.status_max_age_s
+
+    def max_age_for(self, status: str) -> Optional[float]:
+        if status in self.status_max_age_s:
+            return self.status_max_age_s[status]
+        return self.max_age_s if status in STOPPED else None
+
+
+def _epoch(timestamp: str) -> float:
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _session_files(terminal_id: str, project_root: str) -> List[str]:
+    sessions_dir = get_clrun_paths(project_root).sessions_dir
+    return [
+        session_path(terminal_id, project_root),
+        queue_path(terminal_id, project_root),
+        buffer_path(terminal_id, project_root),
+        os.path.join(sessions_dir, f"{terminal_id}.state.cwd"),
+        os.path.join(sessions_dir, f"{terminal_id}.state.env"),
+        os.path.join(sessions_dir, f"{terminal_id}.restore.sh"),
+        metrics.metrics_path(project_root, terminal_id),
+    ]
+
+
+def _remove(path: str) -> int:
+    size = _size(path)
+    try:
+        os.unlink(path)
+    except OSError:
+        return 0
+    cache.forget(path)
+    return size
+
+
+def _select(
+    index: Dict[str, Dict[str, Any]], policy: RetentionPolicy, project_root: str, now: float
+) -> Tuple[List[str], Dict[str, int]]:
+    """Terminal IDs to remove (oldest first) and the byte size of every session."""
+    sizes = {tid: sum(_size(p) for p in _session_files(tid, project_root)) for tid in index}
+    by_age = sorted(
+        index.items(),
+        key=lambda item: _epoch(item[1].get("last_activity_at") or item[1].get("created_at", "")),
+    )
+
+    doomed: List[str] = []
+    kept: List[str] = []
+    for tid, s in by_age:
+        status = s.get("status", "")
+        limit = policy.max_age_for(status)
+        last = _epoch(s.get("last_activity_at") or s.get("created_at", ""))
+        if limit is not None and policy.collectable(status) and now - last > limit:
+            doomed.append(tid)
+        else:
+            kept.append(tid)
+
+    total = sum(sizes[tid] for tid in kept)
+    for tid in list(kept):
+        over_count = policy.max_sessions is not None and len(kept) > policy.max_sessions
+        over_bytes = policy.max_bytes is not None and total > policy.max_bytes
+        if not (over_count or over_bytes):
+            break
+        if policy.collectable(index[tid].get("status", "")):
+            kept.remove(tid)
+            doomed.append(tid)
+            total -= sizes[tid]
+    return doomed, sizes
+
+
+def _trim_queues(
+    index: Dict[str, Dict[str, Any]], keep: int, project_root: str, dry_run: bool
+) -> Tuple[int, int]:
+    """Drop sent/cancelled entries beyond the newest `keep` from stopped sessions' queues."""
+    trimmed = reclaimed = 0
+    for tid, s in index.items():
+        # Running sessions' queues are written concurrently by the CLI and
+        # the worker; leave them alone.
+        if s.get("status") in ("running", "suspended"):
+            continue
+        path = queue_path(tid, project_root)
+        before = _size(path)
+        if before < 1024:
+            continue
+        queue = read_queue(tid, project_root)
+        history = [e for e in queue.entries if e.status != "queued"]
+        excess = len(history) - keep
+        if excess <= 0:
+            continue
+        dropped = {id(e) for e in sorted(history, key=lambda e: e.created_at)[:excess]}
+        trimmed += excess
+        if dry_run:
+            reclaimed += int(before * excess / max(len(queue.entries), 1))
+            continue
+        queue.entries = [e for e in queue.entries if id(e) not in dropped]
+        write_queue(tid, queue, project_root)
+        reclaimed += max(before - _size(path), 0)
+    return trimmed, reclaimed
+
+
+def _session_exists(terminal_id: str, project_root: str) -> bool:
+    db = store.sqlite(project_root)
+    if db:
+        return db.read_session(terminal_id, project_root) is not None
+    return os.path.exists(session_path(terminal_id, project_root))
+
+
+def _orphans(index: Dict[str, Dict[str, Any]], project_root: str, now: float) -> List[str]:
+    """Queue/buffer/metrics files without a session, and stale temp files.
+
+    A session missing from the index is looked up in its own file (or row)
+    before its files count as orphans: the index can lag behind the files.
+    """
+    paths = get_clrun_paths(project_root)
+    found: List[str] = []
+    exists: Dict[str, bool] = {}
+    for directory in (paths.sessions_dir, paths.queues_dir, paths.buffers_dir, paths.metrics_dir):
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            continue
+        for name in names:
+            path = os.path.join(directory, name)
+            tid = name.split(".", 1)[0]
+            stale_tmp = ".tmp." in name
+            if not stale_tmp and tid in index:
+                continue
+            if directory == paths.metrics_dir and (tid in metrics.PROJECT_SCOPES or name == metrics.LOCK_FILE):
+                continue
+            if directory == paths.sessions_dir and not stale_tmp and name.endswith(".json"):
+                continue  # a session file not yet in the index
+            if not stale_tmp:
+                if tid not in exists:
+                    exists[tid] = _session_exists(tid, project_root)
+                if exists[tid]:
+                    continue
+            try:
+                if now - os.path.getmtime(path) > ORPHAN_GRACE_S:
+                    found.append(path)
+            except OSError:
+                continue
+    return found
+
+
+def _prune_ledger(project_root: str, max_bytes: Optional[int], dry_run: bool) -> Tuple[int, int]:
+    """Delete the oldest rotated ledger segments until the ledger fits in `max_bytes`."""
+    if max_bytes is None:
+        return 0, 0
+    db = store.sqlite(project_root)
+    if db:
+        if dry_run:
+            return 0, 0
+        freed = db.prune_events(max_bytes, project_root)
+        return 0, freed
+    files = ledger_writer.segments(project_root)
+    total = sum(_size(p) for p in files)
+    removed = reclaimed = 0
+    # events.log (last) is being written and is rotated by the writers themselves.
+    for path in files[:-1] if files and files[-1].endswith("events.log") else files:
+        if total <= max_bytes:
+            break
+        size = _size(path)
+        if not dry_run:
+            _remove(path)
+        total -= size
+        removed += 1
+        reclaimed += size
+    if removed and not dry_run:
+        ledger_query.prune_indexes(project_root)
+    return removed, reclaimed
+
+
+def collect(project_root: str, policy: RetentionPolicy, dry_run: bool = False) -> Dict[str, Any]:
+    """Apply `policy` to a project; returns a report of what was (or would be) removed."""
+    from clrun.runtime.crash_recovery import recover_sessions
+
+    now = time.time()
+    recover_sessions(project_root)
+    index = dict(session_index.load_index(project_root))
+
+    doomed, sizes = _select(index, policy, project_root, now)
+    db = store.sqlite(project_root)
+    session_bytes = 0
+    for tid in doomed:
+        if dry_run:
+            session_bytes += sizes[tid]
+            continue
+        for path in _session_files(tid, project_root):
+            session_bytes += _remove(path)
+    if not dry_run:
+        if db:
+            db.delete_sessions(doomed, project_root)
+        else:
+            session_index.remove(doomed, project_root)
+    removed = set(doomed)
+    kept = {tid: s for tid, s in index.items() if tid not in removed}
+
+    trimmed, queue_bytes = (0, 0)
+    if policy.queue_history is not None:
+        if db:
+            stopped = [tid for tid, s in kept.items() if s.get("status") not in ("running", "suspended")]
+            if not dry_run:
+                trimmed = db.trim_queue_history(stopped, policy.queue_history, project_root)
+        else:
+            trimmed, queue_bytes = _trim_queues(kept, policy.queue_history, project_root, dry_run)
+
+    orphans = _orphans(index, project_root, now)
+    orphan_bytes = sum(_size(p) for p in orphans) if dry_run else sum(_remove(p) for p in orphans)
+
+    segments_removed, ledger_bytes = _prune_ledger(project_root, policy.ledger_max_bytes, dry_run)
+
+    report: Dict[str, Any] = {
+        "removed_sessions": len(doomed),
+        "trimmed_queue_entries": trimmed,
+        "removed_orphan_files": len(orphans),
+        "removed_ledger_segments": segments_removed,
+        "bytes_reclaimed": session_bytes + queue_bytes + orphan_bytes + ledger_bytes,
+        "remaining_sessions": len(kept),
+    }
+    if not dry_run:
+        data = dict(report)
+        data["terminal_ids"] = doomed[:LOGGED_IDS]
+        log_event("gc.completed", project_root, None, data)
+    report["removed_terminal_ids"] = doomed
+    return report
+
+
+def maybe_schedule(project_root: str) -> bool:
+    """Start a detached collection if gc.auto is on and the interval has passed."""
+    gc = load_config(project_root)["gc"]
+    if not parse_bool(gc.get("auto")):
+        return False
+    try:
+        interval = parse_duration(gc.get("auto_interval")) or 0.0
+    except ValueError:
+        return False
+    stamp = os.path.join(get_clrun_paths(project_root).root, STAMP_FILE)
+    try:
+        if time.time() - os.path.getmtime(stamp) < interval:
+            return False
+    except OSError:
+        pass
+    # Touch first so concurrent invocations don't all start a collection.
+    with open(stamp, "a", encoding="utf-8"):
+        pass
+    os.utime(stamp, None)
+
+    import subprocess
+    from clrun.utils.context import get_env
+
+    subprocess.Popen(
+        [sys.executable, "-m", "clrun.runtime.retention", project_root],
+        start_new_session=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        stdin=subprocess.DEVNULL,
+        env=get_env(),
+    )
+    return True
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Usage: python -m clrun.runtime.retention <project_root> [--dry-run]"""
+    args = sys.argv[1:] if argv is None else argv
+    if not args:
+        print("usage: python -m clrun.runtime.retention <project_root> [--dry-run]", file=sys.stderr)
+        sys.exit(2)
+    root = os.path.abspath(args[0])
+    report = collect(root, RetentionPolicy.from_config(root), dry_run="--dry-run" in args)
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
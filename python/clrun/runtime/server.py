@@ -0,0 +1,275 @@
+"""
+clrun runtime server — opt-in long-lived process serving CLI commands for one project.
+
+Listens on `.clrun/runtime.sock` and, optionally, on 127.0.0.1:<port>. Each
+request runs the regular command handlers in-process with the client's cwd,
+environment and output streams installed (see clrun.utils.context), so a CLI
+call becomes one RPC instead of interpreter startup plus full filesystem
+scans. Session files, queue files and buffer line counts are cached in memory
+and revalidated by stat (see clrun.utils.cache).
+
+Protocol: one JSON request line in, one JSON response line out.
+
+    {"argv": [...], "cwd": "...", "env": {...}}   -> {"stdout", "stderr", "exit_code"}
+    {"op": "ping"}                                -> {"ok", "pid", "requests", ...}
+    {"op": "shutdown"}                            -> {"ok"}
+
+TCP requests must carry the `token` stored in runtime.json.
+
+With --metrics-port, the server also answers `GET /metrics` over HTTP on
+127.0.0.1:<metrics-port> with OpenMetrics text (see clrun.runtime.exporter).
+
+Usage: python -m clrun.runtime.server <projectRoot> [--port N] [--metrics-port N]
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import secrets
+import signal
+import socketserver
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from clrun.types import RuntimeState
+from clrun.utils import cache
+from clrun.utils.context import request_context
+from clrun.utils.paths import get_clrun_paths, ensure_clrun_dirs
+from clrun.runtime import metrics
+from clrun.runtime.lock_manager import PACKAGE_VERSION, write_runtime_state, release_lock
+from clrun.ledger.ledger import log_event
+
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+
+def _exit_code(code: Any) -> int:
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    return 1
+
+
+def execute(argv: List[str], cwd: Optional[str], env: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    """Run one CLI invocation in-process and capture its output."""
+    import click
+    from clrun.cli import dispatch
+
+    out, err = io.StringIO(), io.StringIO()
+    exit_code = 0
+    with request_context(cwd=cwd, env=env, stdout=out, stderr=err):
+        try:
+            dispatch(argv, standalone=False)
+        except SystemExit as e:
+            exit_code = _exit_code(e.code)
+            if isinstance(e.code, str):
+                err.write(e.code + "\n")
+        except click.exceptions.Exit as e:
+            exit_code = e.exit_code
+        except click.ClickException as e:
+            e.show(file=err)
+            exit_code = e.exit_code
+        except click.Abort:
+            err.write("Aborted!\n")
+            exit_code = 1
+        except Exception:
+            err.write(traceback.format_exc())
+            exit_code = 1
+    return {"stdout": out.getvalue(), "stderr": err.getvalue(), "exit_code": exit_code}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "_UnixServer"
+
+    def handle(self) -> None:
+        line = self.rfile.readline(MAX_REQUEST_BYTES)
+        try:
+            req = json.loads(line)
+        except ValueError:
+            return
+
+        runtime: RuntimeServer = self.server.runtime
+        if self.server.requires_token and req.get("token") != runtime.token:
+            self._reply({"error": "invalid token", "exit_code": 1})
+            return
+
+        op = req.get("op", "exec")
+        if op == "ping":
+            self._reply(runtime.info())
+        elif op == "shutdown":
+            self._reply({"ok": True})
+            runtime.stop()
+        elif op == "exec":
+            from clrun.cli import streams_output
+            argv = req.get("argv", [])
+            if streams_output(argv):
+                self._reply({"error": "streaming commands run locally, not on the runtime server", "exit_code": 2})
+                return
+            runtime.requests += 1
+            self._reply(execute(argv, req.get("cwd"), req.get("env")))
+        else:
+            self._reply({"error": f"unknown op: {op}", "exit_code": 1})
+
+    def _reply(self, data: Dict[str, Any]) -> None:
+        self.wfile.write((json.dumps(data) + "\n").encode("utf-8"))
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    requires_token = False
+    runtime: "RuntimeServer"
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    requires_token = True
+    runtime: "RuntimeServer"
+
+
+class RuntimeServer:
+    """Owns the listening sockets and the runtime lock for one project."""
+
+    def __init__(self, project_root: str, port: Optional[int] = None, metrics_port: Optional[int] = None) -> None:
+        self.project_root = project_root
+        self.port = port
+        self.metrics_port = metrics_port
+        self.token = secrets.token_hex(16) if port is not None else None
+        self.requests = 0
+        self.started_at = ""
+        self._started = time.monotonic()
+        self._servers: List[socketserver.BaseServer] = []
+        self._stopped = threading.Event()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "ok": True,
+            "pid": os.getpid(),
+            "version": PACKAGE_VERSION,
+            "project_root": self.project_root,
+            "started_at": self.started_at,
+            "uptime_s": round(time.monotonic() - self._started, 3),
+            "requests": self.requests,
+            "port": self.port,
+            "metrics_port": self.metrics_port,
+        }
+
+    def start(self) -> None:
+        ensure_clrun_dirs(self.project_root)
+        paths = get_clrun_paths(self.project_root)
+        cache.enable()
+        metrics.batch_commands()
+
+        if os.path.exists(paths.runtime_sock):
+            os.unlink(paths.runtime_sock)
+        unix = _UnixServer(paths.runtime_sock, _Handler)
+        os.chmod(paths.runtime_sock, 0o600)
+        unix.runtime = self
+        self._servers.append(unix)
+
+        if self.port is not None:
+            tcp = _TCPServer(("127.0.0.1", self.port), _Handler)
+            tcp.runtime = self
+            self.port = tcp.server_address[1]
+            self._servers.append(tcp)
+
+        for srv in self._servers:
+            threading.Thread(target=srv.serve_forever, daemon=True).start()
+
+        if self.metrics_port is not None:
+            from clrun.runtime.exporter import serve_http
+            http, self.metrics_port = serve_http(self.project_root, self.metrics_port)
+            self._servers.append(http)
+
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        write_runtime_state(RuntimeState(
+            pid=os.getpid(),
+            started_at=self.started_at,
+            version=PACKAGE_VERSION,
+            project_root=self.project_root,
+            port=self.port,
+            socket=paths.runtime_sock,
+            token=self.token,
+        ), self.project_root)
+        log_event("runtime.started", self.project_root, None, {
+            "pid": os.getpid(),
+            "port": self.port,
+            "metrics_port": self.metrics_port,
+        })
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def wait(self) -> None:
+        flushed = time.monotonic()
+        while not self._stopped.wait(0.5):
+            if time.monotonic() - flushed >= metrics.COMMAND_FLUSH_S:
+                metrics.flush_commands()
+                flushed = time.monotonic()
+
+    def close(self) -> None:
+        for srv in self._servers:
+            srv.shutdown()
+            srv.server_close()
+        paths = get_clrun_paths(self.project_root)
+        try:
+            os.unlink(paths.runtime_sock)
+        except OSError:
+            pass
+        metrics.flush_commands()
+        release_lock(self.project_root, os.getpid())
+        log_event("runtime.stopped", self.project_root, None, {
+            "pid": os.getpid(),
+            "requests": self.requests,
+        })
+
+
+def serve(project_root: str, port: Optional[int] = None, metrics_port: Optional[int] = None) -> None:
+    """Run the server in the current process until SIGTERM/SIGINT or a shutdown request."""
+    runtime = RuntimeServer(project_root, port, metrics_port)
+
+    def stop_handler(signum: int, frame: object) -> None:
+        runtime.stop()
+
+    def reap_children(signum: int, frame: object) -> None:
+        # Workers are spawned from here; reap them so they don't linger as
+        # zombies that still answer os.kill(pid, 0).
+        try:
+            while os.waitpid(-1, os.WNOHANG)[0] > 0:
+                pass
+        except ChildProcessError:
+            pass
+
+    signal.signal(signal.SIGTERM, stop_handler)
+    signal.signal(signal.SIGINT, stop_handler)
+    signal.signal(signal.SIGCHLD, reap_children)
+
+    runtime.start()
+    try:
+        runtime.wait()
+    finally:
+        runtime.close()
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    if not args:
+        sys.stderr.write("server: missing project root\n")
+        sys.exit(1)
+    port: Optional[int] = None
+    metrics_port: Optional[int] = None
+    if "--port" in args:
+        port = int(args[args.index("--port") + 1])
+    if "--metrics-port" in args:
+        metrics_port = int(args[args.index("--metrics-port") + 1])
+    serve(args[0], port, metrics_port)
+
+
+if __name__ == "__main__":
+    main()
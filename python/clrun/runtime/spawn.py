@@ -0,0 +1,103 @@
+"""Worker launch and initial-output wait, shared by the CLI commands and clrun.api."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from clrun.runtime import forkserver
+from clrun.utils import trace
+from clrun.utils.config import load_config
+from clrun.utils.context import get_env
+from clrun.pty.pty_manager import read_session
+from clrun.buffer.buffer_manager import get_buffer_size
+
+WORKER_MODULE = "clrun.worker"
+
+
+def launch_worker(argv: List[str], project_root: str) -> int:
+    """Start a detached worker (`python -m clrun.worker <argv>`); returns its PID.
+
+    With `worker.launcher` set to "forkserver", the project's fork server
+    forks it (clrun.runtime.forkserver); if none is running, one is started
+    for later launches and this one is spawned as usual.
+    """
+    launcher = str(load_config(project_root).get("worker", {}).get("launcher", "popen")).lower()
+    if launcher == "forkserver":
+        with trace.span("fork worker"):
+            pid = forkserver.launch(project_root, argv, get_env())
+        if pid is not None:
+            return pid
+        forkserver.start(project_root)
+    child = subprocess.Popen(
+        [sys.executable, "-m", WORKER_MODULE] + argv,
+        start_new_session=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        stdin=subprocess.DEVNULL,
+        env=get_env(),
+    )
+    return child.pid
+
+
+def spawn_worker(
+    terminal_id: str, command: str, cwd: str, project_root: str, restore: bool = False
+) -> int:
+    """Launch a detached worker for a session; returns its PID."""
+    argv = [terminal_id, command, cwd, project_root]
+    if restore:
+        argv.append("--restore")
+    with trace.span("spawn worker", terminal_id=terminal_id, restore=restore):
+        trace.flow("worker", terminal_id, start=True)
+        return launch_worker(argv, project_root)
+
+
+def wait_for_initial_output(
+    terminal_id: str,
+    buffer_start: int,
+    project_root: str,
+    max_wait: float = 5.0,
+    poll: float = 0.15,
+    settle: float = 0.3,
+) -> Tuple[str, Optional[int]]:
+    """Poll until a new session produces output or exits.
+
+    Returns (status, exit_code) as last seen in the session metadata.
+    """
+    elapsed = 0.0
+    session_status = "running"
+    exit_code = None
+
+    with trace.span("wait for initial output", terminal_id=terminal_id) as span:
+        while elapsed < max_wait:
+            with trace.span("poll sleep", terminal_id=terminal_id):
+                time.sleep(poll)
+            elapsed += poll
+
+            current_size = get_buffer_size(terminal_id, project_root)
+            has_new_output = current_size > buffer_start
+
+            sess = read_session(terminal_id, project_root)
+            if sess:
+                session_status = sess.status
+                exit_code = sess.last_exit_code
+            trace.instant("poll", terminal_id=terminal_id, buffer_bytes=current_size - buffer_start,
+                          status=session_status)
+
+            if sess and sess.status == "exited":
+                break
+
+            if has_new_output:
+                with trace.span("settle", terminal_id=terminal_id):
+                    time.sleep(settle)
+                updated = read_session(terminal_id, project_root)
+                if updated:
+                    session_status = updated.status
+                    exit_code = updated.last_exit_code
+                break
+        if span is not None:
+            span.args.update(polls=round(elapsed / poll), status=session_status)
+
+    return session_status, exit_code
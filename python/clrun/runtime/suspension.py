@@ -0,0 +1,181 @@
+"""Suspension policy: which running sessions to suspend, and when.
+
+Suspending a session captures its shell's cwd and environment and ends the
+worker; the next input restores it transparently (clrun.runtime.restore).
+Settings come from the `suspend` section of the project config:
+
+  * idle_timeout: a session idle this long suspends itself. A session can
+    override it (`idle_timeout`, 0 = never) or be `pinned`, which exempts
+    it from every rule (`clrun policy <id> --pin --idle-timeout 1h`).
+  * max_live: at most this many live sessions; beyond it, the least
+    recently used are suspended first.
+  * min_available_memory: while MemAvailable (/proc/meminfo) is below this
+    size or share of MemTotal, the least recently used session is
+    suspended, one per check.
+
+The cap and memory rules only consider sessions that have been idle for
+`min_idle` and have no queued input. They need a view of every session,
+so workers take turns evaluating them: every `check_interval`, whichever
+worker first touches `.clrun/suspend.stamp` sweeps the heartbeat table
+(live sessions and their last activity) and sends SIGUSR2 to the workers
+of the sessions it picks. A worker receiving SIGUSR2 suspends itself as
+it does at its idle timeout.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+from clrun.ledger.ledger import log_event
+from clrun.pty.pty_manager import read_session
+from clrun.runtime import heartbeat
+from clrun.types import SessionMetadata
+from clrun.utils.config import load_config, parse_int, parse_size
+from clrun.utils.paths import get_clrun_paths
+from clrun.utils.timespec import parse_duration
+
+STAMP_FILE = "suspend.stamp"
+SUSPEND_SIGNAL = signal.SIGUSR2
+
+
+@dataclass
+class SuspendPolicy:
+    idle_timeout_s: Optional[float] = 300.0
+    max_live: Optional[int] = None
+    min_available_bytes: Optional[int] = None
+    min_available_percent: Optional[float] = None
+    min_idle_s: float = 30.0
+    check_interval_s: float = 5.0
+
+    @classmethod
+    def from_config(cls, project_root: str) -> "SuspendPolicy":
+        """Policy from the project's suspend settings (malformed values fall back to the defaults)."""
+        settings = load_config(project_root).get("suspend", {})
+        policy = cls()
+
+        def setting(key: str, parse: Callable[[Any], Any], default: Any, off: Any) -> Any:
+            """`default` for a malformed value, `off` for an explicit none/off/0."""
+            try:
+                value = parse(settings.get(key))
+            except ValueError:
+                return default
+            return off if value is None else value
+
+        policy.idle_timeout_s = setting("idle_timeout", parse_duration, policy.idle_timeout_s, None)
+        policy.max_live = setting("max_live", parse_int, policy.max_live, None)
+        policy.min_idle_s = setting("min_idle", parse_duration, policy.min_idle_s, 0.0)
+        policy.check_interval_s = setting("check_interval", parse_duration,
+                                          policy.check_interval_s, policy.check_interval_s)
+        memory = str(settings.get("min_available_memory") or "").strip()
+        try:
+            if memory.endswith("%"):
+                policy.min_available_percent = float(memory[:-1]) or None
+            else:
+                policy.min_available_bytes = parse_size(memory)
+        except ValueError:
+            pass
+        return policy
+
+    @property
+    def sweeps(self) -> bool:
+        """Whether any rule needs the cross-session sweep."""
+        return bool(self.max_live or self.min_available_bytes or self.min_available_percent)
+
+    def idle_timeout_for(self, session: Optional[SessionMetadata]) -> Optional[float]:
+        """Seconds of idleness after which `session` suspends itself; None for never."""
+        if session is None:
+            return self.idle_timeout_s
+        if session.pinned:
+            return None
+        if session.idle_timeout is not None:
+            return session.idle_timeout or None
+        return self.idle_timeout_s
+
+    def memory_floor(self, total: int) -> Optional[int]:
+        if self.min_available_percent:
+            return int(total * self.min_available_percent / 100)
+        return self.min_available_bytes
+
+
+def read_meminfo() -> Optional[Tuple[int, int]]:
+    """(MemAvailable, MemTotal) in bytes, or None without /proc/meminfo."""
+    found = {}
+    try:
+        with open("/proc/meminfo", "rb") as f:
+            for line in f:
+                key, _, rest = line.partition(b":")
+                if key in (b"MemAvailable", b"MemTotal"):
+                    found[key] = int(rest.split()[0]) * 1024
+                    if len(found) == 2:
+                        return found[b"MemAvailable"], found[b"MemTotal"]
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def select_victims(
+    project_root: str, policy: SuspendPolicy, now: Optional[float] = None
+) -> List[Tuple[heartbeat.Heartbeat, str]]:
+    """Sessions the cap and memory rules would suspend now, with the rule ("max_live" or "memory")."""
+    now = time.time() if now is None else now
+    live = [hb for hb in heartbeat.read_heartbeats(project_root).values() if heartbeat.worker_alive(hb)]
+    over = len(live) - policy.max_live if policy.max_live else 0
+    low_memory = False
+    if policy.min_available_bytes or policy.min_available_percent:
+        meminfo = read_meminfo()
+        if meminfo:
+            floor = policy.memory_floor(meminfo[1])
+            low_memory = floor is not None and meminfo[0] < floor
+    if over <= 0 and not low_memory:
+        return []
+
+    victims: List[Tuple[heartbeat.Heartbeat, str]] = []
+    wanted = max(over, 1 if low_memory else 0)
+    # Least recently used first; only metadata of sessions that could go is read.
+    for hb in sorted(live, key=lambda b: (b.activity, b.terminal_id)):
+        if len(victims) >= wanted:
+            break
+        if hb.queue_depth or now - hb.activity < policy.min_idle_s:
+            continue
+        session = read_session(hb.terminal_id, project_root)
+        if session is None or session.pinned or session.status != "running":
+            continue
+        victims.append((hb, "max_live" if len(victims) < over else "memory"))
+    return victims
+
+
+def sweep(project_root: str, policy: SuspendPolicy) -> List[str]:
+    """Signal the workers of the sessions `select_victims` picks; returns their terminal IDs."""
+    signalled: List[str] = []
+    for hb, rule in select_victims(project_root, policy):
+        try:
+            os.kill(hb.worker_pid, SUSPEND_SIGNAL)
+        except OSError:
+            continue
+        signalled.append(hb.terminal_id)
+        log_event("session.suspend_requested", project_root, hb.terminal_id, {
+            "rule": rule,
+            "idle_s": round(time.time() - hb.activity, 1),
+        })
+    return signalled
+
+
+def maybe_sweep(project_root: str, policy: SuspendPolicy) -> List[str]:
+    """Sweep if a cap or memory rule is set and no one has swept within check_interval."""
+    if not policy.sweeps:
+        return []
+    stamp = os.path.join(get_clrun_paths(project_root).root, STAMP_FILE)
+    try:
+        if time.time() - os.path.getmtime(stamp) < policy.check_interval_s:
+            return []
+    except OSError:
+        pass
+    # Touch first so the other workers skip this round.
+    with open(stamp, "a", encoding="utf-8"):
+        pass
+    os.utime(stamp, None)
+    return sweep(project_root, policy)
@@ -274,7 +274,9 @@ clrun kill <id>                  # Stop when done
 
 ## Suspended Sessions (Auto-Restore)
 
-Sessions automatically suspend after **5 minutes of inactivity**:
+Sessions automatically suspend after **5 minutes of inactivity** (configurable), and
+the least recently used idle sessions may suspend early when the project caps live
+sessions or the host runs low on memory:
 - Environment variables and working directory are captured
 - Buffer logs are preserved (`clrun tail` still works)
 - **Sending any input auto-restores the session transparently**
@@ -284,6 +286,9 @@ Sessions automatically suspend after **5 minutes of inactivity**:
 # Session suspended after idle timeout
 clrun tail <id>                  # Still works — reads preserved buffer
 clrun <id> echo $MY_VAR          # Auto-restores, runs command, returns output
+
+# Keep a session (e.g. a dev server) from ever being suspended
+clrun policy <id> --pin
 ```
 
 ## Queue System
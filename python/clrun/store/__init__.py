@@ -0,0 +1,75 @@
+"""State backend selection: per-file JSON (default) or a single SQLite database.
+
+The session, queue and ledger modules keep their function signatures and
+ask `sqlite(project_root)` whether to delegate to clrun.store.sqlite_store:
+
+    db = store.sqlite(project_root)
+    if db:
+        return db.read_session(terminal_id, project_root)
+
+The backend is the `state.backend` setting (`.clrun/config.json` or
+CLRUN_STATE_BACKEND). It is cached per project against the config file's
+mtime, so the check costs one stat.
+"""
+
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Dict, Iterator, Optional, Tuple
+
+from clrun.utils.context import get_env
+
+BACKENDS = ("files", "sqlite")
+ENV_VAR = "CLRUN_STATE_BACKEND"
+
+_forced: Dict[str, str] = {}
+_cached: Dict[str, Tuple[Optional[int], str]] = {}
+
+
+def backend(project_root: str) -> str:
+    """Name of the state backend in use for a project."""
+    forced = _forced.get(project_root)
+    if forced:
+        return forced
+    env = (get_env() or os.environ).get(ENV_VAR)
+    if env:
+        return env if env in BACKENDS else "files"
+
+    from clrun.utils.config import config_path, get_setting
+
+    try:
+        mtime: Optional[int] = os.stat(config_path(project_root)).st_mtime_ns
+    except OSError:
+        mtime = None
+    hit = _cached.get(project_root)
+    if hit and hit[0] == mtime:
+        return hit[1]
+    name = get_setting(project_root, "state", "backend", "files") if mtime is not None else "files"
+    if name not in BACKENDS:
+        name = "files"
+    _cached[project_root] = (mtime, name)
+    return name
+
+
+def sqlite(project_root: str) -> Optional[ModuleType]:
+    """clrun.store.sqlite_store when the project uses the SQLite backend, else None."""
+    if backend(project_root) != "sqlite":
+        return None
+    from clrun.store import sqlite_store
+    return sqlite_store
+
+
+@contextmanager
+def forced_backend(project_root: str, name: str) -> Iterator[None]:
+    """Use backend `name` for a project in this process (used by migration)."""
+    previous = _forced.get(project_root)
+    _forced[project_root] = name
+    try:
+        yield
+    finally:
+        if previous is None:
+            _forced.pop(project_root, None)
+        else:
+            _forced[project_root] = previous
@@ -0,0 +1,159 @@
+"""Move project state between the JSON-file and SQLite backends.
+
+The source state is copied to the target backend, and the project config
+is switched. The source files (or database) then go to
+`.clrun/backup-<timestamp>/` rather than being deleted. Buffers are
+shared by both backends and stay where they are.
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import os
+import shutil
+import time
+from typing import Any, Dict, List
+
+from clrun import store
+from clrun.ledger import writer as ledger_writer
+from clrun.utils.config import set_setting
+from clrun.utils.paths import get_clrun_paths
+
+
+def _read_file_events(project_root: str) -> List[Dict[str, Any]]:
+    """Every ledger segment, oldest first."""
+    events: List[Dict[str, Any]] = []
+    for path in ledger_writer.segments(project_root):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        try:
+                            events.append(json.loads(line))
+                        except ValueError:
+                            continue
+        except OSError:
+            continue
+    return events
+
+
+def _backup_dir(project_root: str) -> str:
+    path = os.path.join(get_clrun_paths(project_root).root, time.strftime("backup-%Y%m%d-%H%M%S"))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _move(paths: List[str], project_root: str, backup: str) -> int:
+    root = get_clrun_paths(project_root).root
+    moved = 0
+    for path in paths:
+        target = os.path.join(backup, os.path.relpath(path, root))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            shutil.move(path, target)
+            moved += 1
+        except OSError:
+            continue
+    return moved
+
+
+def to_sqlite(project_root: str) -> Dict[str, Any]:
+    from clrun.pty.pty_manager import list_sessions
+    from clrun.queue.queue_engine import read_queue
+    from clrun.store import sqlite_store
+
+    paths = get_clrun_paths(project_root)
+    with store.forced_backend(project_root, "files"):
+        sessions = list_sessions(project_root)
+        queues = [read_queue(s.terminal_id, project_root) for s in sessions]
+    events = _read_file_events(project_root)
+
+    backup = _backup_dir(project_root)
+    existing = sqlite_store.db_path(project_root)
+    if os.path.exists(existing):
+        sqlite_store.close(project_root)
+        _move(glob.glob(existing + "*"), project_root, backup)
+
+    with store.forced_backend(project_root, "sqlite"):
+        sqlite_store.write_sessions(sessions, project_root)
+        sqlite_store.write_queues(queues, project_root)
+        sqlite_store.log_events(events, project_root)
+
+    old_files = (
+        glob.glob(os.path.join(paths.sessions_dir, "*.json"))
+        + glob.glob(os.path.join(paths.queues_dir, "*.json"))
+        + glob.glob(paths.session_index + "*")
+        + glob.glob(os.path.join(paths.ledger_dir, "events*.log"))
+    )
+    moved = _move(old_files, project_root, backup)
+    set_setting(project_root, "state", "backend", "sqlite")
+    return {"sessions": len(sessions), "queue_entries": sum(len(q.entries) for q in queues),
+            "events": len(events), "backed_up_files": moved, "backup": backup}
+
+
+def to_files(project_root: str) -> Dict[str, Any]:
+    from clrun.pty import session_index
+    from clrun.pty.pty_manager import write_session
+    from clrun.queue.queue_engine import write_queue
+    from clrun.store import sqlite_store
+
+    paths = get_clrun_paths(project_root)
+    with store.forced_backend(project_root, "sqlite"):
+        sessions = sqlite_store.list_sessions(project_root)
+        queues = [sqlite_store.read_queue(s.terminal_id, project_root) for s in sessions]
+        events = sqlite_store.read_events(project_root)
+    sqlite_store.close(project_root)
+
+    backup = _backup_dir(project_root)
+    with store.forced_backend(project_root, "files"):
+        os.makedirs(paths.ledger_dir, exist_ok=True)
+        # Existing file state would be shadowed by the migrated copy; keep it aside.
+        _move(glob.glob(os.path.join(paths.ledger_dir, "events*.log")) + glob.glob(paths.session_index + "*"),
+              project_root, backup)
+        for session in sessions:
+            write_session(session, project_root)
+        for queue in queues:
+            write_queue(queue.terminal_id, queue, project_root)
+        with open(paths.events_log, "w", encoding="utf-8") as f:
+            for entry in events:
+                f.write(json.dumps(entry) + "\n")
+        session_index.rebuild_index(project_root)
+
+    moved = _move(glob.glob(sqlite_store.db_path(project_root) + "*"), project_root, backup)
+    set_setting(project_root, "state", "backend", "files")
+    return {"sessions": len(sessions), "queue_entries": sum(len(q.entries) for q in queues),
+            "events": len(events), "backed_up_files": moved, "backup": backup}
+
+
+def running_sessions(project_root: str) -> List[str]:
+    """Sessions with a live worker; migrating under them would lose their writes."""
+    from clrun.pty import session_index
+
+    return [
+        tid for tid, rec in session_index.load_index(project_root).items()
+        if rec.get("status") == "running"
+    ]
+
+
+def migrate(project_root: str, target: str, force: bool = False) -> Dict[str, Any]:
+    """Copy state to `target` ("files" or "sqlite") and switch the project to it.
+
+    Raises ValueError for an unknown target, one already in use, or (unless
+    `force`) while sessions are running.
+    """
+    from clrun.ledger.ledger import log_event
+
+    if target not in store.BACKENDS:
+        raise ValueError(f"Unknown backend: {target}")
+    current = store.backend(project_root)
+    if target == current:
+        raise ValueError(f"Project already uses the {target} backend")
+    running = running_sessions(project_root)
+    if running and not force:
+        raise ValueError(f"{len(running)} session(s) still running: {', '.join(running[:5])}")
+    ledger_writer.flush(project_root)
+    report = to_sqlite(project_root) if target == "sqlite" else to_files(project_root)
+    report.update({"from": current, "to": target})
+    log_event("state.migrated", project_root, None, {k: v for k, v in report.items() if k != "backup"})
+    return report
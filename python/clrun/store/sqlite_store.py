@@ -0,0 +1,508 @@
+"""SQLite (WAL) implementation of session, queue and ledger storage.
+
+Everything lives in `.clrun/state.db`. Each process/thread keeps one
+connection per database in autocommit mode; multi-statement updates
+(override, read-modify-write of a session) run in BEGIN IMMEDIATE
+transactions, so concurrent CLI calls and workers serialize on SQLite's
+write lock instead of racing on temp files. Output buffers stay files.
+
+Sessions keep their full metadata as JSON plus the indexed summary
+columns that status, recovery and retention read.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from clrun.types import QueueEntry, QueueFile, SessionMetadata
+from clrun.utils.paths import get_clrun_paths
+
+DB_FILE = "state.db"
+BUSY_TIMEOUT_S = 10.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    terminal_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    command TEXT NOT NULL,
+    pid INTEGER,
+    worker_pid INTEGER,
+    created_at TEXT NOT NULL,
+    last_activity_at TEXT,
+    last_exit_code INTEGER,
+    suspended_at TEXT,
+    saved_cwd TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_status ON sessions (status, created_at);
+CREATE INDEX IF NOT EXISTS sessions_activity ON sessions (last_activity_at);
+CREATE INDEX IF NOT EXISTS sessions_created ON sessions (created_at);
+
+CREATE TABLE IF NOT EXISTS queue (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    queue_id TEXT NOT NULL UNIQUE,
+    terminal_id TEXT NOT NULL,
+    input TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    sent_at TEXT
+);
+CREATE INDEX IF NOT EXISTS queue_pending ON queue (terminal_id, status, priority DESC, created_at);
+-- Pending counts for status without walking the sent history.
+CREATE INDEX IF NOT EXISTS queue_queued ON queue (terminal_id) WHERE status = 'queued';
+
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    event TEXT NOT NULL,
+    terminal_id TEXT,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS events_terminal ON events (terminal_id, id);
+CREATE INDEX IF NOT EXISTS events_time ON events (timestamp);
+CREATE INDEX IF NOT EXISTS events_type ON events (event, id);
+"""
+
+_local = threading.local()
+
+
+def db_path(project_root: str) -> str:
+    return os.path.join(get_clrun_paths(project_root).root, DB_FILE)
+
+
+def connect(project_root: str) -> sqlite3.Connection:
+    """This thread's connection to the project database (created on first use)."""
+    path = db_path(project_root)
+    conns: Dict[str, Tuple[int, int, sqlite3.Connection]] = _local.__dict__.setdefault("conns", {})
+    hit = conns.get(path)
+    try:
+        inode = os.stat(path).st_ino
+    except OSError:
+        inode = 0
+    # Workers and the runtime server outlive `clrun migrate`, which moves the
+    # database aside; reopen when the file is no longer the one we hold.
+    if hit and hit[0] == os.getpid() and hit[1] == inode:
+        return hit[2]
+    if hit and hit[0] == os.getpid():
+        hit[2].close()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_S, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    conns[path] = (os.getpid(), os.stat(path).st_ino, conn)
+    return conn
+
+
+def close(project_root: str) -> None:
+    conns = _local.__dict__.get("conns", {})
+    hit = conns.pop(db_path(project_root), None)
+    if hit and hit[0] == os.getpid():
+        hit[2].close()
+
+
+@contextmanager
+def transaction(project_root: str) -> Iterator[sqlite3.Connection]:
+    """BEGIN IMMEDIATE ... COMMIT (ROLLBACK on error)."""
+    conn = connect(project_root)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# ─── Sessions ────────────────────────────────────────────────────────────
+
+def _session_row(session: SessionMetadata) -> Tuple[Any, ...]:
+    saved = session.saved_state if session.status == "suspended" else None
+    return (
+        session.terminal_id,
+        session.status,
+        session.command,
+        session.pid,
+        session.worker_pid,
+        session.created_at,
+        session.last_activity_at,
+        session.last_exit_code,
+        saved.captured_at if saved else None,
+        saved.cwd if saved else None,
+        json.dumps(session.to_dict()),
+    )
+
+
+_UPSERT_SESSION = (
+    "INSERT OR REPLACE INTO sessions (terminal_id, status, command, pid, worker_pid, created_at,"
+    " last_activity_at, last_exit_code, suspended_at, saved_cwd, data) VALUES (?,?,?,?,?,?,?,?,?,?,?)"
+)
+
+
+def write_session(session: SessionMetadata, project_root: str) -> None:
+    connect(project_root).execute(_UPSERT_SESSION, _session_row(session))
+
+
+def write_sessions(sessions: Iterable[SessionMetadata], project_root: str) -> None:
+    with transaction(project_root) as conn:
+        conn.executemany(_UPSERT_SESSION, [_session_row(s) for s in sessions])
+
+
+def read_session(terminal_id: str, project_root: str) -> Optional[SessionMetadata]:
+    row = connect(project_root).execute(
+        "SELECT data FROM sessions WHERE terminal_id = ?", (terminal_id,)
+    ).fetchone()
+    if not row:
+        return None
+    try:
+        return SessionMetadata.from_dict(json.loads(row[0]))
+    except Exception:
+        return None
+
+
+def update_session(
+    terminal_id: str, updates: Dict[str, Any], project_root: str, sync: bool = False
+) -> Optional[SessionMetadata]:
+    """Atomic read-modify-write of one session; `sync` commits with synchronous=FULL."""
+    conn = connect(project_root)
+    if sync:
+        conn.execute("PRAGMA synchronous=FULL")
+    try:
+        with transaction(project_root) as conn:
+            row = conn.execute("SELECT data FROM sessions WHERE terminal_id = ?", (terminal_id,)).fetchone()
+            if not row:
+                return None
+            d = json.loads(row[0])
+            current = SessionMetadata.from_dict(d)
+            d.update(updates)
+            updated = SessionMetadata.from_dict(d)
+            if updated != current:
+                conn.execute(_UPSERT_SESSION, _session_row(updated))
+    finally:
+        if sync:
+            conn.execute("PRAGMA synchronous=NORMAL")
+    return updated
+
+
+def data_version(project_root: str) -> int:
+    """Changes whenever another connection commits (PRAGMA data_version)."""
+    return connect(project_root).execute("PRAGMA data_version").fetchone()[0]
+
+
+def list_sessions(project_root: str) -> List[SessionMetadata]:
+    sessions: List[SessionMetadata] = []
+    for (data,) in connect(project_root).execute("SELECT data FROM sessions ORDER BY created_at"):
+        try:
+            sessions.append(SessionMetadata.from_dict(json.loads(data)))
+        except Exception:
+            continue
+    return sessions
+
+
+def summaries(project_root: str) -> Dict[str, Dict[str, Any]]:
+    """Session index records (see clrun.pty.session_index), oldest first."""
+    conn = connect(project_root)
+    pending = dict(conn.execute(
+        "SELECT terminal_id, COUNT(*) FROM queue WHERE status = 'queued' GROUP BY terminal_id"
+    ).fetchall())
+    index: Dict[str, Dict[str, Any]] = {}
+    for row in conn.execute(
+        "SELECT terminal_id, command, status, pid, worker_pid, created_at, last_activity_at,"
+        " last_exit_code, suspended_at, saved_cwd FROM sessions ORDER BY created_at"
+    ):
+        index[row[0]] = {
+            "command": row[1],
+            "status": row[2],
+            "pid": row[3],
+            "worker_pid": row[4],
+            "queue_length": pending.get(row[0], 0),
+            "created_at": row[5],
+            "last_activity_at": row[6],
+            "last_exit_code": row[7],
+            "suspended_at": row[8],
+            "saved_cwd": row[9],
+        }
+    return index
+
+
+def delete_sessions(terminal_ids: Iterable[str], project_root: str) -> None:
+    ids = [(tid,) for tid in terminal_ids]
+    with transaction(project_root) as conn:
+        conn.executemany("DELETE FROM sessions WHERE terminal_id = ?", ids)
+        conn.executemany("DELETE FROM queue WHERE terminal_id = ?", ids)
+
+
+# ─── Queues ──────────────────────────────────────────────────────────────
+
+_QUEUE_COLUMNS = "queue_id, input, priority, mode, status, created_at, sent_at"
+
+
+def _entry(row: Tuple[Any, ...]) -> QueueEntry:
+    return QueueEntry(
+        queue_id=row[0], input=row[1], priority=row[2], mode=row[3],
+        status=row[4], created_at=row[5], sent_at=row[6],
+    )
+
+
+def _entry_row(terminal_id: str, e: QueueEntry) -> Tuple[Any, ...]:
+    return (e.queue_id, terminal_id, e.input, e.priority, e.mode, e.status, e.created_at, e.sent_at)
+
+
+_INSERT_ENTRY = (
+    "INSERT OR REPLACE INTO queue (queue_id, terminal_id, input, priority, mode, status, created_at, sent_at)"
+    " VALUES (?,?,?,?,?,?,?,?)"
+)
+
+
+def init_queue(terminal_id: str, project_root: str) -> None:
+    connect(project_root).execute("DELETE FROM queue WHERE terminal_id = ?", (terminal_id,))
+
+
+def read_queue(terminal_id: str, project_root: str) -> QueueFile:
+    rows = connect(project_root).execute(
+        f"SELECT {_QUEUE_COLUMNS} FROM queue WHERE terminal_id = ? ORDER BY seq", (terminal_id,)
+    ).fetchall()
+    return QueueFile(terminal_id=terminal_id, entries=[_entry(r) for r in rows])
+
+
+def write_queue(terminal_id: str, queue: QueueFile, project_root: str) -> None:
+    with transaction(project_root) as conn:
+        conn.execute("DELETE FROM queue WHERE terminal_id = ?", (terminal_id,))
+        conn.executemany(_INSERT_ENTRY, [_entry_row(terminal_id, e) for e in queue.entries])
+
+
+def write_queues(queues: Iterable[QueueFile], project_root: str) -> None:
+    with transaction(project_root) as conn:
+        for queue in queues:
+            conn.execute("DELETE FROM queue WHERE terminal_id = ?", (queue.terminal_id,))
+            conn.executemany(_INSERT_ENTRY, [_entry_row(queue.terminal_id, e) for e in queue.entries])
+
+
+def _new_entry(text: str, priority: int, mode: str) -> QueueEntry:
+    return QueueEntry(
+        queue_id=str(uuid.uuid4()), input=text, priority=priority, mode=mode,  # type: ignore[arg-type]
+        status="queued", created_at=_now(),
+    )
+
+
+def enqueue_input(terminal_id: str, text: str, priority: int, project_root: str) -> QueueEntry:
+    entry = _new_entry(text, priority, "normal")
+    connect(project_root).execute(_INSERT_ENTRY, _entry_row(terminal_id, entry))
+    return entry
+
+
+def enqueue_override(terminal_id: str, text: str, project_root: str) -> Tuple[QueueEntry, int]:
+    entry = _new_entry(text, 2**53, "override")
+    with transaction(project_root) as conn:
+        cancelled = conn.execute(
+            "UPDATE queue SET status = 'cancelled' WHERE terminal_id = ? AND status = 'queued'",
+            (terminal_id,),
+        ).rowcount
+        conn.execute(_INSERT_ENTRY, _entry_row(terminal_id, entry))
+    return entry, cancelled
+
+
+def get_next_queued(terminal_id: str, project_root: str) -> Optional[QueueEntry]:
+    row = connect(project_root).execute(
+        f"SELECT {_QUEUE_COLUMNS} FROM queue WHERE terminal_id = ? AND status = 'queued'"
+        " ORDER BY priority DESC, created_at, seq LIMIT 1",
+        (terminal_id,),
+    ).fetchone()
+    return _entry(row) if row else None
+
+
+def mark_sent(terminal_id: str, queue_id: str, project_root: str) -> None:
+    connect(project_root).execute(
+        "UPDATE queue SET status = 'sent', sent_at = ? WHERE terminal_id = ? AND queue_id = ?",
+        (_now(), terminal_id, queue_id),
+    )
+
+
+def pending_count(terminal_id: str, project_root: str) -> int:
+    return connect(project_root).execute(
+        "SELECT COUNT(*) FROM queue WHERE terminal_id = ? AND status = 'queued'", (terminal_id,)
+    ).fetchone()[0]
+
+
+def trim_queue_history(terminal_ids: Iterable[str], keep: int, project_root: str) -> int:
+    """Delete sent/cancelled entries beyond the newest `keep` per session; returns the count."""
+    removed = 0
+    with transaction(project_root) as conn:
+        for tid in terminal_ids:
+            removed += conn.execute(
+                "DELETE FROM queue WHERE terminal_id = ? AND status != 'queued' AND seq NOT IN"
+                " (SELECT seq FROM queue WHERE terminal_id = ? AND status != 'queued'"
+                "  ORDER BY seq DESC LIMIT ?)",
+                (tid, tid, keep),
+            ).rowcount
+    return removed
+
+
+# ─── Ledger ──────────────────────────────────────────────────────────────
+
+def log_event(entry: Dict[str, Any], project_root: str) -> None:
+    data = entry.get("data")
+    connect(project_root).execute(
+        "INSERT INTO events (timestamp, event, terminal_id, data) VALUES (?,?,?,?)",
+        (entry["timestamp"], entry["event"], entry.get("terminal_id"),
+         json.dumps(data) if data is not None else None),
+    )
+
+
+def log_events(entries: Iterable[Dict[str, Any]], project_root: str) -> None:
+    with transaction(project_root) as conn:
+        conn.executemany(
+            "INSERT INTO events (timestamp, event, terminal_id, data) VALUES (?,?,?,?)",
+            [
+                (e["timestamp"], e["event"], e.get("terminal_id"),
+                 json.dumps(e["data"]) if e.get("data") is not None else None)
+                for e in entries
+            ],
+        )
+
+
+def read_events(
+    project_root: str,
+    terminal_id: Optional[str] = None,
+    event: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Events in ledger order, filtered with the events_* indexes.
+
+    With `limit`, returns the most recent `limit` matching events.
+    """
+    clauses: List[str] = []
+    params: List[Any] = []
+    if terminal_id:
+        clauses.append("terminal_id = ?")
+        params.append(terminal_id)
+    if event:
+        clauses.append("event = ?")
+        params.append(event)
+    if since:
+        clauses.append("timestamp >= ?")
+        params.append(since)
+    where = " WHERE " + " AND ".join(clauses) if clauses else ""
+    columns = "id, timestamp, event, terminal_id, data"
+    if limit is not None:
+        sql = f"SELECT * FROM (SELECT {columns} FROM events{where} ORDER BY id DESC LIMIT ?) ORDER BY id"
+        params.append(limit)
+    else:
+        sql = f"SELECT {columns} FROM events{where} ORDER BY id"
+
+    events: List[Dict[str, Any]] = []
+    for _, ts, name, tid, data in connect(project_root).execute(sql, params):
+        entry: Dict[str, Any] = {"timestamp": ts, "event": name}
+        if tid:
+            entry["terminal_id"] = tid
+        if data is not None:
+            entry["data"] = json.loads(data)
+        events.append(entry)
+    return events
+
+
+def query_events(
+    project_root: str,
+    terminal_id: Optional[str] = None,
+    types: Optional[Iterable[str]] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    reverse: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """Streaming counterpart of read_events (see clrun.ledger.query.query_events)."""
+    clauses: List[str] = []
+    params: List[Any] = []
+    if terminal_id:
+        clauses.append("terminal_id = ?")
+        params.append(terminal_id)
+    names = list(types or ())
+    if names:
+        clauses.append(f"event IN ({','.join('?' * len(names))})")
+        params.extend(names)
+    if since:
+        clauses.append("timestamp >= ?")
+        params.append(since)
+    if until:
+        clauses.append("timestamp <= ?")
+        params.append(until)
+    where = " WHERE " + " AND ".join(clauses) if clauses else ""
+    sql = f"SELECT timestamp, event, terminal_id, data FROM events{where} ORDER BY id{' DESC' if reverse else ''}"
+    for ts, name, tid, data in connect(project_root).execute(sql, params):
+        entry: Dict[str, Any] = {"timestamp": ts, "event": name}
+        if tid:
+            entry["terminal_id"] = tid
+        if data is not None:
+            entry["data"] = json.loads(data)
+        yield entry
+
+
+def last_event_id(project_root: str, before: Optional[str] = None) -> int:
+    """The newest event's id; with `before`, the id just before the first event at/after that time."""
+    conn = connect(project_root)
+    if before is None:
+        return conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+    first = conn.execute("SELECT MIN(id) FROM events WHERE timestamp >= ?", (before,)).fetchone()[0]
+    return first - 1 if first is not None else last_event_id(project_root)
+
+
+def events_after(
+    project_root: str,
+    after_id: int,
+    terminal_id: Optional[str] = None,
+    types: Optional[Iterable[str]] = None,
+    since: Optional[str] = None,
+    limit: int = 1000,
+) -> Tuple[List[Tuple[int, Dict[str, Any]]], int]:
+    """(id, event) of matching events with id > after_id (a primary-key range scan), and the id to resume from."""
+    rows = connect(project_root).execute(
+        "SELECT id, timestamp, event, terminal_id, data FROM events WHERE id > ? ORDER BY id LIMIT ?",
+        (after_id, limit),
+    ).fetchall()
+    names = set(types or ())
+    events: List[Tuple[int, Dict[str, Any]]] = []
+    for row_id, ts, name, tid, data in rows:
+        after_id = row_id
+        if (terminal_id and tid != terminal_id) or (names and name not in names) or (since and ts < since):
+            continue
+        entry: Dict[str, Any] = {"timestamp": ts, "event": name}
+        if tid:
+            entry["terminal_id"] = tid
+        if data is not None:
+            entry["data"] = json.loads(data)
+        events.append((row_id, entry))
+    return events, after_id
+
+
+_EVENT_SIZE = "LENGTH(timestamp) + LENGTH(event) + COALESCE(LENGTH(terminal_id), 0) + COALESCE(LENGTH(data), 0)"
+
+
+def prune_events(max_bytes: int, project_root: str) -> int:
+    """Once events exceed `max_bytes`, delete the oldest down to half of it; returns bytes freed."""
+    with transaction(project_root) as conn:
+        total = conn.execute(f"SELECT COALESCE(SUM({_EVENT_SIZE}), 0) FROM events").fetchone()[0]
+        if total <= max_bytes:
+            return 0
+        excess = total - max_bytes // 2
+        row = conn.execute(
+            f"SELECT id, running FROM (SELECT id, SUM({_EVENT_SIZE}) OVER (ORDER BY id) AS running"
+            " FROM events) WHERE running >= ? ORDER BY id LIMIT 1",
+            (excess,),
+        ).fetchone()
+        if not row:
+            return 0
+        conn.execute("DELETE FROM events WHERE id <= ?", (row[0],))
+        return row[1]
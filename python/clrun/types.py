@@ -26,6 +26,8 @@ LedgerEventType = Literal[
     "key.sent",
     "skills.installed",
     "skills.global_installed",
+    "gc.completed",
+    "state.migrated",
     "error",
 ]
 
@@ -53,6 +55,12 @@ class SessionMetadata:
     saved_state: Optional[SavedState] = None
     scp_run_id: Optional[str] = None
     scp_base_url: Optional[str] = None
+    # Suspension policy overrides (see clrun.runtime.suspension); idle_timeout
+    # 0 means never suspend for idleness, None means the project setting.
+    pinned: bool = False
+    idle_timeout: Optional[float] = None
+    # PTY backend the worker runs the shell with (clrun.pty.backend).
+    pty_backend: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         d: Dict[str, Any] = {
@@ -78,6 +86,12 @@ class SessionMetadata:
             d["scp_run_id"] = self.scp_run_id
         if self.scp_base_url is not None:
             d["scp_base_url"] = self.scp_base_url
+        if self.pinned:
+            d["pinned"] = True
+        if self.idle_timeout is not None:
+            d["idle_timeout"] = self.idle_timeout
+        if self.pty_backend is not None:
+            d["pty_backend"] = self.pty_backend
         return d
 
     @classmethod
@@ -99,6 +113,9 @@ class SessionMetadata:
             saved_state=saved,
             scp_run_id=d.get("scp_run_id"),
             scp_base_url=d.get("scp_base_url"),
+            pinned=bool(d.get("pinned", False)),
+            idle_timeout=d.get("idle_timeout"),
+            pty_backend=d.get("pty_backend"),
         )
 
 
@@ -154,3 +171,5 @@ class RuntimeState:
     version: str
     project_root: str
     port: Optional[int] = None
+    socket: Optional[str] = None
+    token: Optional[str] = None
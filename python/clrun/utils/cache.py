@@ -0,0 +1,100 @@
+"""Stat-validated in-memory caches for long-lived processes.
+
+Disabled by default: short-lived CLI invocations read every file once, so
+caching would only add overhead. The runtime server enables it so that
+repeated requests skip JSON parsing and buffer rescans for files that have
+not changed since the last read.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+
+_enabled = False
+_json_cache: Dict[str, Tuple[Tuple[int, int, int], Any]] = {}
+_line_index: Dict[str, Tuple[int, int, int, bytes]] = {}
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _stat_key(st: os.stat_result) -> Tuple[int, int, int]:
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def load_json(path: str) -> Any:
+    """Load a JSON file, reusing the parsed value while the file is unchanged.
+
+    Callers must not mutate the returned value; build a fresh object from it.
+    Raises OSError / ValueError like a plain open + json.load.
+    """
+    if not _enabled:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    key = _stat_key(os.stat(path))
+    hit = _json_cache.get(path)
+    if hit and hit[0] == key:
+        return hit[1]
+    with open(path, "r", encoding="utf-8") as f:
+        value = json.load(f)
+    _json_cache[path] = (key, value)
+    return value
+
+
+def forget(path: str) -> None:
+    _json_cache.pop(path, None)
+    _line_index.pop(path, None)
+
+
+def _count_breaks(data: bytes, prev: bytes) -> int:
+    """Count universal-newline line breaks (\\r\\n, \\r, \\n) in a chunk.
+
+    `prev` is the last byte of the preceding chunk so that a \\r\\n pair split
+    across chunks is counted once.
+    """
+    n = data.count(b"\n") + data.count(b"\r") - data.count(b"\r\n")
+    if prev == b"\r" and data[:1] == b"\n":
+        n -= 1
+    return n
+
+
+def line_count(path: str) -> Optional[int]:
+    """Incrementally maintained line count for an append-only file.
+
+    Returns None when caching is disabled so the caller falls back to a
+    full read.
+    """
+    if not _enabled:
+        return None
+
+    st = os.stat(path)
+    hit = _line_index.get(path)
+    if hit and hit[0] == st.st_ino and hit[1] <= st.st_size:
+        _, offset, breaks, last = hit
+    else:
+        offset, breaks, last = 0, 0, b""
+
+    if st.st_size > offset:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while True:
+                chunk = f.read(1 << 20)
+                if not chunk:
+                    break
+                breaks += _count_breaks(chunk, last)
+                last = chunk[-1:]
+                offset += len(chunk)
+        _line_index[path] = (st.st_ino, offset, breaks, last)
+
+    if offset == 0:
+        return 0
+    return breaks if last in (b"\n", b"\r") else breaks + 1
@@ -0,0 +1,182 @@
+"""Project settings: built-in defaults < .clrun/config.json < CLRUN_* env vars.
+
+    {
+      "gc": {"max_age": "7d", "max_sessions": 1000, "auto": true}
+    }
+
+Every setting `<section>.<key>` can be overridden with the environment
+variable `CLRUN_<SECTION>_<KEY>` (e.g. CLRUN_GC_MAX_AGE=2d). Values from
+the environment are strings; the parse_* helpers accept both forms.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Optional
+
+from clrun.utils.context import get_env
+from clrun.utils.paths import get_clrun_paths
+
+CONFIG_FILE = "config.json"
+
+DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "state": {
+        # "files" (JSON per session/queue, events.log) or "sqlite" (.clrun/state.db).
+        # Switch with `clrun migrate --to <backend>`.
+        "backend": "files",
+    },
+    "worker": {
+        # How long the worker may hold changed session metadata (activity
+        # time, queue length) in memory before writing it out. Status
+        # changes are written immediately.
+        "heartbeat_interval": "5s",
+        # fsync session writes: "always", "transitions" (status changes) or "never".
+        "fsync": "transitions",
+        # How workers are started: "popen" (a new interpreter each) or
+        # "forkserver" (forked from a resident process with the worker
+        # modules already imported; see clrun.runtime.forkserver).
+        "launcher": "popen",
+        # PTY library for the session shell: "pexpect" or "stdlib" (pty.fork
+        # and plain os reads/writes; see clrun.pty.backend).
+        "pty_backend": "pexpect",
+    },
+    "ledger": {
+        # Buffered events are written at least this often (and at exit).
+        "flush_interval": "50ms",
+        # events.log is rotated into events.<n>.log once it reaches this size.
+        "segment_bytes": "16MB",
+    },
+    "metrics": {
+        # Latency histograms and counters for workers (and commands), kept
+        # in .clrun/metrics/ and reported by `clrun stats`.
+        "enabled": True,
+        # Also record every CLI command's run time. Off by default: outside
+        # the runtime server, each call pays a locked read-modify-write.
+        "commands": False,
+    },
+    "suspend": {
+        # A running session idle this long is suspended (and restored on its
+        # next input). Per session: `clrun policy <id> --idle-timeout`.
+        "idle_timeout": "5m",
+        # Keep at most this many sessions live; beyond it, the least recently
+        # used are suspended first.
+        "max_live": None,
+        # Suspend the least recently used session while MemAvailable in
+        # /proc/meminfo is below this size ("512MB") or share of RAM ("10%").
+        "min_available_memory": None,
+        # The cap and memory rules skip sessions active within this long.
+        "min_idle": "30s",
+        # How often the cap and memory rules are evaluated.
+        "check_interval": "5s",
+    },
+    "pool": {
+        # Idle workers with an already-started shell kept ready per cwd, so
+        # `clrun <command>` skips shell startup (0 = off).
+        "size": 0,
+        # A pooled worker that has not been claimed for this long exits.
+        "idle_ttl": "10m",
+    },
+    "gc": {
+        # Sessions that are no longer running (exited/killed/detached) and
+        # inactive for longer than this are removed.
+        "max_age": "7d",
+        # Per-status overrides of max_age, e.g. {"killed": "1d", "suspended": "30d"}.
+        # Suspended sessions are only collected when listed here.
+        "status_max_age": {},
+        # Keep at most this many sessions / bytes of session files (oldest
+        # inactive sessions go first; running and suspended ones are kept).
+        "max_sessions": 1000,
+        "max_bytes": "1GB",
+        # Sent/cancelled queue entries kept per stopped session.
+        "queue_history": 50,
+        # Delete the oldest ledger segments beyond this total size.
+        "ledger_max_bytes": "64MB",
+        # Run gc automatically from `clrun <command>` at most once per interval.
+        "auto": False,
+        "auto_interval": "1h",
+    },
+}
+
+_SIZE_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+
+
+def config_path(project_root: str) -> str:
+    return os.path.join(get_clrun_paths(project_root).root, CONFIG_FILE)
+
+
+def load_config(project_root: str) -> Dict[str, Dict[str, Any]]:
+    """Merged settings for a project (defaults, then config.json, then env)."""
+    merged = {section: dict(values) for section, values in DEFAULTS.items()}
+    try:
+        with open(config_path(project_root), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for section, values in data.items():
+            if isinstance(values, dict):
+                merged.setdefault(section, {}).update(values)
+    except (OSError, ValueError):
+        pass
+
+    env = get_env() or os.environ
+    for section, values in merged.items():
+        for key in list(values):
+            override = env.get(f"CLRUN_{section}_{key}".upper())
+            if override is not None:
+                values[key] = override
+    return merged
+
+
+def set_setting(project_root: str, section: str, key: str, value: Any) -> None:
+    """Persist one setting in .clrun/config.json (other settings are kept)."""
+    path = config_path(project_root)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    data.setdefault(section, {})[key] = value
+    tmp = path + f".tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def get_setting(project_root: str, section: str, key: str, default: Any = None) -> Any:
+    return load_config(project_root).get(section, {}).get(key, default)
+
+
+def parse_size(value: Any) -> Optional[int]:
+    """Bytes from 1048576, "512KB", "64MB", "1G"; None for null/"none"/"0"."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value) or None
+    text = str(value).strip()
+    if text.lower() in ("", "none", "off", "0"):
+        return None
+    m = _SIZE_RE.match(text)
+    if not m:
+        raise ValueError(f"Invalid size: {value}")
+    return int(float(m.group(1)) * _SIZE_UNITS[m.group(2).lower()]) or None
+
+
+def parse_int(value: Any) -> Optional[int]:
+    """A positive count, or None for null/"none"/"0"."""
+    if value is None or isinstance(value, bool):
+        return None
+    text = str(value).strip().lower()
+    if text in ("", "none", "off"):
+        return None
+    try:
+        return int(text) or None
+    except ValueError as e:
+        raise ValueError(f"Invalid count: {value}") from e
+
+
+def parse_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
@@ -0,0 +1,65 @@
+"""Per-request execution context (cwd, env, output streams, output format).
+
+Command handlers normally run in a short-lived CLI process and read the
+process-wide cwd, environment and stdout. When they are served by the
+runtime server instead, each request runs in its own thread with the
+calling client's context installed here.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, TextIO
+
+_local = threading.local()
+
+
+def get_cwd() -> str:
+    """Working directory of the current request (falls back to os.getcwd())."""
+    return getattr(_local, "cwd", None) or os.getcwd()
+
+
+def get_env() -> Optional[Dict[str, str]]:
+    """Environment of the current request, or None to inherit os.environ."""
+    return getattr(_local, "env", None)
+
+
+def get_stdout() -> TextIO:
+    return getattr(_local, "stdout", None) or sys.stdout
+
+
+def get_stderr() -> TextIO:
+    return getattr(_local, "stderr", None) or sys.stderr
+
+
+def get_format() -> Optional[str]:
+    """Output format chosen with --format for the current request, if any."""
+    return getattr(_local, "format", None)
+
+
+def set_format(name: Optional[str]) -> None:
+    _local.format = name
+
+
+@contextmanager
+def request_context(
+    cwd: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+    stdout: Optional[TextIO] = None,
+    stderr: Optional[TextIO] = None,
+) -> Iterator[None]:
+    """Install a request context for the current thread."""
+    saved = {k: getattr(_local, k, None) for k in ("cwd", "env", "stdout", "stderr", "format")}
+    _local.cwd = cwd
+    _local.env = env
+    _local.stdout = stdout
+    _local.stderr = stderr
+    _local.format = None
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            setattr(_local, k, v)
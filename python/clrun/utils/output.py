@@ -1,12 +1,15 @@
-"""YAML output, ANSI stripping, and response helpers."""
+"""Response serialization (YAML/JSON/NDJSON), ANSI stripping, and response helpers."""
 
 from __future__ import annotations
 
+import json
+import os
 import re
 import sys
-from typing import Any, Dict, List, Optional
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, TextIO
 
-import yaml
+from clrun.utils.context import get_stdout, get_env, get_format
 
 
 def strip_ansi(text: str) -> str:
@@ -62,30 +65,134 @@ def clean_output(lines: List[str], command: Optional[str] = None) -> Optional[st
     return result or None
 
 
+# ─── Serializers ─────────────────────────────────────────────────────────────
+
+FORMAT_ENV = "CLRUN_FORMAT"
+DEFAULT_FORMAT = "yaml"
+
+
+def _clean(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in data.items() if v is not None}
+
+
+def _iter_lines(text: str) -> Iterator[str]:
+    """The lines of `text`, as text.split("\n") but one at a time."""
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+class Serializer(ABC):
+    """Writes one response document to a stream."""
+
+    name = ""
+
+    @abstractmethod
+    def write(self, data: Dict[str, Any], stream: TextIO) -> None: ...
+
+
+class YamlSerializer(Serializer):
+    """YAML documents (the default), using libyaml's C emitter when available."""
+
+    name = "yaml"
+
+    def write(self, data: Dict[str, Any], stream: TextIO) -> None:
+        stream.write(to_yaml(data))
+
+
+class JsonSerializer(Serializer):
+    """One JSON object per response, via the stdlib C encoder."""
+
+    name = "json"
+
+    def write(self, data: Dict[str, Any], stream: TextIO) -> None:
+        stream.write(json.dumps(_clean(data), ensure_ascii=False))
+        stream.write("\n")
+
+
+class NdjsonSerializer(Serializer):
+    """Newline-delimited JSON, streaming large `output` fields line by line.
+
+    The first record holds every field except `output`; each output line
+    follows as its own `{"line": ...}` record, so neither side has to hold
+    one huge encoded string.
+    """
+
+    name = "ndjson"
+
+    def write(self, data: Dict[str, Any], stream: TextIO) -> None:
+        clean = _clean(data)
+        output = clean.pop("output", None)
+        if isinstance(output, str):
+            clean["output_lines"] = output.count("\n") + 1
+        elif output is not None:
+            clean["output"] = output
+            output = None
+        stream.write(json.dumps(clean, ensure_ascii=False))
+        stream.write("\n")
+        if output is not None:
+            dumps = json.dumps
+            for line in _iter_lines(output):
+                stream.write(dumps({"line": line}, ensure_ascii=False))
+                stream.write("\n")
+
+
+SERIALIZERS: Dict[str, Serializer] = {
+    s.name: s for s in (YamlSerializer(), JsonSerializer(), NdjsonSerializer())
+}
+
+
+def register_serializer(serializer: Serializer) -> None:
+    """Make an additional output format available to --format / CLRUN_FORMAT."""
+    SERIALIZERS[serializer.name] = serializer
+
+
+def output_format() -> str:
+    """Resolve the active format: --format, then CLRUN_FORMAT, then yaml."""
+    name = get_format()
+    if not name:
+        env = get_env()
+        name = (env if env is not None else os.environ).get(FORMAT_ENV) or DEFAULT_FORMAT
+    name = name.lower()
+    return name if name in SERIALIZERS else DEFAULT_FORMAT
+
+
 def to_yaml(data: Dict[str, Any]) -> str:
     """Serialize to clean YAML."""
-    clean = {k: v for k, v in data.items() if v is not None}
-    return "---\n" + yaml.dump(clean, default_flow_style=False, width=1000, allow_unicode=True)
+    import yaml  # deferred: PyYAML is the most expensive import on the CLI path
+
+    dumper = getattr(yaml, "CDumper", yaml.Dumper)
+    return "---\n" + yaml.dump(_clean(data), Dumper=dumper, default_flow_style=False, width=1000, allow_unicode=True)
+
+
+def emit(data: Dict[str, Any]) -> None:
+    """Write a response in the active output format."""
+    SERIALIZERS[output_format()].write(data, get_stdout())
 
 
 def success(data: Dict[str, Any]) -> None:
-    """Print success YAML and exit 0."""
-    sys.stdout.write(to_yaml(data))
+    """Print a success response and exit 0."""
+    emit(data)
     sys.exit(0)
 
 
 def fail(error: Any) -> None:
-    """Print error YAML and exit 1."""
+    """Print an error response and exit 1."""
     if isinstance(error, str):
-        sys.stdout.write(to_yaml({"error": error}))
+        emit({"error": error})
     else:
-        sys.stdout.write(to_yaml(error))
+        emit(error)
     sys.exit(1)
 
 
 def respond(data: Dict[str, Any]) -> None:
-    """Print YAML without exiting."""
-    sys.stdout.write(to_yaml(data))
+    """Print a response without exiting."""
+    emit(data)
 
 
 def session_hints(terminal_id: str) -> Dict[str, str]:
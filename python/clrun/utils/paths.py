@@ -5,6 +5,8 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass
 
+from clrun.utils.context import get_cwd
+
 CLRUN_DIR = ".clrun"
 
 INDICATORS = [
@@ -19,7 +21,8 @@ INDICATORS = [
 
 def resolve_project_root() -> str:
     """Walk up from cwd looking for project indicators, fall back to cwd."""
-    d = os.getcwd()
+    cwd = get_cwd()
+    d = cwd
     root = os.path.abspath(os.sep)
 
     while d != root:
@@ -30,7 +33,7 @@ def resolve_project_root() -> str:
             return d
         d = os.path.dirname(d)
 
-    return os.getcwd()
+    return cwd
 
 
 @dataclass(frozen=True)
@@ -39,11 +42,14 @@ class ClrunPaths:
     runtime_lock: str
     runtime_pid: str
     runtime_json: str
+    runtime_sock: str
     sessions_dir: str
+    session_index: str
     queues_dir: str
     buffers_dir: str
     ledger_dir: str
     events_log: str
+    metrics_dir: str
     skills_dir: str
 
 
@@ -55,11 +61,14 @@ def get_clrun_paths(project_root: str | None = None) -> ClrunPaths:
         runtime_lock=os.path.join(cr, "runtime.lock"),
         runtime_pid=os.path.join(cr, "runtime.pid"),
         runtime_json=os.path.join(cr, "runtime.json"),
+        runtime_sock=os.path.join(cr, "runtime.sock"),
         sessions_dir=os.path.join(cr, "sessions"),
+        session_index=os.path.join(cr, "sessions.idx"),
         queues_dir=os.path.join(cr, "queues"),
         buffers_dir=os.path.join(cr, "buffers"),
         ledger_dir=os.path.join(cr, "ledger"),
         events_log=os.path.join(cr, "ledger", "events.log"),
+        metrics_dir=os.path.join(cr, "metrics"),
         skills_dir=os.path.join(cr, "skills"),
     )
 
@@ -0,0 +1,50 @@
+"""Parse user-supplied times and durations (`--since 30m`, `--since 2026-01-01T12:00`, `max_age: 7d`)."""
+
+from __future__ import annotations
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+_AGE_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*(ms|s|m|h|d|w)$", re.IGNORECASE)
+_UNIT_S = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_duration(value: object) -> Optional[float]:
+    """Seconds from an age like `50ms`, `90s`, `15m`, `2h`, `1d`, `1w` or a number of
+    seconds; None for null/"none"/"0". Raises ValueError otherwise."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) or None
+    text = str(value).strip()
+    if text.lower() in ("", "none", "off", "0"):
+        return None
+    m = _AGE_RE.match(text)
+    if m:
+        return float(m.group(1)) * _UNIT_S[m.group(2).lower()]
+    try:
+        return float(text) or None
+    except ValueError as e:
+        raise ValueError(f"Invalid duration: {value}") from e
+
+
+def parse_time(value: str) -> str:
+    """Turn an age (`90s`, `15m`, `2h`, `1d`, `1w`) or ISO 8601 time into UTC ISO.
+
+    The result compares correctly as a string against the UTC timestamps
+    clrun stores (`datetime.now(timezone.utc).isoformat()`). Naive times
+    are taken as UTC. Raises ValueError for anything else.
+    """
+    text = value.strip()
+    m = _AGE_RE.match(text)
+    if m:
+        when = datetime.now(timezone.utc) - timedelta(seconds=parse_duration(text) or 0)
+    else:
+        if text.endswith(("Z", "z")):
+            text = text[:-1] + "+00:00"
+        when = datetime.fromisoformat(text)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        when = when.astimezone(timezone.utc)
+    return when.isoformat()
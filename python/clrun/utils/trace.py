@@ -0,0 +1,160 @@
+"""Opt-in Chrome trace-event recording: CLRUN_TRACE=<path>.
+
+    CLRUN_TRACE=/tmp/run.trace clrun 'npm test'
+    # open /tmp/run.trace in chrome://tracing or https://ui.perfetto.dev
+
+Every process that sees CLRUN_TRACE (the CLI, the runtime server for the
+requests it serves, and the workers, which inherit the environment)
+appends complete ("X") events for its spans to the same file, using one
+O_APPEND write per event. The file is in the JSON Array Format, which
+trace viewers accept without the closing bracket. Timestamps come from
+CLOCK_MONOTONIC, which all processes share, so spans from the CLI and a
+worker line up. Spans carry the terminal_id, and a flow arrow links the
+CLI's worker spawn to the worker's start.
+
+Each process also records when its interpreter started, read from /proc
+(with clock-tick resolution), so interpreter startup shows up as a span.
+
+When CLRUN_TRACE is unset, `span` returns a shared no-op context manager
+after one environment lookup.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import zlib
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict, Optional
+
+from clrun.utils.context import get_env
+
+TRACE_ENV = "CLRUN_TRACE"
+
+_NULL = nullcontext()
+_lock = threading.Lock()
+_fds: Dict[str, int] = {}
+_named: set = set()
+
+
+def trace_path() -> Optional[str]:
+    env = get_env()
+    return (env if env is not None else os.environ).get(TRACE_ENV) or None
+
+
+def _now_us() -> float:
+    return time.monotonic_ns() / 1000
+
+
+def _write(path: str, event: Dict[str, Any]) -> None:
+    line = (json.dumps(event, default=str) + ",\n").encode("utf-8")
+    with _lock:
+        key = f"{os.getpid()}:{path}"
+        fd = _fds.get(key)
+        if fd is None:
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_EXCL, 0o644)
+                os.write(fd, b"[\n")
+            except FileExistsError:
+                fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+            _fds[key] = fd
+        os.write(fd, line)
+
+
+def _emit(path: str, event: Dict[str, Any]) -> None:
+    event.setdefault("pid", os.getpid())
+    event.setdefault("tid", threading.get_native_id())
+    try:
+        _write(path, event)
+    except OSError:
+        pass
+
+
+def _process_start_us() -> Optional[float]:
+    """When this process started, on the CLOCK_MONOTONIC scale (approximately)."""
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            stat = f.read()
+        ticks = int(stat[stat.rindex(b")") + 2:].split()[19])
+        with open("/proc/uptime", "rb") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    # /proc times count from boot; shift them onto the monotonic clock.
+    started_ago = uptime - ticks / os.sysconf("SC_CLK_TCK")
+    return _now_us() - started_ago * 1e6
+
+
+def process(name: str, **args: Any) -> None:
+    """Name this process in the trace and record its interpreter startup (once per process)."""
+    path = trace_path()
+    if path is None or os.getpid() in _named:
+        return
+    _named.add(os.getpid())
+    _emit(path, {"ph": "M", "name": "process_name", "args": {"name": name}})
+    start = _process_start_us()
+    now = _now_us()
+    if start is not None and start < now:
+        _emit(path, {"ph": "X", "cat": "clrun", "name": "interpreter startup", "ts": start,
+                     "dur": now - start, "args": args})
+
+
+class _Span:
+    __slots__ = ("path", "name", "args", "start")
+
+    def __init__(self, path: str, name: str, args: Dict[str, Any]) -> None:
+        self.path = path
+        self.name = name
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self) -> "_Span":
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        end = _now_us()
+        if exc_type is not None and not issubclass(exc_type, SystemExit):
+            self.args["error"] = exc_type.__name__
+        _emit(self.path, {"ph": "X", "cat": "clrun", "name": self.name, "ts": self.start,
+                          "dur": end - self.start, "args": self.args})
+
+
+def span(name: str, **args: Any) -> ContextManager[Any]:
+    """Time a block as a complete event (a no-op unless CLRUN_TRACE is set)."""
+    path = trace_path()
+    if path is None:
+        return _NULL
+    return _Span(path, name, args)
+
+
+def now() -> float:
+    """Current trace timestamp, for `complete`."""
+    return _now_us()
+
+
+def complete(name: str, start: float, **args: Any) -> None:
+    """Record a span that began at `start` (from `now`) and ends now."""
+    path = trace_path()
+    if path is not None:
+        end = _now_us()
+        _emit(path, {"ph": "X", "cat": "clrun", "name": name, "ts": start, "dur": end - start, "args": args})
+
+
+def instant(name: str, **args: Any) -> None:
+    path = trace_path()
+    if path is not None:
+        _emit(path, {"ph": "i", "s": "p", "cat": "clrun", "name": name, "ts": _now_us(), "args": args})
+
+
+def flow(name: str, key: str, start: bool) -> None:
+    """One end of a flow arrow between processes; both ends pass the same key (a terminal_id)."""
+    path = trace_path()
+    if path is not None:
+        event = {"ph": "s" if start else "f", "cat": "clrun", "name": name,
+                 "id": zlib.crc32(key.encode()), "ts": _now_us()}
+        if not start:
+            event["bp"] = "e"
+        _emit(path, event)
@@ -74,22 +74,22 @@ def validate_command(command: str) -> InputWarnings:
     return InputWarnings(warnings)
 
 
-def session_not_found_error(terminal_id: str) -> Dict[str, Any]:
+def session_not_found_error(terminal_id: str, project_root: Optional[str] = None) -> Dict[str, Any]:
     hints: Dict[str, str] = {
         "list_sessions": "clrun status",
         "start_new": "clrun <command>",
     }
     try:
         from clrun.utils.paths import resolve_project_root, get_clrun_paths
-        from clrun.pty.pty_manager import list_sessions
+        from clrun.pty.session_index import load_index
 
-        project_root = resolve_project_root()
+        project_root = project_root or resolve_project_root()
         paths = get_clrun_paths(project_root)
         if os.path.exists(paths.root):
-            sessions = list_sessions(project_root)
-            running = [s for s in sessions if s.status in ("running", "suspended")]
+            sessions = [(tid, s) for tid, s in load_index(project_root).items() if "status" in s]
+            running = [tid for tid, s in sessions if s["status"] in ("running", "suspended")]
             if running:
-                hints["active_sessions"] = ", ".join(s.terminal_id for s in running)
+                hints["active_sessions"] = ", ".join(running)
                 hints["note"] = f"Found {len(running)} active session(s). Use one of the IDs above."
             elif sessions:
                 hints["note"] = f"All {len(sessions)} session(s) are terminated. Start a new one with: clrun <command>"
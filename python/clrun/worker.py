@@ -5,10 +5,15 @@ clrun worker — detached background process that manages a single PTY session.
 Spawned by `clrun run`. Runs until the PTY exits, is killed, or is suspended.
 
 Usage: python -m clrun.worker <terminalId> <command> <cwd> <projectRoot> [--restore]
+       python -m clrun.worker --pool <workerId> <cwd> <projectRoot> <poolKey>
+
+With --pool, the worker starts its shell and waits in the project's pool
+(clrun.runtime.pool) until `clrun run` claims it for a session.
 """
 
 from __future__ import annotations
 
+import atexit
 import os
 import select
 import signal
@@ -16,19 +21,26 @@ import sys
 import time
 from datetime import datetime, timezone
 
-import pexpect
+from typing import Any
 
+from clrun import store
 from clrun.buffer.buffer_manager import append_to_buffer, init_buffer
 from clrun.queue.queue_engine import get_next_queued, mark_sent, pending_count
+from clrun.pty import backend as pty_backend
+from clrun.pty.capture import (
+    capture_shell_state, remove_restore_script, source_restore_script, write_restore_script,
+)
 from clrun.pty.pty_manager import write_session, read_session, update_session, detect_shell
 from clrun.ledger.ledger import log_event
-from clrun.utils.paths import get_clrun_paths, ensure_clrun_dirs
+from clrun.runtime import heartbeat, metrics, pool, suspension
+from clrun.utils import trace
+from clrun.utils.config import load_config
+from clrun.utils.paths import get_clrun_paths, ensure_clrun_dirs, queue_path, buffer_path
+from clrun.utils.timespec import parse_duration
 from clrun.types import SessionMetadata, SavedState
 
 # ─── Configuration ───────────────────────────────────────────────────────────
 
-IDLE_TIMEOUT_S = 5 * 60       # 5 minutes
-SUSPEND_CAPTURE_WAIT_S = 0.6  # wait for shell to flush state files
 RAW_PREFIX = "\x00RAW\x00"
 
 SKIP_ENV_VARS = {
@@ -40,9 +52,22 @@ SKIP_ENV_VARS = {
 # ─── State ───────────────────────────────────────────────────────────────────
 
 last_activity = time.time()
+buffer_bytes = 0
 suspending = False
-child: pexpect.spawn | None = None
+child: pty_backend.PtyProcess | None = None
 sigusr1_received = False
+suspend_requested = False
+# Restore scripts the shell had not sourced when the worker moved on; removed at exit.
+unsourced_scripts: list[str] = []
+
+
+def remove_unsourced_scripts() -> None:
+    """Exit cleanup (atexit; the fork server's children call it before os._exit)."""
+    while unsourced_scripts:
+        remove_restore_script(unsourced_scripts.pop())
+
+
+atexit.register(remove_unsourced_scripts)
 
 
 def reset_idle() -> None:
@@ -54,18 +79,135 @@ def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+class SessionWriter:
+    """The worker's copy of its session metadata, written behind.
+
+    `set` only records changed fields; `tick` writes them out once per
+    heartbeat interval, and `transition` writes a status change at once
+    (fsynced unless the policy is "never"). Writes go through
+    `update_session` with just the changed fields, so updates made by other
+    processes (kill, crash recovery) are merged rather than overwritten.
+    While nothing changes, no metadata I/O happens at all.
+
+    Liveness goes to the session's heartbeat slot (clrun.runtime.heartbeat)
+    on every tick instead, which is a write into shared memory. Metrics
+    (clrun.runtime.metrics), when enabled, are saved on the same schedule.
+    """
+
+    def __init__(
+        self,
+        session: SessionMetadata,
+        project_root: str,
+        heartbeat_s: float,
+        fsync: str,
+        slot: heartbeat.HeartbeatSlot | None = None,
+        stats: metrics.Metrics | None = None,
+    ) -> None:
+        self.terminal_id = session.terminal_id
+        self.project_root = project_root
+        self.heartbeat_s = heartbeat_s
+        self.fsync = fsync
+        self.slot = slot
+        self.stats = stats
+        self.live: tuple[int, int, float] | None = None
+        self.values: dict[str, Any] = session.to_dict()
+        self.dirty: dict[str, Any] = {}
+        self.last_flush = time.time()
+        self.activity_seen = time.time()
+        self.stats_saved = time.time()
+
+    @property
+    def session(self) -> SessionMetadata:
+        return SessionMetadata.from_dict(self.values)
+
+    def set(self, **fields: Any) -> None:
+        for key, value in fields.items():
+            if self.values.get(key) != value:
+                self.values[key] = value
+                self.dirty[key] = value
+
+    def flush(self, sync: bool = False) -> None:
+        if not self.dirty:
+            return
+        updates, self.dirty = self.dirty, {}
+        update_session(self.terminal_id, updates, self.project_root,
+                       sync=self.fsync == "always" or (sync and self.fsync != "never"))
+        self.last_flush = time.time()
+
+    def save_stats(self) -> None:
+        if self.stats and self.stats.dirty:
+            try:
+                metrics.save(self.project_root, self.terminal_id, self.stats)
+            except OSError:
+                pass
+        self.stats_saved = time.time()
+
+    def tick(self, now: float, activity: float, buffer_size: int) -> None:
+        """Called every loop iteration; `activity` is the time of the last output/input."""
+        if self.slot:
+            live = (self.values.get("queue_length") or 0, buffer_size, activity)
+            if live != self.live:
+                self.live = live
+                self.slot.update(*live)
+            else:
+                self.slot.beat()
+        if activity > self.activity_seen:
+            self.activity_seen = activity
+            self.set(last_activity_at=datetime.fromtimestamp(activity, timezone.utc).isoformat())
+        if self.dirty and now - self.last_flush >= self.heartbeat_s:
+            self.flush()
+        if self.stats and self.stats.dirty and now - self.stats_saved >= self.heartbeat_s:
+            self.save_stats()
+
+    def transition(self, status: str, **fields: Any) -> None:
+        self.set(status=status, last_activity_at=now_iso(), **fields)
+        self.flush(sync=True)
+        self.save_stats()
+        if self.slot and status != "running":
+            self.slot.release()
+
+
+def worker_settings(project_root: str) -> tuple[float, str]:
+    """(heartbeat interval in seconds, fsync policy) from the project's worker settings."""
+    settings = load_config(project_root).get("worker", {})
+    try:
+        heartbeat = parse_duration(settings.get("heartbeat_interval"))
+    except ValueError:
+        heartbeat = None
+    fsync = str(settings.get("fsync", "transitions")).lower()
+    if fsync not in ("always", "transitions", "never"):
+        fsync = "transitions"
+    return (5.0 if heartbeat is None else heartbeat), fsync
+
+
 def main() -> None:
-    global child, suspending, sigusr1_received
+    global child, suspending, sigusr1_received, suspend_requested, buffer_bytes
 
+    reset_idle()  # the module may have been imported long before (clrun.runtime.forkserver)
     args = sys.argv[1:]
+    pool_id: str | None = None
+    if len(args) >= 2 and args[0] == "--pool":
+        pool_id, args = args[1], args[2:]
     restore_flag = "--restore" in args
     positional = [a for a in args if a != "--restore"]
 
-    if len(positional) < 4:
+    if len(positional) < (3 if pool_id else 4):
         sys.stderr.write("worker: missing arguments\n")
         sys.exit(1)
 
-    terminal_id, command, cwd, project_root = positional[:4]
+    if pool_id:
+        # The session is only known once the worker is claimed.
+        terminal_id, command = "", ""
+        cwd, project_root = positional[:2]
+    else:
+        terminal_id, command, cwd, project_root = positional[:4]
+    spawn_started = time.perf_counter()
+    tracing = trace.trace_path() is not None
+    if tracing:
+        trace.process("clrun worker", terminal_id=terminal_id, pool=pool_id)
+        if not pool_id:
+            trace.flow("worker", terminal_id, start=False)
+        setup_started = trace.now()
 
     # ─── Ensure directories exist ────────────────────────────────────────
     ensure_clrun_dirs(project_root)
@@ -73,28 +215,49 @@ def main() -> None:
     # ─── Resolve restore state ───────────────────────────────────────────
     restore_state: SavedState | None = None
     restore_cwd = cwd
+    backend = pty_backend.backend_name(project_root)
 
     if restore_flag:
         session = read_session(terminal_id, project_root)
         if session and session.saved_state:
             restore_state = session.saved_state
             restore_cwd = restore_state.cwd
+        if session and session.pty_backend:
+            backend = session.pty_backend  # a restored session keeps its backend
 
     # ─── Spawn PTY ───────────────────────────────────────────────────────
     shell = detect_shell()
     env = dict(os.environ)
     env["TERM"] = "xterm-256color"
 
-    child = pexpect.spawn(
-        shell,
-        encoding="utf-8",
-        cwd=restore_cwd,
-        env=env,
-        dimensions=(40, 120),
-        timeout=None,
-    )
+    with trace.span("spawn pty", terminal_id=terminal_id, shell=shell, backend=backend):
+        child = pty_backend.spawn(shell, restore_cwd, env, (40, 120), backend)
     pty_pid = child.pid
 
+    # ─── Pooled: wait with a ready shell until claimed ───────────────────
+    if pool_id:
+        claimed = pool.serve(child.child_fd, pool_id, cwd, project_root, positional[2])
+        if claimed is None:
+            try:
+                child.terminate(force=True)
+            except Exception:
+                pass
+            sys.exit(0)
+        terminal_id, command = claimed.terminal_id, claimed.command
+        spawn_started = time.perf_counter()
+        if tracing:
+            trace.flow("worker", terminal_id, start=False)
+            setup_started = trace.now()
+        # Give the shell the claiming caller's environment, as a fresh spawn would have had.
+        exports, unsets = pool.env_changes(dict(os.environ), claimed.env)
+        if exports or unsets:
+            script = os.path.join(get_clrun_paths(project_root).sessions_dir, f"{terminal_id}.restore.sh")
+            write_restore_script(script, exports, unsets)
+            if not source_restore_script(child.child_fd, script):
+                unsourced_scripts.append(script)
+        os.environ.clear()
+        os.environ.update(claimed.env)
+
     # ─── Initialize state ────────────────────────────────────────────────
     if not restore_flag:
         init_buffer(terminal_id, project_root)
@@ -112,32 +275,58 @@ def main() -> None:
         queue_length=0,
         last_exit_code=None,
         last_activity_at=now_iso(),
+        pinned=existing.pinned if existing else False,
+        idle_timeout=existing.idle_timeout if existing else None,
+        pty_backend=child.name,
     )
-    write_session(session_data, project_root)
+    heartbeat_s, fsync_policy = worker_settings(project_root)
+    write_session(session_data, project_root, sync=fsync_policy != "never")
+    slot = heartbeat.claim(terminal_id, os.getpid(), pty_pid, project_root)
+    stats: metrics.Metrics | None = None
+    if metrics.enabled(project_root):
+        # A restored session keeps accumulating into its earlier metrics.
+        stats = (metrics.load(project_root, terminal_id) if restore_flag else None) or metrics.Metrics()
+    meta = SessionWriter(session_data, project_root, heartbeat_s, fsync_policy, slot, stats)
+    first_output = True
 
     if not restore_flag:
         log_event("session.created", project_root, terminal_id, {"command": command, "cwd": cwd, "pid": pty_pid})
+    if tracing:
+        trace.complete("worker setup", setup_started, terminal_id=terminal_id, restore=restore_flag)
+        command_started = trace.now()
 
     # ─── Send initial command or restore ─────────────────────────────────
-    time.sleep(0.08)
+    if not pool_id:
+        time.sleep(0.08)
 
     if restore_state:
-        exports = []
-        for key, value in restore_state.env.items():
-            if key in SKIP_ENV_VARS:
-                continue
-            escaped = value.replace("'", "'\\''")
-            exports.append(f"export {key}='{escaped}'")
-        if exports:
-            child.sendline(" && ".join(exports))
+        restore_started = time.perf_counter()
+        env = {k: v for k, v in restore_state.env.items() if k not in SKIP_ENV_VARS}
+        restored_vars, sourced = 0, True
+        if env:
+            script = os.path.join(get_clrun_paths(project_root).sessions_dir, f"{terminal_id}.restore.sh")
+            restored_vars = write_restore_script(script, env)
+            sourced = source_restore_script(child.child_fd, script)
+            if not sourced:
+                # The shell will still source it when it gets there; remove it when the worker exits.
+                unsourced_scripts.append(script)
         append_to_buffer(terminal_id, "\n--- session restored ---\n", project_root)
-        restored_vars = len([k for k in restore_state.env if k not in SKIP_ENV_VARS])
         log_event("session.restored", project_root, terminal_id, {
             "restored_cwd": restore_state.cwd,
             "restored_vars": restored_vars,
+            "sourced": sourced,
+            "restore_ms": round((time.perf_counter() - restore_started) * 1000, 2),
         })
     else:
         child.sendline(command)
+    if tracing:
+        trace.complete("send initial command", command_started, terminal_id=terminal_id, restore=restore_flag)
+    if pool_id:
+        # Replace ourselves in the pool, off the claiming command's path.
+        try:
+            pool.fill(project_root, cwd)
+        except OSError:
+            pass
 
     # ─── SIGUSR1 handler for immediate queue processing ──────────────────
     def sigusr1_handler(signum: int, frame: object) -> None:
@@ -146,115 +335,155 @@ def main() -> None:
 
     signal.signal(signal.SIGUSR1, sigusr1_handler)
 
+    # ─── SIGUSR2: suspension requested by a policy sweep ─────────────────
+    def sigusr2_handler(signum: int, frame: object) -> None:
+        global suspend_requested
+        suspend_requested = True
+
+    signal.signal(suspension.SUSPEND_SIGNAL, sigusr2_handler)
+
+    # ─── Suspension policy (re-read every check interval) ────────────────
+    policy = suspension.SuspendPolicy.from_config(project_root)
+    idle_timeout = policy.idle_timeout_for(session_data)
+    pinned = session_data.pinned
+    policy_checked = time.time()
+
+    def refresh_policy() -> None:
+        """Re-read the project policy and this session's overrides (`clrun policy`)."""
+        nonlocal policy, idle_timeout, pinned, policy_checked
+        policy_checked = time.time()
+        try:
+            policy = suspension.SuspendPolicy.from_config(project_root)
+            current = read_session(terminal_id, project_root)
+        except Exception:
+            return
+        if current:
+            idle_timeout = policy.idle_timeout_for(current)
+            pinned = current.pinned
+
+    def suspend_reason(idle: float) -> str | None:
+        if suspend_requested:
+            # The sweep may be stale: input can have arrived since, or the session been pinned.
+            return "policy" if not pinned and idle >= policy.min_idle_s else None
+        if idle_timeout is not None and idle >= idle_timeout:
+            return "idle_timeout"
+        return None
+    if policy.sweeps:
+        # A new live session may put the project over its cap.
+        try:
+            suspension.sweep(project_root, policy)
+        except Exception:
+            pass
+
     # ─── Helper: read available PTY output ───────────────────────────────
-    def drain_output() -> None:
-        """Read all available data from the PTY and append to buffer."""
+    def drain_output() -> bool:
+        """Read all available data from the PTY and append to buffer; True if there was any."""
+        global buffer_bytes
+        nonlocal first_output
+        got = False
         try:
             fd = child.fileno()
         except Exception:
-            return
+            return got
         while True:
             try:
                 rlist, _, _ = select.select([fd], [], [], 0)
                 if not rlist:
                     break
-                data = child.read_nonblocking(size=4096, timeout=0)
+                data = child.read(4096)
                 if data:
                     append_to_buffer(terminal_id, data, project_root)
+                    size = len(data.encode("utf-8", "replace"))
+                    buffer_bytes += size
                     reset_idle()
+                    got = True
+                    if stats:
+                        stats.incr("output.bytes", size)
+                        stats.incr("output.chunks")
+                        if first_output:
+                            stats.observe("spawn.first_output", time.perf_counter() - spawn_started)
+                    if first_output and tracing:
+                        trace.instant("first output", terminal_id=terminal_id, bytes=size)
+                    first_output = False
                 else:
                     break
-            except pexpect.TIMEOUT:
-                break
-            except pexpect.EOF:
+            except EOFError:
                 break
             except Exception:
                 break
+        return got
+
+    # ─── Helper: detect queue changes ────────────────────────────────────
+    qpath = queue_path(terminal_id, project_root)
+
+    def queue_signature() -> Any | None:
+        """Changes whenever the queue may have changed (file stat / SQLite data_version)."""
+        db = store.sqlite(project_root)
+        if db:
+            return db.data_version(project_root)
+        try:
+            st = os.stat(qpath)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
 
     # ─── Helper: process queue ───────────────────────────────────────────
-    def process_queue() -> None:
+    def process_queue() -> bool:
+        """Send every queued entry; True if any was sent."""
+        sent = False
         try:
             entry = get_next_queued(terminal_id, project_root)
             while entry:
-                if entry.input.startswith(RAW_PREFIX):
-                    raw = entry.input[len(RAW_PREFIX):]
-                    child.send(raw)
-                else:
-                    child.sendline(entry.input)
+                with trace.span("send input", terminal_id=terminal_id, queue_id=entry.queue_id):
+                    if entry.input.startswith(RAW_PREFIX):
+                        raw = entry.input[len(RAW_PREFIX):]
+                        child.send(raw)
+                    else:
+                        child.sendline(entry.input)
                 mark_sent(terminal_id, entry.queue_id, project_root)
                 reset_idle()
+                sent = True
+                if stats:
+                    stats.incr("input.sent")
+                    try:
+                        queued_at = datetime.fromisoformat(entry.created_at).timestamp()
+                        stats.observe("queue.latency", max(time.time() - queued_at, 0.0))
+                    except ValueError:
+                        pass
                 log_event("input.sent", project_root, terminal_id, {
                     "queue_id": entry.queue_id,
                     "input": "[raw keys]" if entry.input.startswith(RAW_PREFIX) else entry.input,
                 })
                 entry = get_next_queued(terminal_id, project_root)
-            count = pending_count(terminal_id, project_root)
-            update_session(terminal_id, {"queue_length": count}, project_root)
+            meta.set(queue_length=pending_count(terminal_id, project_root))
         except Exception:
             pass
+        return sent
 
     # ─── Capture and suspend ─────────────────────────────────────────────
-    def capture_and_suspend() -> None:
+    def capture_and_suspend(reason: str) -> None:
         global suspending
+        drain_output()  # keep the session's own last output; the capture discards its echo
         paths = get_clrun_paths(project_root)
-        cwd_file = os.path.join(paths.sessions_dir, f"{terminal_id}.state.cwd")
-        env_file = os.path.join(paths.sessions_dir, f"{terminal_id}.state.env")
-
-        for f in [cwd_file, env_file]:
-            try:
-                os.unlink(f)
-            except OSError:
-                pass
-
-        child.sendline(f"pwd > '{cwd_file}'")
-        child.sendline(f"env -0 > '{env_file}'")
-        time.sleep(SUSPEND_CAPTURE_WAIT_S)
-
-        captured_cwd = cwd
-        captured_env: dict[str, str] = {}
-
-        try:
-            with open(cwd_file, "r", encoding="utf-8") as f:
-                captured_cwd = f.read().strip()
-        except Exception:
-            pass
-
-        try:
-            with open(env_file, "r", encoding="utf-8") as f:
-                raw = f.read()
-            for entry in raw.split("\0"):
-                if not entry:
-                    continue
-                eq = entry.find("=")
-                if eq > 0:
-                    captured_env[entry[:eq]] = entry[eq + 1:]
-        except Exception:
-            pass
-
-        for f in [cwd_file, env_file]:
-            try:
-                os.unlink(f)
-            except OSError:
-                pass
-
+        state = capture_shell_state(child.child_fd, child.pid,
+                                    os.path.join(paths.sessions_dir, f"{terminal_id}.state"), cwd)
         saved_state = {
-            "cwd": captured_cwd,
-            "env": captured_env,
+            "cwd": state.cwd,
+            "env": state.env,
             "captured_at": now_iso(),
         }
 
-        update_session(terminal_id, {
-            "status": "suspended",
-            "last_activity_at": now_iso(),
-            "saved_state": saved_state,
-        }, project_root)
+        meta.transition("suspended", saved_state=saved_state)
 
         log_event("session.suspended", project_root, terminal_id, {
-            "saved_cwd": captured_cwd,
-            "saved_env_count": len(captured_env),
+            "saved_cwd": state.cwd,
+            "saved_env_count": len(state.env),
+            "capture": state.method,
+            "capture_ms": state.elapsed_ms,
+            "reason": reason,
         })
 
-        append_to_buffer(terminal_id, "\n--- session suspended (idle timeout) ---\n", project_root)
+        append_to_buffer(terminal_id, f"\n--- session suspended ({reason.replace('_', ' ')}) ---\n", project_root)
 
         try:
             child.terminate(force=True)
@@ -267,7 +496,7 @@ def main() -> None:
             child.terminate(force=True)
         except Exception:
             pass
-        update_session(terminal_id, {"status": "killed", "last_activity_at": now_iso()}, project_root)
+        meta.transition("killed")
         log_event("session.killed", project_root, terminal_id, {"signal": signum})
         sys.exit(0)
 
@@ -275,12 +504,20 @@ def main() -> None:
     signal.signal(signal.SIGINT, shutdown)
 
     # ─── Main event loop (single-threaded) ───────────────────────────────
-    last_session_update = time.time()
+    last_queue_signature: Any | None = None
+    try:
+        buffer_bytes = os.path.getsize(buffer_path(terminal_id, project_root))
+    except OSError:
+        buffer_bytes = 0
 
     try:
         while True:
+            iteration_started = time.perf_counter()
+            if tracing:
+                iteration_traced = trace.now()
+
             # 1. Drain all available PTY output
-            drain_output()
+            busy = drain_output()
 
             # 2. Check if child is still alive
             if not child.isalive():
@@ -288,33 +525,55 @@ def main() -> None:
                 drain_output()
                 break
 
-            # 3. Process queue (on signal or every iteration)
-            if sigusr1_received:
-                sigusr1_received = False
-                reset_idle()
-            process_queue()
+            # 3. Process queue (on signal, or when the queue changed)
+            signature = queue_signature()
+            if sigusr1_received or signature != last_queue_signature:
+                if sigusr1_received:
+                    sigusr1_received = False
+                    reset_idle()
+                last_queue_signature = signature
+                busy = process_queue() or busy
 
-            # 4. Update session activity periodically (every 5s)
-            now = time.time()
-            if now - last_session_update > 5:
-                update_session(terminal_id, {"last_activity_at": now_iso()}, project_root)
-                last_session_update = now
+            # 4. Heartbeat; write changed metadata once per interval (nothing while idle)
+            meta.tick(time.time(), last_activity, buffer_bytes)
 
-            # 5. Check idle timeout
-            idle = time.time() - last_activity
-            if idle >= IDLE_TIMEOUT_S and not suspending:
+            # 5. Suspension policy: own idle timeout, requests from sweeps
+            now = time.time()
+            if now - policy_checked >= policy.check_interval_s:
+                refresh_policy()
+                try:
+                    suspension.maybe_sweep(project_root, policy)
+                except Exception:
+                    pass
+            idle = now - last_activity
+            reason = suspend_reason(idle)
+            if reason:
+                # Confirm against the latest settings (the session may just have been pinned).
+                refresh_policy()
+                reason = suspend_reason(idle)
+            suspend_requested = False
+            if reason and not suspending:
                 suspending = True
                 try:
-                    capture_and_suspend()
+                    with trace.span("capture and suspend", terminal_id=terminal_id, reason=reason):
+                        capture_and_suspend(reason)
                 except Exception:
-                    update_session(terminal_id, {"status": "suspended", "last_activity_at": now_iso()}, project_root)
-                    log_event("session.suspended", project_root, terminal_id, {"capture_failed": True})
+                    meta.transition("suspended")
+                    log_event("session.suspended", project_root, terminal_id,
+                              {"capture_failed": True, "reason": reason})
                     try:
                         child.terminate(force=True)
                     except Exception:
                         pass
                 sys.exit(0)
 
+            # Loop cost is only recorded for iterations that moved data, so
+            # an idle session's metrics stay unchanged (and unwritten).
+            if stats and busy:
+                stats.observe("worker.loop", time.perf_counter() - iteration_started)
+            if tracing and busy:
+                trace.complete("loop iteration", iteration_traced, terminal_id=terminal_id)
+
             # 6. Sleep briefly to avoid busy-waiting
             time.sleep(0.1)
 
@@ -324,12 +583,8 @@ def main() -> None:
     # ─── PTY exited normally ─────────────────────────────────────────────
     if not suspending:
         exit_code = child.exitstatus if child.exitstatus is not None else child.signalstatus or 0
-        update_session(terminal_id, {
-            "status": "exited",
-            "last_exit_code": exit_code,
-            "last_activity_at": now_iso(),
-            "queue_length": 0,
-        }, project_root)
+        meta.transition("exited", last_exit_code=exit_code, queue_length=0)
+        trace.instant("session exited", terminal_id=terminal_id, exit_code=exit_code)
         log_event("session.exited", project_root, terminal_id, {"exit_code": exit_code})
 
     sys.exit(0)
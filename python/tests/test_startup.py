@@ -0,0 +1,98 @@
+"""Import budget of the CLI fast path (see benchmarks/bench_startup.py for timings).
+
+Hot commands are routed without Click, and heavy modules are imported only
+by the commands that use them. These tests run each command in a fresh
+interpreter under `python -X importtime` and fail if a module that must stay
+off the path gets imported, or if importing clrun.cli takes longer than
+IMPORT_BUDGET_MS.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from typing import List, Set, Tuple
+
+import pytest
+
+PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Never imported by `import clrun.cli` or the Click-free hot commands
+# (yaml: they run with CLRUN_FORMAT=json).
+FORBIDDEN = {"click", "pexpect", "yaml", "clrun.cli_app", "clrun.runtime.metrics"}
+# Cumulative `-X importtime` cost of clrun.cli, best of IMPORT_RUNS. About
+# 2.5x what it costs today; importing click or yaml alone would exceed it.
+IMPORT_BUDGET_MS = 40.0
+IMPORT_RUNS = 3
+TERMINAL_ID = "0f0e0d0c-0b0a-4900-8800-aabbccddeeff"
+
+
+def _importtime(args: List[str], cwd: str) -> List[Tuple[int, str]]:
+    """(cumulative us, name as printed, indented if nested) of every import."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = PKG_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    env["CLRUN_FORMAT"] = "json"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime"] + args,
+        cwd=cwd, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    found = []
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            found.append((int(cumulative), name))
+    return found
+
+
+def _imported(args: List[str], cwd: str) -> Set[str]:
+    return {name.strip() for _, name in _importtime(args, cwd)}
+
+
+@pytest.fixture
+def project(tmp_path) -> str:
+    """A project with one exited session (no worker)."""
+    root = str(tmp_path)
+    open(os.path.join(root, "pyproject.toml"), "w").close()
+    code = (
+        "import sys\n"
+        "from clrun.buffer.buffer_manager import append_to_buffer, init_buffer\n"
+        "from clrun.pty.pty_manager import write_session\n"
+        "from clrun.queue.queue_engine import init_queue\n"
+        "from clrun.types import SessionMetadata\n"
+        "from clrun.utils.paths import ensure_clrun_dirs\n"
+        "root, tid = sys.argv[1:]\n"
+        "ensure_clrun_dirs(root)\n"
+        "init_queue(tid, root)\n"
+        "init_buffer(tid, root)\n"
+        "append_to_buffer(tid, 'hello\\n', root)\n"
+        "write_session(SessionMetadata(tid, '2026-01-01T00:00:00+00:00', root, 'echo hello',\n"
+        "                              '/bin/sh', 'exited', 0, 0, last_exit_code=0), root)\n"
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = PKG_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    subprocess.run([sys.executable, "-c", code, root, TERMINAL_ID], cwd=root, env=env, check=True)
+    return root
+
+
+def test_import_cli(tmp_path) -> None:
+    assert not _imported(["-c", "import clrun.cli"], str(tmp_path)) & FORBIDDEN
+
+
+def test_import_cli_budget(tmp_path) -> None:
+    samples = []
+    for _ in range(IMPORT_RUNS):
+        found = _importtime(["-c", "import clrun.cli"], str(tmp_path))
+        samples.append(sum(us for us, name in found if name.strip() == "clrun.cli") / 1000)
+    assert min(samples) <= IMPORT_BUDGET_MS, f"import clrun.cli took {min(samples):.1f} ms"
+
+
+@pytest.mark.parametrize("argv", [
+    [TERMINAL_ID],
+    ["tail", TERMINAL_ID, "-n", "5"],
+    ["head", TERMINAL_ID],
+    ["status"],
+])
+def test_hot_commands(project: str, argv: List[str]) -> None:
+    assert not _imported(["-m", "clrun"] + argv, project) & FORBIDDEN